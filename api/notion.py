@@ -172,35 +172,22 @@ def _parse_page(page: dict) -> dict:
         "account_id":     account_id,
         "username":       _read_text(props.get("Username")),
         "display_name":   _read_title(props.get("Name")),
+        "bio":            _read_text(props.get("Official Bio")),
         "description":    _read_text(props.get("Tweet Analysis")),
         "one_liner":      _read_text(props.get("One-liner")),
         "sectors":        _read_multi_select(props.get("Sector")),
         "account_type":   _read_select(props.get("Account Type")),
         "last_tweet_date": _read_date(props.get("Last Tweet Date")),
         "status":         _read_select(props.get("Status")),
+        "thesis_similarity": _read_number(props.get("Thesis_Similarity")),
+        "nearest_thesis": _read_text(props.get("Nearest_Thesis")),
     }
 
 
 # ── query & scoring ───────────────────────────────────────────────────────────
 
-def query_new_accounts() -> list[dict]:
-    """Return all pages with Status = New or Status empty (not yet processed)."""
+def _query_pages(base_filter: dict) -> list[dict]:
     url = f"https://api.notion.com/v1/databases/{NOTION_DATABASE_ID}/query"
-    base_filter = {
-        "filter": {
-            "and": [
-                {
-                    "or": [
-                        {"property": "Status", "select": {"equals": "New"}},
-                        {"property": "Status", "select": {"is_empty": True}},
-                    ]
-                },
-                {"property": "Status", "select": {"does_not_equal": "Filtered"}},
-                {"property": "Status", "select": {"does_not_equal": "Scored"}},
-            ]
-        }
-    }
-
     pages: list[dict] = []
     cursor = None
     while True:
@@ -220,6 +207,29 @@ def query_new_accounts() -> list[dict]:
     return pages
 
 
+def query_new_accounts() -> list[dict]:
+    """Return all pages with Status = New or Status empty (not yet processed)."""
+    return _query_pages({
+        "filter": {
+            "and": [
+                {
+                    "or": [
+                        {"property": "Status", "select": {"equals": "New"}},
+                        {"property": "Status", "select": {"is_empty": True}},
+                    ]
+                },
+                {"property": "Status", "select": {"does_not_equal": "Filtered"}},
+                {"property": "Status", "select": {"does_not_equal": "Scored"}},
+            ]
+        }
+    })
+
+
+def query_scored_accounts() -> list[dict]:
+    """Return all pages with Status = Scored."""
+    return _query_pages({"filter": {"property": "Status", "select": {"equals": "Scored"}}})
+
+
 def update_scoring(page_id: str, result: dict):
     """Write Phase 2 scoring output back to the Notion page."""
     properties = {
@@ -1,11 +1,30 @@
+import json
 import time
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
-from config import SORSA_API_KEY, SORSA_BASE_URL
+from config import SORSA_API_KEY, SORSA_BASE_URL, DB_PATH, PROFILE_CACHE_TTL_HOURS
+from shared.single_flight import coalesce
 
 HEADERS = {"ApiKey": SORSA_API_KEY, "Accept": "application/json"}
 
+_BATCH_SIZE = 50      # info-batch maximum; every call is billed the same, full or not
+_BATCH_WORKERS = 3
+
+
+# Every Sorsa endpoint used here is a read, so identical concurrent calls
+# (same path + params/payload) share one request — see shared/single_flight.py.
 
 def _get(path: str, params: dict = None) -> dict | list:
+    return coalesce(("sorsa", "GET", path, params), _get_once, path, params)
+
+
+def _post(path: str, payload: dict) -> dict:
+    return coalesce(("sorsa", "POST", path, payload), _post_once, path, payload)
+
+
+def _get_once(path: str, params: dict = None) -> dict | list:
     url = f"{SORSA_BASE_URL}{path}"
     for attempt in range(3):
         r = requests.get(url, headers=HEADERS, params=params, timeout=30)
@@ -17,7 +36,7 @@ def _get(path: str, params: dict = None) -> dict | list:
     raise RuntimeError(f"GET {path} failed after retries")
 
 
-def _post(path: str, payload: dict) -> dict:
+def _post_once(path: str, payload: dict) -> dict:
     url = f"{SORSA_BASE_URL}{path}"
     for attempt in range(3):
         r = requests.post(url, headers={**HEADERS, "Content-Type": "application/json"},
@@ -41,28 +60,151 @@ def get_new_following_7d(user_id: str) -> list[dict]:
     return data.get("users", [])
 
 
-def get_profiles_batch(user_ids: list[str]) -> list[dict]:
-    """Fetch profiles in chunks of 50 with retry on timeout/429."""
-    all_users = []
-    for i in range(0, len(user_ids), 50):
-        chunk = user_ids[i:i + 50]
-        params = [("user_ids", uid) for uid in chunk]
-        for attempt in range(4):
-            try:
-                r = requests.get(f"{SORSA_BASE_URL}/info-batch", headers=HEADERS,
-                                 params=params, timeout=60)
-                if r.status_code == 429:
-                    time.sleep(2 ** attempt)
-                    continue
-                r.raise_for_status()
-                all_users.extend(r.json().get("users", []))
-                break
-            except requests.exceptions.Timeout:
-                if attempt == 3:
-                    raise
+# ── Profile cache ─────────────────────────────────────────────────────────────
+# Every script that looks up profiles shares one snapshot table in state.db, so
+# ids fetched earlier in the day (by any caller) are served locally until they
+# are PROFILE_CACHE_TTL_HOURS old. Only the misses go to Sorsa, deduplicated
+# and packed into full 50-id info-batch calls issued concurrently.
+
+_profile_stats = {"requested": 0, "hits": 0, "coalesced": 0, "fetched": 0, "failed": 0, "batches": 0}
+_stats_lock = threading.Lock()
+# Ids some thread is fetching right now → Future of their profile (or None).
+# A concurrent caller waits on these instead of fetching the same id again.
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _profile_conn() -> sqlite3.Connection:
+    con = sqlite3.connect(DB_PATH, timeout=30)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS sorsa_profiles (
+            user_id    TEXT PRIMARY KEY,
+            raw        TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    """)
+    return con
+
+
+def _cached_profiles(user_ids: list[str], max_age: float) -> dict[str, dict]:
+    cutoff = time.time() - max_age
+    found: dict[str, dict] = {}
+    with _profile_conn() as con:
+        for i in range(0, len(user_ids), 500):
+            chunk = user_ids[i:i + 500]
+            rows = con.execute(
+                f"SELECT user_id, raw FROM sorsa_profiles "
+                f"WHERE fetched_at >= ? AND user_id IN ({','.join('?' * len(chunk))})",
+                (cutoff, *chunk),
+            ).fetchall()
+            found.update((uid, json.loads(raw)) for uid, raw in rows)
+    return found
+
+
+def _store_profiles(profiles: list[dict]):
+    now = time.time()
+    with _profile_conn() as con:
+        con.executemany(
+            "INSERT OR REPLACE INTO sorsa_profiles (user_id, raw, fetched_at) VALUES (?, ?, ?)",
+            [(str(p["id"]), json.dumps(p, ensure_ascii=False), now) for p in profiles if p.get("id")],
+        )
+
+
+def _fetch_info_batch(chunk: list[str]) -> list[dict]:
+    """One info-batch call (≤ 50 ids) with retry on timeout/429."""
+    params = [("user_ids", uid) for uid in chunk]
+    for attempt in range(4):
+        try:
+            r = requests.get(f"{SORSA_BASE_URL}/info-batch", headers=HEADERS,
+                             params=params, timeout=60)
+            if r.status_code == 429:
                 time.sleep(2 ** attempt)
-        time.sleep(0.3)
-    return all_users
+                continue
+            r.raise_for_status()
+            return r.json().get("users", [])
+        except requests.exceptions.Timeout:
+            if attempt == 3:
+                raise
+            time.sleep(2 ** attempt)
+    raise RuntimeError("GET /info-batch failed after retries")
+
+
+def get_profiles_batch(user_ids: list[str], max_age_hours: float | None = None) -> list[dict]:
+    """
+    Profiles for user_ids, served from the local cache when younger than
+    max_age_hours (default PROFILE_CACHE_TTL_HOURS; 0 forces a refetch).
+    Misses are fetched in full 50-id batches, concurrently; ids another
+    thread is already fetching are waited on rather than requested twice.
+    A batch that still fails after its retries is logged and skipped: those
+    ids are missing from the result, everything else is returned and cached.
+    """
+    max_age = (PROFILE_CACHE_TTL_HOURS if max_age_hours is None else max_age_hours) * 3600
+    wanted = list(dict.fromkeys(str(uid) for uid in user_ids))
+    cached = _cached_profiles(wanted, max_age) if max_age > 0 else {}
+    missing = [uid for uid in wanted if uid not in cached]
+
+    owned: dict[str, Future] = {}
+    waiting: dict[str, Future] = {}
+    with _inflight_lock:
+        for uid in missing:
+            if uid in _inflight:
+                waiting[uid] = _inflight[uid]
+            else:
+                owned[uid] = _inflight[uid] = Future()
+
+    fetched: list[dict] = []
+    failed = 0
+    try:
+        if owned:
+            ids = list(owned)
+            chunks = [ids[i:i + _BATCH_SIZE] for i in range(0, len(ids), _BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=_BATCH_WORKERS) as pool:
+                futures = [pool.submit(_fetch_info_batch, chunk) for chunk in chunks]
+                for chunk, future in zip(chunks, futures):
+                    # A failed batch is skipped; the others' profiles are still kept
+                    try:
+                        fetched.extend(future.result())
+                    except Exception as e:
+                        failed += len(chunk)
+                        print(f"  [warn] info-batch of {len(chunk)} id(s) failed, skipped: {e}")
+            _store_profiles(fetched)
+    except BaseException as e:
+        for fut in owned.values():
+            fut.set_exception(e)
+        raise
+    finally:
+        by_fetched = {str(p["id"]): p for p in fetched if p.get("id")}
+        for uid, fut in owned.items():
+            if not fut.done():
+                fut.set_result(by_fetched.get(uid))
+        with _inflight_lock:
+            for uid in owned:
+                _inflight.pop(uid, None)
+
+    shared = {uid: fut.result() for uid, fut in waiting.items()}
+
+    with _stats_lock:
+        _profile_stats["requested"] += len(wanted)
+        _profile_stats["hits"] += len(cached)
+        _profile_stats["coalesced"] += len(waiting)
+        _profile_stats["fetched"] += len(owned) - failed
+        _profile_stats["failed"] += failed
+        _profile_stats["batches"] += -(-len(owned) // _BATCH_SIZE)
+
+    by_id = {**cached, **by_fetched, **{uid: p for uid, p in shared.items() if p}}
+    return [by_id[uid] for uid in wanted if uid in by_id]
+
+
+def profile_cache_stats() -> dict:
+    """
+    Counters for this process: ids requested, cache hits, ids shared with an
+    in-flight fetch, ids fetched, ids in failed batches, info-batch calls,
+    and the hit rate.
+    """
+    with _stats_lock:
+        stats = dict(_profile_stats)
+    stats["hit_rate"] = round(stats["hits"] / stats["requested"], 3) if stats["requested"] else 0.0
+    return stats
 
 
 def search_tweets(query: str, order: str = "popular", max_results: int = 100) -> list[dict]:
@@ -83,7 +225,11 @@ def search_tweets(query: str, order: str = "popular", max_results: int = 100) ->
     return tweets[:max_results]
 
 
-def get_user_tweets(user_id: str, max_tweets: int = 20) -> list[dict]:
+def get_user_tweets(user_id: str, max_tweets: int = 20, since_id: str | None = None) -> list[dict]:
+    """
+    Newest-first timeline. With since_id, only tweets newer than it are
+    returned and paging stops once a page reaches it.
+    """
     tweets = []
     cursor = None
     while len(tweets) < max_tweets:
@@ -92,7 +238,14 @@ def get_user_tweets(user_id: str, max_tweets: int = 20) -> list[dict]:
             payload["next_cursor"] = cursor
         data = _post("/user-tweets", payload)
         batch = data.get("tweets", [])
-        tweets.extend(batch)
+        if since_id:
+            newer = [t for t in batch if int(t["id"]) > int(since_id)]
+            tweets.extend(newer)
+            # A pinned tweet can be old, so only the tail of a page says "caught up"
+            if batch and int(batch[-1]["id"]) <= int(since_id):
+                break
+        else:
+            tweets.extend(batch)
         cursor = data.get("next_cursor")
         if not cursor or not batch:
             break
@@ -1,7 +1,11 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv(override=True)
+# Local runs read .env; deployments (Vercel) set the environment directly and
+# do not import python-dotenv at all
+_ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+if os.path.exists(_ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_FILE, override=True)
 
 SORSA_API_KEY = os.getenv("TweetScout_API_key")
 EXA_API_KEY = os.getenv("EXA_API_KEY")
@@ -13,11 +17,19 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
+NOTION_API_URL = os.getenv("NOTION_API_URL", "https://api.notion.com/v1")  # override to point at a fake server
 
 SORSA_BASE_URL = "https://api.sorsa.io/v3"
 WATCHLIST_FILE = "followed_accounts.txt"
-DB_PATH = "state.db"
+DB_PATH = os.getenv("STATE_DB_PATH", "state.db")  # on Vercel point at /tmp (read-only filesystem)
 MIN_WATCHERS = 1  # minimum watchlist members that must follow an account to surface it
+PROFILE_CACHE_TTL_HOURS = float(os.getenv("PROFILE_CACHE_TTL_HOURS", "12"))  # Sorsa profile cache (state.db)
+# Profiles whose tweets_count gates the tweet-store sync: a stale count hides new tweets
+PROFILE_TWEET_SYNC_TTL_HOURS = float(os.getenv("PROFILE_TWEET_SYNC_TTL_HOURS", "1"))
+VOTING_CACHE_TTL_SECONDS = float(os.getenv("VOTING_CACHE_TTL_SECONDS", "60"))  # webapp voting-set cache
+# Per-request hosting (Vercel sets VERCEL=1): instances are frozen between requests, so the webapp
+# runs no background threads and serves no SSE stream
+SERVERLESS = bool(os.getenv("VERCEL") or os.getenv("SERVERLESS"))
 
 # Voting webapp — team
 TEAM_MEMBERS = ["Darko", "Jocy", "Momir", "Yiping", "Frank", "Mario"]
@@ -33,3 +45,9 @@ SECRET_KEY          = os.getenv("SECRET_KEY", "dev-secret-change-in-production")
 GOOGLE_CLIENT_ID    = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 APP_URL             = os.getenv("APP_URL", "http://localhost:8000")
+
+# Voting webapp — vote writes ("notion": written to Notion before the vote is acknowledged, the only
+# safe mode on serverless hosts; "sqlite": write-behind via state.db, long-running host with a persistent disk)
+VOTE_STORE          = os.getenv("VOTE_STORE", "notion")
+if VOTE_STORE not in ("notion", "sqlite"):
+    raise ValueError(f"VOTE_STORE must be 'notion' or 'sqlite', got {VOTE_STORE!r}")
@@ -1,10 +1,29 @@
+import re
+import time
+import asyncio
+import hashlib
 import anthropic
 from tqdm import tqdm
 from config import ANTHROPIC_API_KEY
+from shared.retry_after import retry_after
 
 _client = None
 
-_MAX_TWEET_CHARS = 12000
+_MODEL = "claude-haiku-4-5"
+_SYSTEM = "You analyze crypto and startup Twitter accounts for a venture capital deal-sourcing tool."
+_TWEET_TOKEN_TARGET = 3000  # estimated tokens of tweets per account prompt
+
+# Concurrent analysis: start at _START_CONCURRENCY in-flight requests, grow by
+# one per window of successes up to the caller's cap, halve on 429/overloaded.
+_CONCURRENCY = 8
+_START_CONCURRENCY = 4
+_MAX_ATTEMPTS = 5
+_THROTTLE_STATUSES = {429, 529}
+
+
+def _empty_analysis() -> dict:
+    return {"description": "", "entities": [], "account_type": "unknown",
+            "sector": [], "token_status": "unknown", "stage": "unknown", "one_liner": ""}
 
 
 def _get_client():
@@ -14,111 +33,197 @@ def _get_client():
     return _client
 
 
-def _analyze_tweets(tweets: list[str], bio: str = "") -> dict:
-    if not tweets and not bio:
-        return {"description": "", "entities": [], "account_type": "unknown",
-                "sector": [], "token_status": "unknown", "stage": "unknown", "one_liner": ""}
+# ── Token budget ──────────────────────────────────────────────────────────────
+# Tweets are packed whole, newest first, until the estimated token target is
+# reached, so a prompt never ends mid-tweet. Retweets and thread repeats of a
+# tweet already kept are dropped first (matched on a hash of the normalized
+# text), which leaves room for more distinct tweets.
 
-    tweets_text = "\n".join(tweets)
-    if len(tweets_text) > _MAX_TWEET_CHARS:
-        tweets_text = tweets_text[:_MAX_TWEET_CHARS]
+_RT_PREFIX_RE = re.compile(r'^rt @\w+:\s*')
+_URL_RE = re.compile(r'https?://\S+')
+_NON_WORD_RE = re.compile(r'[\W_]+')
+_DEDUPE_PREFIX_CHARS = 120  # near-duplicates share their opening, not always their tail
 
-    bio_section = f"Official bio: {bio}\n\n" if bio else ""
 
-    prompt = f"""Analyze this crypto/startup ecosystem account.
+def _estimate_tokens(text: str) -> int:
+    # ~4 chars/token for ASCII text; CJK and other non-ASCII text runs close to a token per char
+    non_ascii = sum(1 for c in text if ord(c) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii + 1
 
-{bio_section}Tweets:
-{tweets_text}
 
-Return exactly this format:
+def _head_within(text: str, token_target: int) -> str:
+    """Longest prefix of text whose _estimate_tokens fits token_target (cut by the same estimate)."""
+    lo, hi = 0, min(len(text), token_target * 4)  # ASCII is the cheapest, ~4 chars/token
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _estimate_tokens(text[:mid]) <= token_target:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
 
-TYPE:
-[project or person]
 
-ONE-LINER:
-[one sharp sentence: what this is and why it matters, max 15 words]
+def _tweet_key(text: str) -> bytes:
+    normalized = _RT_PREFIX_RE.sub("", text.lower())
+    normalized = _NON_WORD_RE.sub(" ", _URL_RE.sub("", normalized)).strip()
+    return hashlib.blake2b(normalized[:_DEDUPE_PREFIX_CHARS].encode(), digest_size=8).digest()
 
-DESCRIPTION:
-[2-3 sentence summary of what this account focuses on — their role, key themes, perspective]
 
-SECTOR:
-[comma-separated list from: DeFi, L1, L2, AI, Gaming, NFT, Infrastructure, DAO, VC, Social, RWA, Other]
+def budget_tweets(tweets: list[str], token_target: int = _TWEET_TOKEN_TARGET) -> tuple[list[str], int]:
+    """
+    Whole tweets, newest first (input order), until token_target; near-duplicates
+    are skipped. Returns (kept tweets, estimated tokens used).
+    """
+    kept: list[str] = []
+    seen: set[bytes] = set()
+    used = 0
+    for text in tweets:
+        text = (text or "").strip()
+        if not text:
+            continue
+        key = _tweet_key(text)
+        if key in seen:
+            continue
+        seen.add(key)
+        cost = _estimate_tokens(text) + 1  # + newline
+        if used + cost > token_target:
+            if not kept:
+                # A single long-form post larger than the whole budget: keep its head
+                text = _head_within(text, token_target)
+                kept.append(text)
+                used += _estimate_tokens(text)
+            break
+        kept.append(text)
+        used += cost
+    return kept, used
 
-TOKEN STATUS:
-[exactly one of: has token / TGE planned / no token / unknown]
 
-STAGE:
-[exactly one of: pre-seed / seed / growth / unknown]
+# ── Structured output ────────────────────────────────────────────────────────
+# Haiku is forced to call record_analysis, so fields arrive typed. Values are
+# still validated here; an invalid call is sent back as a tool error and the
+# model retries, up to _MAX_INVALID_RETRIES times.
 
-ENTITIES:
-- Entity name (type)
-- Entity name (type)
+_SECTORS = ["DeFi", "L1", "L2", "AI", "Gaming", "NFT", "Infrastructure", "DAO", "VC",
+            "Social", "RWA", "Other"]
+_TOKEN_STATUSES = ["has token", "TGE planned", "no token", "unknown"]
+_STAGES = ["pre-seed", "seed", "growth", "unknown"]
+_ENTITY_TYPES = ["project", "token", "VC", "person", "protocol", "exchange", "other"]
+_MAX_INVALID_RETRIES = 2
 
-Rules:
-- TYPE must be exactly "project" or "person"
-- SECTOR: pick only relevant ones from the list, max 3
-- Entity types: project, token, VC, person, protocol, exchange, other"""
+_ANALYSIS_TOOL = {
+    "name": "record_analysis",
+    "description": "Record the analysis of one crypto/startup Twitter account.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "account_type": {"type": "string", "enum": ["project", "person"]},
+            "one_liner": {
+                "type": "string",
+                "description": "One sharp sentence: what this is and why it matters, max 15 words.",
+            },
+            "description": {
+                "type": "string",
+                "description": "2-3 sentence summary of what this account focuses on — "
+                               "their role, key themes, perspective.",
+            },
+            "sector": {
+                "type": "array",
+                "items": {"type": "string", "enum": _SECTORS},
+                "maxItems": 3,
+                "description": "Only the relevant sectors, max 3.",
+            },
+            "token_status": {"type": "string", "enum": _TOKEN_STATUSES},
+            "stage": {"type": "string", "enum": _STAGES},
+            "entities": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "type": {"type": "string", "enum": _ENTITY_TYPES},
+                    },
+                    "required": ["name", "type"],
+                },
+            },
+        },
+        "required": ["account_type", "one_liner", "description", "sector",
+                     "token_status", "stage", "entities"],
+    },
+}
 
-    response = _get_client().messages.create(
-        model="claude-haiku-4-5",
-        max_tokens=600,
-        system="You analyze crypto and startup Twitter accounts for a venture capital deal-sourcing tool.",
-        messages=[{"role": "user", "content": prompt}],
-    )
 
-    content = response.content[0].text.strip()
+def _account_text(tweets: list[str], bio: str) -> str:
+    """Prompt block for one account; tweets are expected to be budgeted already."""
+    tweets_text = "\n".join(tweets)
+    bio_section = f"Official bio: {bio}\n\n" if bio else ""
+    return f"{bio_section}Tweets:\n{tweets_text}"
+
+
+def _build_prompt(tweets: list[str], bio: str) -> str:
+    return f"""Analyze this crypto/startup ecosystem account.
+
+{_account_text(tweets, bio)}
+
+Record your analysis with the record_analysis tool."""
+
+
+def _analysis_request(messages: list[dict]) -> dict:
+    return {
+        "model": _MODEL,
+        "max_tokens": 800,
+        "system": _SYSTEM,
+        "tools": [_ANALYSIS_TOOL],
+        "tool_choice": {"type": "tool", "name": _ANALYSIS_TOOL["name"]},
+        "messages": messages,
+    }
+
 
-    def extract_section(text: str, start: str, end: str | None) -> str:
-        if start not in text:
+def _validate_analysis(data: dict) -> dict:
+    """Check a record_analysis input against the schema's enums; raise ValueError listing every problem."""
+    errors = []
+
+    def text(field: str) -> str:
+        value = data.get(field)
+        if not isinstance(value, str):
+            errors.append(f"{field} must be a string")
             return ""
-        section = text.split(start)[1]
-        if end and end in section:
-            section = section.split(end)[0]
-        return section.strip()
-
-    account_type = "unknown"
-    type_raw = extract_section(content, "TYPE:", "ONE-LINER:").lower()
-    if "project" in type_raw:
-        account_type = "project"
-    elif "person" in type_raw:
-        account_type = "person"
-
-    one_liner = extract_section(content, "ONE-LINER:", "DESCRIPTION:")
-    description = extract_section(content, "DESCRIPTION:", "SECTOR:")
-
-    sector_raw = extract_section(content, "SECTOR:", "TOKEN STATUS:")
-    sector = [s.strip() for s in sector_raw.split(",") if s.strip()] if sector_raw else []
-
-    token_status_raw = extract_section(content, "TOKEN STATUS:", "STAGE:").lower()
-    if "has token" in token_status_raw:
-        token_status = "has token"
-    elif "tge planned" in token_status_raw:
-        token_status = "TGE planned"
-    elif "no token" in token_status_raw:
-        token_status = "no token"
-    else:
-        token_status = "unknown"
-
-    stage_raw = extract_section(content, "STAGE:", "ENTITIES:").lower()
-    if "pre-seed" in stage_raw:
-        stage = "pre-seed"
-    elif "seed" in stage_raw:
-        stage = "seed"
-    elif "growth" in stage_raw:
-        stage = "growth"
-    else:
-        stage = "unknown"
-
-    entities = []
-    entities_raw = extract_section(content, "ENTITIES:", None)
-    for line in entities_raw.splitlines():
-        line = line.strip("- ").strip()
-        if line:
-            entities.append(line)
+        return value.strip()
+
+    def choice(field: str, allowed: list[str]) -> str:
+        value = data.get(field)
+        if value not in allowed:
+            errors.append(f"{field}={value!r} is not one of {allowed}")
+        return value
+
+    account_type = choice("account_type", ["project", "person"])
+    token_status = choice("token_status", _TOKEN_STATUSES)
+    stage = choice("stage", _STAGES)
+    one_liner = text("one_liner")
+    description = text("description")
+
+    sector = data.get("sector")
+    if not isinstance(sector, list) or len(sector) > 3:
+        errors.append("sector must be a list of at most 3 values")
+        sector = []
+    for value in sector:
+        if value not in _SECTORS:
+            errors.append(f"sector value {value!r} is not one of {_SECTORS}")
+
+    entities = data.get("entities")
+    if not isinstance(entities, list):
+        errors.append("entities must be a list")
+        entities = []
+    for e in entities:
+        if not isinstance(e, dict) or not isinstance(e.get("name"), str) or e.get("type") not in _ENTITY_TYPES:
+            errors.append(f"entity {e!r} needs a name and a type from {_ENTITY_TYPES}")
+
+    if errors:
+        raise ValueError("; ".join(errors))
 
     return {
         "description": description,
-        "entities": entities,
+        # Same "Name (type)" lines the Notion Entities field has always stored
+        "entities": [f"{e['name'].strip()} ({e['type']})" for e in entities if e["name"].strip()],
         "account_type": account_type,
         "one_liner": one_liner,
         "sector": sector,
@@ -127,24 +232,320 @@ Rules:
     }
 
 
-def analyze_accounts(accounts: list[dict]) -> list[dict]:
-    for account in tqdm(accounts, desc="Analyzing tweets"):
+def _read_analysis(response) -> tuple[dict | None, str, list[dict]]:
+    """
+    (result, "", []) for a valid tool call; otherwise (None, error, repair)
+    where repair is the assistant turn + tool error to append before retrying.
+    """
+    block = next((b for b in response.content if b.type == "tool_use"), None)
+    if block is None:
+        return None, f"no tool call (stop_reason={response.stop_reason})", []
+    try:
+        return _validate_analysis(block.input), "", []
+    except ValueError as e:
+        repair = [
+            {"role": "assistant", "content": response.content},
+            {"role": "user", "content": [{
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "is_error": True,
+                "content": f"Invalid values: {e}. Call record_analysis again with valid values.",
+            }]},
+        ]
+        return None, str(e), repair
+
+
+def analyze_account(tweets: list[str], bio: str = "") -> dict:
+    """Single blocking analysis of one account's tweets + bio (typed, validated fields)."""
+    tweets, _ = budget_tweets(tweets)
+    if not tweets and not bio:
+        return _empty_analysis()
+
+    prompt = [{"role": "user", "content": _build_prompt(tweets, bio)}]
+    messages, error = prompt, ""
+    for _ in range(_MAX_INVALID_RETRIES + 1):
+        response = _get_client().messages.create(**_analysis_request(messages))
+        result, error, repair = _read_analysis(response)
+        if result is not None:
+            return result
+        messages = prompt + repair
+    raise ValueError(f"invalid analysis after {_MAX_INVALID_RETRIES + 1} attempts: {error}")
+
+
+# ── Concurrent analysis (AIMD rate limiting) ──────────────────────────────────
+
+class _AIMDLimiter:
+    """
+    Adaptive cap on in-flight requests. Additive increase: +1 after `limit`
+    consecutive successes. Multiplicative decrease: halve on 429/overloaded,
+    and pause everyone until Retry-After. The rate-limit response headers
+    also clamp the cap when few requests are left in the current window.
+    """
+
+    def __init__(self, start: int, maximum: int):
+        self.limit = max(1, min(start, maximum))
+        self.maximum = maximum
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, headers):
+        self._successes += 1
+        if self._successes >= self.limit:
+            self.limit = min(self.maximum, self.limit + 1)
+            self._successes = 0
+        remaining = headers.get("anthropic-ratelimit-requests-remaining")
+        if remaining is not None and remaining.isdigit() and int(remaining) < self.limit:
+            self.limit = max(1, int(remaining))
+
+    def on_throttle(self, headers):
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+        delay = retry_after(headers.get("retry-after"), 0.0)
+        self._resume_at = max(self._resume_at, time.monotonic() + max(delay, 1.0))
+
+
+async def _create_async(client: anthropic.AsyncAnthropic, limiter: _AIMDLimiter, request: dict):
+    """One messages.create through the limiter, retrying throttling and connection errors."""
+    for attempt in range(_MAX_ATTEMPTS):
+        await limiter.acquire()
         try:
-            result = _analyze_tweets(account.get("tweet_texts", []), account.get("description", ""))
-            account["tweet_analysis"] = result["description"]
-            account["entities"] = result["entities"]
-            account["account_type"] = result["account_type"]
-            account["one_liner"] = result["one_liner"]
-            account["sector"] = result["sector"]
-            account["token_status"] = result["token_status"]
-            account["stage"] = result["stage"]
-        except Exception as e:
-            print(f"  [warn] analysis failed for {account.get('username', account['id'])}: {e}")
-            account["tweet_analysis"] = ""
-            account["entities"] = []
-            account["account_type"] = "unknown"
-            account["one_liner"] = ""
-            account["sector"] = []
-            account["token_status"] = "unknown"
-            account["stage"] = "unknown"
+            raw = await client.messages.with_raw_response.create(**request)
+        except anthropic.APIStatusError as e:
+            if e.status_code not in _THROTTLE_STATUSES or attempt == _MAX_ATTEMPTS - 1:
+                raise
+            limiter.on_throttle(e.response.headers)
+            continue
+        except anthropic.APIConnectionError:
+            if attempt == _MAX_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(2 ** attempt)
+            continue
+        finally:
+            await limiter.release()
+
+        limiter.on_success(raw.headers)
+        return raw.parse()
+
+
+async def _analyze_tweets_async(client: anthropic.AsyncAnthropic, limiter: _AIMDLimiter,
+                                tweets: list[str], bio: str) -> dict:
+    if not tweets and not bio:
+        return _empty_analysis()
+
+    prompt = [{"role": "user", "content": _build_prompt(tweets, bio)}]
+    messages, error = prompt, ""
+    for _ in range(_MAX_INVALID_RETRIES + 1):
+        response = await _create_async(client, limiter, _analysis_request(messages))
+        result, error, repair = _read_analysis(response)
+        if result is not None:
+            return result
+        messages = prompt + repair
+    raise ValueError(f"invalid analysis after {_MAX_INVALID_RETRIES + 1} attempts: {error}")
+
+
+# ── Packing: several small accounts per request ──────────────────────────────
+# Most accounts are a short bio and a handful of tweets, far below the prompt
+# cap, so the fixed per-request overhead dominates. Small accounts are grouped
+# (in order) up to _PACK_TOKEN_BUDGET and analyzed with record_analyses, which
+# returns one entry per account_id. Anything missing or invalid in the reply
+# falls back to a single-account request.
+
+_PACK_TOKEN_BUDGET = 6000
+_PACK_MAX_ACCOUNTS = 10
+_PACK_MAX_ACCOUNT_TOKENS = 1500   # larger accounts are always analyzed alone
+_PACK_OUTPUT_TOKENS = 500         # per account in the packed reply
+
+_PACKED_TOOL = {
+    "name": "record_analyses",
+    "description": "Record one analysis per account, keyed by the account_id given in the prompt.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "analyses": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "account_id": {"type": "string"},
+                        **_ANALYSIS_TOOL["input_schema"]["properties"],
+                    },
+                    "required": ["account_id", *_ANALYSIS_TOOL["input_schema"]["required"]],
+                },
+            },
+        },
+        "required": ["analyses"],
+    },
+}
+
+
+def _pack_groups(items: list[dict]) -> list[list[int]]:
+    """Indices of `items` grouped greedily, in order, into packed requests (singletons stay alone)."""
+    groups: list[list[int]] = []
+    current: list[int] = []
+    used = 0
+    for i, item in enumerate(items):
+        if not item["tweets"] and not item["bio"]:
+            groups.append([i])  # nothing to analyze; no request is made
+            continue
+        tokens = item["tokens"]
+        if tokens > _PACK_MAX_ACCOUNT_TOKENS:
+            groups.append([i])
+            continue
+        if current and (used + tokens > _PACK_TOKEN_BUDGET or len(current) >= _PACK_MAX_ACCOUNTS):
+            groups.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _analyze_pack_async(client: anthropic.AsyncAnthropic, limiter: _AIMDLimiter,
+                              items: list[dict]) -> dict[str, dict]:
+    """{account_id: analysis} for every account the packed reply covered validly."""
+    blocks = "\n\n".join(
+        f"=== account_id: {item['id']} ===\n{_account_text(item['tweets'], item['bio'])}"
+        for item in items
+    )
+    prompt = f"""Analyze each of these crypto/startup ecosystem accounts independently.
+
+{blocks}
+
+Record one analysis per account_id with the record_analyses tool."""
+
+    response = await _create_async(client, limiter, {
+        "model": _MODEL,
+        "max_tokens": _PACK_OUTPUT_TOKENS * len(items),
+        "system": _SYSTEM,
+        "tools": [_PACKED_TOOL],
+        "tool_choice": {"type": "tool", "name": _PACKED_TOOL["name"]},
+        "messages": [{"role": "user", "content": prompt}],
+    })
+    block = next((b for b in response.content if b.type == "tool_use"), None)
+    if block is None:
+        return {}
+
+    wanted = {item["id"] for item in items}
+    results: dict[str, dict] = {}
+    for item in block.input.get("analyses") or []:
+        if not isinstance(item, dict):
+            continue
+        account_id = str(item.get("account_id", "")).strip()
+        if account_id not in wanted or account_id in results:
+            continue
+        try:
+            results[account_id] = _validate_analysis(item)
+        except ValueError:
+            continue
+    return results
+
+
+def _apply_analysis(account: dict, result: dict):
+    account["tweet_analysis"] = result["description"]
+    account["entities"] = result["entities"]
+    account["account_type"] = result["account_type"]
+    account["one_liner"] = result["one_liner"]
+    account["sector"] = result["sector"]
+    account["token_status"] = result["token_status"]
+    account["stage"] = result["stage"]
+
+
+def _prepare(account: dict) -> dict:
+    """Budget an account's tweets once; the result feeds packing and both request paths."""
+    tweets, tokens = budget_tweets(account.get("tweet_texts", []))
+    bio = account.get("description", "") or ""
+    return {"id": str(account["id"]), "tweets": tweets, "bio": bio,
+            "tweet_tokens": tokens, "tokens": tokens + _estimate_tokens(bio)}
+
+
+async def _analyze_all(items: list[dict], concurrency: int, pack: bool) -> list[dict | Exception]:
+    limiter = _AIMDLimiter(_START_CONCURRENCY, concurrency)
+    progress = tqdm(total=len(items), desc="Analyzing tweets")
+    results: list[dict | Exception | None] = [None] * len(items)
+    groups = _pack_groups(items) if pack else [[i] for i in range(len(items))]
+    counts = {"packed": 0, "packed_failed": 0, "packed_accounts": 0, "single": 0}
+
+    # One client per event loop; retries are handled above so throttling feeds the limiter
+    async with anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY, max_retries=0) as client:
+        async def single(i: int):
+            item = items[i]
+            if item["tweets"] or item["bio"]:
+                counts["single"] += 1
+            try:
+                results[i] = await _analyze_tweets_async(client, limiter, item["tweets"], item["bio"])
+            except Exception as e:
+                results[i] = e
+            finally:
+                progress.update(1)
+
+        async def group(indices: list[int]):
+            if len(indices) == 1:
+                return await single(indices[0])
+            try:
+                packed = await _analyze_pack_async(client, limiter, [items[i] for i in indices])
+                counts["packed"] += 1
+            except Exception as e:
+                # Its accounts fall back to single requests; say why, or a systematic
+                # failure (auth, schema, tool definition) just doubles the call count
+                counts["packed_failed"] += 1
+                tqdm.write(f"  [warn] packed request for {len(indices)} account(s) failed, "
+                           f"retrying them singly: {type(e).__name__}: {e}")
+                packed = {}
+            leftover = []
+            for i in indices:
+                result = packed.get(items[i]["id"])
+                if result is None:
+                    leftover.append(i)
+                    continue
+                results[i] = result
+                counts["packed_accounts"] += 1
+                progress.update(1)
+            await asyncio.gather(*(single(i) for i in leftover))
+
+        try:
+            await asyncio.gather(*(group(g) for g in groups))
+        finally:
+            progress.close()
+
+    tokens = sum(item["tweet_tokens"] for item in items)
+    print(f"  Analysis: ~{tokens} tweet tokens across {len(items)} account(s); "
+          f"{counts['packed_accounts']} in {counts['packed']} packed request(s), "
+          f"{counts['single']} single request(s)"
+          + (f"; {counts['packed_failed']} packed request(s) failed" if counts["packed_failed"] else ""))
+    return results
+
+
+def analyze_accounts(accounts: list[dict], concurrency: int = _CONCURRENCY,
+                     pack: bool = True) -> list[dict]:
+    """
+    Analyze every account with up to `concurrency` Haiku requests in flight.
+    Tweets are budgeted once per account (tweet_tokens records the estimate);
+    with pack=True, small accounts share a request (see _pack_groups).
+    Results are applied in input order; a failed account gets the empty
+    fallback fields and a warning, as before.
+    """
+    items = [_prepare(a) for a in accounts]
+    results = asyncio.run(_analyze_all(items, concurrency, pack))
+    for account, item, result in zip(accounts, items, results):
+        account["tweet_tokens"] = item["tweet_tokens"]
+        if isinstance(result, Exception):
+            print(f"  [warn] analysis failed for {account.get('username', account['id'])}: {result}")
+            result = _empty_analysis()
+        _apply_analysis(account, result)
     return accounts
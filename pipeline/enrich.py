@@ -1,7 +1,9 @@
 import time
 from datetime import datetime
 from tqdm import tqdm
-from api.sorsa import get_profiles_batch, get_user_tweets
+from config import PROFILE_TWEET_SYNC_TTL_HOURS
+from api.sorsa import get_profiles_batch, profile_cache_stats
+from shared.tweet_store import recent_tweets
 
 
 def _parse_tweet_date(value: str) -> str:
@@ -16,9 +18,14 @@ def _parse_tweet_date(value: str) -> str:
 
 
 def enrich_profiles(accounts: list[dict]) -> list[dict]:
-    """Add profile fields to each account dict in-place."""
+    """
+    Add profile fields to each account dict in-place.
+
+    tweets_count decides whether enrich_tweets asks Sorsa for new tweets, so
+    profiles are only reused from the cache for PROFILE_TWEET_SYNC_TTL_HOURS.
+    """
     ids = [a["id"] for a in accounts]
-    profiles = get_profiles_batch(ids)
+    profiles = get_profiles_batch(ids, max_age_hours=PROFILE_TWEET_SYNC_TTL_HOURS)
     profile_map = {p["id"]: p for p in profiles}
 
     for account in accounts:
@@ -32,14 +39,24 @@ def enrich_profiles(accounts: list[dict]) -> list[dict]:
         account["verified"] = p.get("verified", False)
         account["created_at"] = p.get("created_at", "")
 
+    stats = profile_cache_stats()
+    print(f"  Profiles: {stats['hits']} cached, {stats['fetched']} fetched "
+          f"in {stats['batches']} batch(es) (hit rate {stats['hit_rate']:.0%})"
+          + (f", {stats['failed']} in failed batch(es)" if stats["failed"] else ""))
     return accounts
 
 
 def enrich_tweets(accounts: list[dict]) -> list[dict]:
-    """Fetch last 20 tweets for each account, add tweet texts and last tweet date."""
+    """
+    Add the last 20 tweet texts and last tweet date to each account.
+
+    Served from the local tweet store; Sorsa is only asked for tweets newer
+    than the stored ones, and not at all when tweets_count is unchanged.
+    """
+    fetched = 0
     for account in tqdm(accounts, desc="Fetching tweets"):
         try:
-            tweets = get_user_tweets(account["id"], max_tweets=20)
+            tweets, called = recent_tweets(account["id"], account.get("tweets_count"), limit=20)
             account["tweet_texts"] = [t.get("full_text", "") for t in tweets]
             if tweets:
                 account["last_tweet_date"] = _parse_tweet_date(tweets[0].get("created_at", ""))
@@ -49,5 +66,9 @@ def enrich_tweets(accounts: list[dict]) -> list[dict]:
             print(f"  [warn] tweets for {account['id']}: {e}")
             account["tweet_texts"] = []
             account["last_tweet_date"] = ""
-        time.sleep(0.5)
+            called = True
+        if called:
+            fetched += 1
+            time.sleep(0.5)
+    print(f"  Tweets: {fetched} fetched, {len(accounts) - fetched} served from cache")
     return accounts
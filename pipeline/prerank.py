@@ -0,0 +1,121 @@
+"""
+Embedding pre-ranker run between Phase 1 and Phase 2 scoring.
+
+Each candidate (bio, one-liner, tweet analysis) is embedded and compared
+with the active-thesis and investment-pattern sections of thesis.md. Its
+similarity is the best cosine over those sections. Only the top-K, plus
+anything at or above a similarity threshold, goes on to the Haiku scorer;
+the rest come back with their similarity and nearest section so the caller
+can mark them.
+
+Vectors are cached in state.db keyed by a hash of (model, input type, text),
+so unchanged thesis sections and re-queued candidates are never re-embedded.
+"""
+import math
+import sqlite3
+import hashlib
+from array import array
+
+from config import DB_PATH
+from pipeline.thesis import POSITIVE_CHAPTERS, load_sections, section_text
+
+MODEL = "voyage-4-lite"
+_EMBED_BATCH = 128  # Voyage inputs per request
+
+_voyage = None
+
+
+def _get_voyage():
+    global _voyage
+    if _voyage is None:
+        from voyageai import Client  # only needed when pre-ranking actually runs
+        _voyage = Client()
+    return _voyage
+
+
+# ── embedding cache ───────────────────────────────────────────────────────────
+
+def _conn() -> sqlite3.Connection:
+    con = sqlite3.connect(DB_PATH)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            key    TEXT PRIMARY KEY,
+            vector BLOB NOT NULL
+        )
+    """)
+    return con
+
+
+def _cache_key(text: str, input_type: str) -> str:
+    return hashlib.sha256(f"{MODEL}\0{input_type}\0{text}".encode()).hexdigest()
+
+
+def embed(texts: list[str], input_type: str) -> list[list[float]]:
+    """Vectors for texts (same order), embedding only those not already cached."""
+    keys = [_cache_key(t, input_type) for t in texts]
+    vectors: dict[str, list[float]] = {}
+    with _conn() as con:
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = con.execute(
+                f"SELECT key, vector FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            vectors.update((k, array("f", blob).tolist()) for k, blob in rows)
+
+    missing = list(dict.fromkeys((k, t) for k, t in zip(keys, texts) if k not in vectors))
+    for i in range(0, len(missing), _EMBED_BATCH):
+        batch = missing[i:i + _EMBED_BATCH]
+        result = _get_voyage().embed([t for _, t in batch], model=MODEL, input_type=input_type)
+        with _conn() as con:
+            for (k, _), vec in zip(batch, result.embeddings):
+                vectors[k] = vec
+                con.execute(
+                    "INSERT OR REPLACE INTO embedding_cache (key, vector) VALUES (?, ?)",
+                    (k, array("f", vec).tobytes()),
+                )
+    return [vectors[k] for k in keys]
+
+
+# ── ranking ───────────────────────────────────────────────────────────────────
+
+def _normalize(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+def candidate_text(page: dict) -> str:
+    parts = [page.get("bio", ""), page.get("one_liner", ""), page.get("description", "")]
+    return "\n".join(p for p in parts if p) or page.get("username", "")
+
+
+def prerank(candidates: list[dict], top_k: int | None = 50,
+            min_similarity: float | None = None) -> tuple[list[dict], list[dict]]:
+    """
+    Split candidates into (to_score, held_back). Every page gets
+    thesis_similarity and nearest_thesis set. A page is kept when it ranks
+    within top_k or reaches min_similarity; with both None everything is kept.
+    """
+    sections = [s for s in load_sections() if s["chapter"].startswith(POSITIVE_CHAPTERS)]
+    if not candidates or not sections:
+        return candidates, []
+
+    section_vecs = [_normalize(v) for v in embed([section_text(s) for s in sections], "document")]
+    page_vecs = [_normalize(v) for v in embed([candidate_text(p) for p in candidates], "query")]
+
+    for page, vec in zip(candidates, page_vecs):
+        sims = [sum(a * b for a, b in zip(vec, s)) for s in section_vecs]
+        best = max(range(len(sims)), key=sims.__getitem__)
+        page["thesis_similarity"] = round(sims[best], 4)
+        page["nearest_thesis"] = sections[best]["title"]
+
+    ranked = sorted(candidates, key=lambda p: p["thesis_similarity"], reverse=True)
+    if top_k is None and min_similarity is None:
+        return ranked, []
+
+    to_score, held_back = [], []
+    for rank, page in enumerate(ranked):
+        in_top = top_k is not None and rank < top_k
+        above = min_similarity is not None and page["thesis_similarity"] >= min_similarity
+        (to_score if in_top or above else held_back).append(page)
+    return to_score, held_back
@@ -0,0 +1,91 @@
+"""
+Re-score planner for thesis.md changes.
+
+Every Phase 2 score is logged in state.db with the hash of each thesis
+section it was scored against (state.record_score). When thesis.md changes,
+the planner diffs the stored hashes against the current ones and picks only
+the pages a changed section can affect:
+
+  - the section is the page's primary_thesis_match, open debate, or one of
+    its investment / pass patterns or hard disqualifiers;
+  - the section's title names one of the page's sectors ("2.4 RWA …" → RWA);
+  - the section is in a chapter every score depends on (Hard Disqualifiers).
+
+Everything else keeps its score and is re-tagged to the new version.
+
+A re-score writes Status = Scored, so only pages that are still Scored in
+Notion are re-scored (refresh_plan), from their current page data rather
+than the logged snapshot; a page that has moved on (Deep_Dived, …) keeps
+its status and score.
+"""
+import re
+
+from pipeline.thesis import refers_to, section_hashes, thesis_hash
+
+# Chapters whose changes can move any page's score
+GLOBAL_CHAPTERS = ("5.",)
+
+
+def _result_refs(result: dict) -> list[str]:
+    refs = [result.get("primary_thesis_match") or "", result.get("open_debate_relevance") or ""]
+    for field in ("investment_pattern_matches", "pass_pattern_matches", "hard_disqualifiers"):
+        refs.extend(result.get(field) or [])
+    return [r for r in refs if isinstance(r, str) and r.strip()]
+
+
+def _names_sector(title: str, sectors: list[str]) -> bool:
+    return any(re.search(rf'(?<![A-Za-z]){re.escape(s)}(?![A-Za-z])', title) for s in sectors if s)
+
+
+def changed_sections(old: dict[str, str], new: dict[str, str]) -> set[str]:
+    """Titles added, removed or edited between two section_hashes maps."""
+    return {t for t in old.keys() | new.keys() if old.get(t) != new.get(t)}
+
+
+def plan_rescore(log: list[dict], sections: list[dict]) -> tuple[list[dict], list[str], str, dict]:
+    """
+    Returns (plan, unaffected_page_ids, new thesis hash, new section hashes).
+    Each plan entry is {page, reasons: [changed section titles that touch it]}.
+    Scores already on the current version are neither planned nor re-tagged.
+    """
+    current = section_hashes(sections)
+    version = thesis_hash(current)
+    chapter_of = {s["title"]: s["chapter"] for s in sections}
+
+    plan, unaffected = [], []
+    for entry in log:
+        if entry["thesis_hash"] == version:
+            continue
+        changed = changed_sections(entry["section_hashes"], current)
+        refs = _result_refs(entry["result"])
+        sectors = entry["page"].get("sectors") or []
+
+        reasons = []
+        for title in sorted(changed):
+            if (chapter_of.get(title, "").startswith(GLOBAL_CHAPTERS)
+                    or any(refers_to(ref, title) for ref in refs)
+                    or _names_sector(title, sectors)):
+                reasons.append(title)
+
+        if reasons:
+            plan.append({"page": entry["page"], "reasons": reasons})
+        else:
+            unaffected.append(entry["page_id"])
+    return plan, unaffected, version, current
+
+
+def refresh_plan(plan: list[dict], scored_pages: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Split plan entries by their current Notion Status, given every page that
+    is Status = Scored now. Returns (plan on the fresh page data, entries whose
+    page is no longer Scored).
+    """
+    current = {p["page_id"]: p for p in scored_pages}
+    kept, moved_on = [], []
+    for item in plan:
+        page = current.get(item["page"]["page_id"])
+        if page is None:
+            moved_on.append(item)
+        else:
+            kept.append({**item, "page": page})
+    return kept, moved_on
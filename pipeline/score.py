@@ -1,10 +1,9 @@
 import json
-from pathlib import Path
 import anthropic
 from config import ANTHROPIC_API_KEY
+from pipeline.thesis import THESIS_PATH
 
 _client = None
-THESIS_PATH = Path("thesis.md")
 
 _PROMPT = """\
 You are scoring a new project against the fund's investment thesis.
@@ -0,0 +1,110 @@
+"""
+Concurrent Phase 2 scoring with a streaming Notion write-back.
+
+A bounded pool of scoring workers feeds a queue; one writer thread drains it
+at Notion's rate limit, writing each score as soon as it is ready. A page is
+logged to state.db (state.record_score) only after its Notion write succeeds,
+so an interrupted run leaves an exact record of what was written and
+re-running picks up the rest (they are still Status = New). A failed log
+write is reported separately; the page still counts as written.
+
+Shared by run_score.py and run_rescore.py.
+"""
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+
+from api.notion import update_scoring
+from pipeline.score import score_project
+from shared.notion import _Throttle
+from state import record_score
+
+SCORE_WORKERS = 4
+WRITE_RATE = 3.0   # Notion writes/second
+_QUEUE_SIZE = 32   # scored-but-unwritten results held at once
+
+_DONE = object()
+
+
+def score_and_write(pages: list[dict], section_hashes: dict[str, str], thesis_hash: str,
+                    workers: int = SCORE_WORKERS, write_rate: float = WRITE_RATE,
+                    desc: str = "Scoring") -> tuple[list[tuple[dict, dict]], list[dict]]:
+    """
+    Score every page and write results back as they arrive.
+    Returns (written [(page, result)], failed pages), written in completion order.
+    """
+    pending: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+    written: list[tuple[dict, dict]] = []
+    failed: list[dict] = []
+    unlogged: list[dict] = []  # written to Notion, but missing from the state.db log
+    counts: Counter = Counter()
+    progress = tqdm(total=len(pages), desc=desc)
+    lock = threading.Lock()
+
+    def finish(page: dict, result: dict | None, error: Exception | None, stage: str):
+        with lock:
+            if error is None:
+                written.append((page, result))
+                counts[result.get("recommendation", "pass")] += 1
+            else:
+                failed.append(page)
+                counts["failed"] += 1
+                tqdm.write(f"  [warn] {stage} @{page.get('username', '?')}: {error}")
+            progress.update(1)
+            progress.set_postfix(dict(counts), refresh=False)
+
+    def writer():
+        throttle = _Throttle(write_rate)
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            page, result = item
+            throttle.wait()
+            try:
+                update_scoring(page["page_id"], result)
+            except Exception as e:
+                finish(page, None, e, "write")
+                continue
+            # Notion already shows the page as Scored; a log failure does not undo that
+            try:
+                record_score(page, result, section_hashes, thesis_hash)
+            except Exception as e:
+                unlogged.append(page)
+                tqdm.write(f"  [warn] log @{page.get('username', '?')}: written to Notion, not logged: {e}")
+            finish(page, result, None, "write")
+            if result.get("recommendation") == "deep_dive":
+                tqdm.write(f"  [{result.get('thesis_fit_score', 0):3d}] deep_dive @{page.get('username', '?')}")
+
+    def score(page: dict):
+        try:
+            result = score_project(page)
+        except Exception as e:
+            finish(page, None, e, "score")
+            return
+        pending.put((page, result))
+
+    writer_thread = threading.Thread(target=writer, name="notion-writer", daemon=True)
+    writer_thread.start()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for future in [pool.submit(score, p) for p in pages]:
+            future.result()
+    except BaseException:
+        # Ctrl-C / crash: drop queued work, but let in-flight scores finish and be written
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        pool.shutdown(wait=True)
+        pending.put(_DONE)
+        writer_thread.join()
+        progress.close()
+
+    if unlogged:
+        print(f"  [warn] {len(unlogged)} score(s) written to Notion but not logged in state.db "
+              f"(run_rescore.py will not see them): "
+              + ", ".join(f"@{p.get('username', '?')}" for p in unlogged))
+    return written, failed
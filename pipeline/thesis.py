@@ -0,0 +1,94 @@
+"""
+thesis.md split into addressable sections.
+
+Every "### " heading is one section, keyed by its heading text and tagged
+with the "## " chapter it sits in (Active Theses, Investment Patterns, …).
+Text directly under a chapter heading (e.g. Hard Disqualifiers, which has
+no sub-headings) is a section titled after the chapter. The scorer's
+primary_thesis_match and pattern names quote these headings.
+
+    sections = load_sections()
+    [s for s in sections if s["chapter"].startswith("2.")]   → active theses
+    section_text(sections[0])                                → "2.1 Consumer apps…\n\n<body>"
+    section_hashes(sections)                                 → {"2.1 Consumer apps…": "9f2c…", …}
+"""
+import re
+import json
+import hashlib
+from pathlib import Path
+
+THESIS_PATH = Path("thesis.md")
+
+_CHAPTER_RE = re.compile(r'^##\s+(.+?)\s*$')
+_SECTION_RE = re.compile(r'^###\s+(.+?)\s*$')
+
+# Chapters that describe what the fund wants to see — used for pre-ranking
+POSITIVE_CHAPTERS = ("2.", "3.")
+
+
+def section_text(section: dict) -> str:
+    return f"{section['title']}\n\n{section['body']}"
+
+
+def parse_sections(markdown: str) -> list[dict]:
+    """[{chapter, title, body}] in document order."""
+    sections: list[dict] = []
+    chapter, title, lines = "", None, []
+
+    def flush():
+        body = "\n".join(lines).strip().strip("-").strip()
+        if title is not None and body:
+            sections.append({"chapter": chapter, "title": title, "body": body})
+
+    for line in markdown.splitlines():
+        m = _CHAPTER_RE.match(line)
+        if m and not line.startswith("###"):
+            flush()
+            chapter = title = m.group(1)
+            lines = []
+            continue
+        m = _SECTION_RE.match(line)
+        if m:
+            flush()
+            title, lines = m.group(1), []
+            continue
+        if title is not None:
+            lines.append(line)
+    flush()
+    return sections
+
+
+def load_sections(path: Path = THESIS_PATH) -> list[dict]:
+    if not path.exists():
+        return []
+    return parse_sections(path.read_text())
+
+
+def section_hashes(sections: list[dict]) -> dict[str, str]:
+    """{title: short content hash} — what a stored score was scored against."""
+    return {s["title"]: hashlib.sha256(s["body"].encode()).hexdigest()[:16] for s in sections}
+
+
+def thesis_hash(hashes: dict[str, str]) -> str:
+    """One hash for the whole thesis version."""
+    return hashlib.sha256(json.dumps(hashes, sort_keys=True).encode()).hexdigest()[:16]
+
+
+_LABEL_RE = re.compile(r'^(\d+\.\d+|Pattern [A-Z]\d*|[A-Z]\d+|\d+\.)(?=\s|$)')
+
+
+def section_label(title: str) -> str:
+    """Short label a title starts with ("2.4", "Pattern B", "P3", "D1"), or the whole title."""
+    m = _LABEL_RE.match(title)
+    return m.group(1) if m else title
+
+
+def refers_to(ref: str, title: str) -> bool:
+    """Does a scorer-quoted name ("2.4 RWA on-chain…", "Pattern A", "D1 — Etherfi") mean this section?"""
+    ref = (ref or "").strip().lower()
+    if not ref or ref == "none":
+        return False
+    title_l = title.lower()
+    label = section_label(title).lower()
+    return (ref == title_l or ref == label or ref.startswith(label + " ")
+            or (len(ref) >= 12 and ref in title_l))
@@ -0,0 +1,91 @@
+"""
+Incremental re-scoring after thesis.md changes.
+
+Compares the thesis section hashes stored with each score (state.db
+score_log) against the current thesis.md and re-scores only the pages a
+changed section touches (see pipeline/rescore.py) and that are still
+Status = Scored in Notion, using their current page data; a page that has
+moved on (e.g. Deep_Dived) is left alone. Untouched scores are re-tagged to
+the new thesis version.
+
+Run:
+  python3 run_rescore.py --dry-run              # plan + estimated call count only
+  python3 run_rescore.py
+  python3 run_rescore.py --include-unversioned  # also re-score Scored pages with no logged version
+
+Flags:
+  --dry-run              Print the plan; no Haiku calls, no Notion writes.
+  --include-unversioned  Scored pages scored before versioning was added have
+                         no section hashes; re-score all of them too.
+"""
+
+import argparse
+from collections import Counter
+from datetime import datetime
+
+from api.notion import query_scored_accounts
+from pipeline.rescore import plan_rescore, refresh_plan
+from pipeline.score_runner import score_and_write, SCORE_WORKERS
+from pipeline.thesis import load_sections
+from state import init_score_log, get_score_log, retag_scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score pages affected by thesis.md changes")
+    parser.add_argument("--dry-run", action="store_true", help="Report the plan and estimated calls only")
+    parser.add_argument("--include-unversioned", action="store_true",
+                        help="Also re-score Scored pages with no logged thesis version")
+    parser.add_argument("--workers", type=int, default=SCORE_WORKERS,
+                        help=f"Concurrent scoring calls (default {SCORE_WORKERS})")
+    args = parser.parse_args()
+
+    print(f"\n=== Re-score Planner — {datetime.now().strftime('%Y-%m-%d %H:%M')} ===\n")
+
+    sections = load_sections()
+    if not sections:
+        print("thesis.md not found or empty — nothing to plan against.")
+        return
+
+    init_score_log()
+    log = get_score_log()
+    plan, unaffected, version, hashes = plan_rescore(log, sections)
+    current = len(log) - len(plan) - len(unaffected)
+    print(f"Logged scores: {len(log)}  (current version {version}: {current})")
+
+    unversioned: list[dict] = []
+    moved_on: list[dict] = []
+    if plan or args.include_unversioned:
+        # Re-scoring sets Status = Scored: leave pages that have moved on alone
+        scored = query_scored_accounts()
+        plan, moved_on = refresh_plan(plan, scored)
+        if args.include_unversioned:
+            logged = {e["page_id"] for e in log}
+            unversioned = [p for p in scored if p["page_id"] not in logged]
+            plan.extend({"page": p, "reasons": ["(no logged thesis version)"]} for p in unversioned)
+
+    section_counts = Counter(reason for item in plan for reason in item["reasons"])
+    print(f"Affected by thesis changes: {len(plan) - len(unversioned)}   unaffected: {len(unaffected)}"
+          + (f"   unversioned: {len(unversioned)}" if args.include_unversioned else ""))
+    for title, count in section_counts.most_common():
+        print(f"  {count:4d}  {title}")
+    if moved_on:
+        print(f"Skipped {len(moved_on)} affected page(s) no longer Scored in Notion: "
+              + ", ".join(f"@{item['page'].get('username', '?')}" for item in moved_on))
+
+    print(f"\nEstimated calls: {len(plan)} Haiku scoring call(s), {len(plan)} Notion write(s)")
+
+    if args.dry_run:
+        print("\n[dry-run] No calls made.")
+        return
+
+    if unaffected:
+        retag_scores(unaffected, hashes, version)
+        print(f"Re-tagged {len(unaffected)} unaffected score(s) to version {version}")
+
+    written, failed = score_and_write([item["page"] for item in plan], hashes, version,
+                                      workers=args.workers, desc="Re-scoring")
+    print(f"\nDone. {len(written)} re-scored, {len(failed)} failed.")
+
+
+if __name__ == "__main__":
+    main()
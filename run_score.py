@@ -3,24 +3,69 @@ Scoring pipeline — Phase 1 + Phase 2
 
 Phase 1: pull all Status=New pages from Notion, hard-filter by type / tweet
          freshness / active-thesis sector overlap.
-Phase 2: score survivors with Claude Haiku against thesis.md, write results
-         back to Notion (Score, Recommendation, Scoring_JSON, Processed_At,
-         Status → Scored).
+Pre-rank: embed survivors and compare with the thesis sections; only the
+         top-K (or those above --min-similarity) go on to Phase 2. The rest
+         stay New for the next run, with their similarity written (only
+         when it changed, through the throttled shared.notion writer);
+         only pages below an absolute --min-similarity are marked Filtered.
+Phase 2: score survivors with Claude Haiku against thesis.md on a pool of
+         workers; a single rate-limited writer streams results back to
+         Notion (Score, Recommendation, Processed_At, Status → Scored) as
+         they finish. Written scores are logged in state.db, so an
+         interrupted run is safe to re-run.
 
 Run:
-  python3 score_run.py
+  python3 run_score.py
+  python3 run_score.py --top-k 30 --min-similarity 0.45
+  python3 run_score.py --no-prerank
 """
 
-import time
+import argparse
 from datetime import datetime
-from tqdm import tqdm
 
-from api.notion import query_new_accounts, update_scoring, update_filtered
+from api.notion import query_new_accounts, update_filtered
 from pipeline.score_filter import filter_candidates, EXCLUDED_SECTORS
-from pipeline.score import score_project
+from pipeline.prerank import prerank
+from pipeline.score_runner import score_and_write, SCORE_WORKERS
+from pipeline.thesis import load_sections, section_hashes, thesis_hash
+from shared.notion import PROP_NEAREST_THESIS, PROP_THESIS_SIMILARITY, property_ids, update_rows
+from state import init_score_log
+
+
+def _write_similarity(held_back: list[dict], stored: dict[str, tuple]):
+    """Write Thesis_Similarity / Nearest_Thesis to held-back pages whose values changed."""
+    ids = property_ids()
+    missing = [p for p in (PROP_THESIS_SIMILARITY, PROP_NEAREST_THESIS) if ids and p not in ids]
+    if missing:
+        print(f"  [warn] database has no {' / '.join(missing)} column; similarity not written")
+        return
+    updates = [
+        (page["page_id"], {PROP_THESIS_SIMILARITY: page["thesis_similarity"],
+                           PROP_NEAREST_THESIS: page["nearest_thesis"]})
+        for page in held_back
+        if stored.get(page["page_id"]) != (page["thesis_similarity"], page["nearest_thesis"])
+    ]
+    if not updates:
+        print(f"  Similarity unchanged for all {len(held_back)} held-back page(s)")
+        return
+    errors = update_rows(updates)
+    failed = sum(1 for err in errors if err)
+    print(f"  Similarity written to {len(updates) - failed} page(s)"
+          f" ({len(held_back) - len(updates)} unchanged)" + (f", {failed} failed" if failed else ""))
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Phase 1 filter + Phase 2 thesis scoring")
+    parser.add_argument("--top-k", type=int, default=50,
+                        help="Candidates sent to Phase 2 by thesis similarity (default 50)")
+    parser.add_argument("--min-similarity", type=float, default=None,
+                        help="Also score any candidate at or above this similarity; "
+                             "held-back candidates below it are marked Filtered")
+    parser.add_argument("--no-prerank", action="store_true", help="Score every Phase 1 survivor")
+    parser.add_argument("--workers", type=int, default=SCORE_WORKERS,
+                        help=f"Concurrent scoring calls (default {SCORE_WORKERS})")
+    args = parser.parse_args()
+
     print(f"\n=== Scoring Pipeline — {datetime.now().strftime('%Y-%m-%d %H:%M')} ===")
     print(f"Excluded sectors: {', '.join(sorted(EXCLUDED_SECTORS))}\n")
 
@@ -56,18 +101,43 @@ def main():
         print("No candidates passed Phase 1 filters.")
         return
 
+    # ── Pre-rank: thesis similarity ────────────────────────────────────────────
+    if not args.no_prerank:
+        # What the last run wrote; prerank overwrites these keys on the page
+        stored = {p["page_id"]: (p.get("thesis_similarity"), p.get("nearest_thesis") or "")
+                  for p in candidates}
+        try:
+            candidates, held_back = prerank(candidates, args.top_k, args.min_similarity)
+        except Exception as e:
+            print(f"  [warn] pre-ranking failed, scoring all candidates: {e}")
+            held_back = []
+        if held_back:
+            # Top-K is relative to this run's cohort: outranked pages stay New and
+            # compete again next run. Only an absolute floor drops a page for good.
+            drop = args.min_similarity is not None
+            print(f"Pre-rank: {len(candidates)} to score, {len(held_back)} held back "
+                  f"(best held-back similarity {held_back[0]['thesis_similarity']:.3f}), "
+                  + (f"marked Filtered (below {args.min_similarity})" if drop else "kept as New"))
+            if drop:
+                for page in held_back:
+                    try:
+                        reason = f"low_thesis_similarity:{page['thesis_similarity']:.3f} ({page['nearest_thesis']})"
+                        update_filtered(page["page_id"], reason)
+                    except Exception as e:
+                        print(f"  [warn] could not mark @{page.get('username', '?')}: {e}")
+            else:
+                _write_similarity(held_back, stored)
+            print()
+
     # ── Phase 2: score ─────────────────────────────────────────────────────────
     print(f"Phase 2: scoring {len(candidates)} candidate(s) against thesis...\n")
 
-    scored: list[tuple[dict, dict]] = []
-    for page in tqdm(candidates, desc="Scoring"):
-        try:
-            result = score_project(page)
-            update_scoring(page["page_id"], result)
-            scored.append((page, result))
-        except Exception as e:
-            print(f"\n  [warn] @{page.get('username', '?')}: {e}")
-        time.sleep(0.3)
+    # Scores are logged with the thesis version they were made against (run_rescore.py)
+    init_score_log()
+    hashes = section_hashes(load_sections())
+    version = thesis_hash(hashes)
+
+    scored, failed = score_and_write(candidates, hashes, version, workers=args.workers)
 
     # ── Summary ────────────────────────────────────────────────────────────────
     scored.sort(key=lambda x: x[1].get("thesis_fit_score", 0), reverse=True)
@@ -96,7 +166,8 @@ def main():
     print(f"\n  PASS: {len(passes)} project(s)")
     print(f"\n{sep}")
     print(f"  Done. {len(deep_dives)} deep dive(s), {len(watches)} watch(es), {len(passes)} pass(es).")
-    print(f"  All scores written to Notion (Status → Scored).")
+    print(f"  {len(scored)} score(s) written to Notion (Status → Scored)"
+          + (f", {len(failed)} failed — still New, re-run to retry." if failed else "."))
     print(sep)
 
 
@@ -0,0 +1,120 @@
+"""
+Golden checks + micro-benchmark for headline company-name extraction.
+
+Checks the docstring examples of both sources against shared/headlines.py,
+then times the single-alternation matcher against the old per-verb loop
+(one re.search per verb per headline) on a synthetic headline corpus.
+
+Run:
+  python3 scripts/bench_headlines.py
+  python3 scripts/bench_headlines.py --n 50000
+"""
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared import headlines
+from scripts import search_google_news as news
+from scripts import search_linkedin as linkedin
+
+NEWS_GOLDEN = [
+    ("XYZ Protocol Raises $5M Seed Round",               "XYZ Protocol"),
+    ("Stablecoin Infrastructure Startup Checker Raises", "Checker"),
+    ("DeFi Startup ABC Secures Pre-Seed",                "ABC"),
+    ("Frontera Labs Developer Raises $3M",               None),
+    ("Kalshi valuation hits $22B as prediction market raises $1B", None),
+    ("Exclusive: Geordie AI Series A has raised $12M",   "Geordie AI"),
+]
+
+LINKEDIN_GOLDEN = [
+    ("Kairos Protocol has raised $3M pre-seed",          "Kairos Protocol"),
+    ("Acme Labs led by Paradigm raises $4M",             "Acme Labs"),
+    ("Polsia Leads $12M Seed in Orbit",                  "Polsia"),
+    ("a16z invests 30M in Clouted",                      None),
+]
+
+_FILLER = ("DeFi", "Startup", "the", "Nova", "Finance", "Labs", "onchain", "payments",
+           "Series", "A", "$5M", "seed", "round", "after", "Paradigm", "Protocol")
+
+
+def _legacy_verb_pos(title: str) -> int | None:
+    """Pre-refactor verb search: one fresh re.search per verb per headline."""
+    lower = title.lower()
+    verb_pos = len(title)
+    for verb in news._ACTION_VERBS:
+        m = re.search(r'\b' + verb + r'\b', lower)
+        if m and m.start() < verb_pos:
+            verb_pos = m.start()
+    return None if verb_pos == len(title) else verb_pos
+
+
+def _compiled_verb_pos(title: str) -> int | None:
+    m = news._VERB_RE.search(title)
+    return m.start() if m else None
+
+
+def _corpus(n: int) -> list[str]:
+    rng = random.Random(7)
+    out = []
+    for _ in range(n):
+        words = [rng.choice(_FILLER) for _ in range(rng.randint(3, 12))]
+        words.insert(rng.randint(0, len(words)), rng.choice(news._ACTION_VERBS).capitalize())
+        out.append(" ".join(words))
+    return out
+
+
+def check_golden() -> int:
+    failures = 0
+    for label, fn, cases in (("news", news.extract_company_name, NEWS_GOLDEN),
+                             ("linkedin", linkedin.extract_company_name, LINKEDIN_GOLDEN)):
+        for title, expected in cases:
+            got = fn(title)
+            ok = got == expected
+            failures += not ok
+            print(f"  [{'ok' if ok else 'FAIL'}] {label:8s} {title!r:62s} → {got!r}")
+    return failures
+
+
+def _timed(fn, titles: list[str]) -> tuple[list, float]:
+    t0 = time.perf_counter()
+    out = fn(titles)
+    return out, (time.perf_counter() - t0) * 1e6 / len(titles)
+
+
+def bench(n: int):
+    titles = _corpus(n)
+
+    legacy, t_legacy = _timed(lambda ts: [_legacy_verb_pos(t) for t in ts], titles)
+    compiled, t_compiled = _timed(lambda ts: [_compiled_verb_pos(t) for t in ts], titles)
+    assert legacy == compiled, "verb matchers disagree"
+
+    single, t_single = _timed(lambda ts: [news.extract_company_name(t) for t in ts], titles)
+    batch, t_batch = _timed(lambda ts: headlines.extract_company_names(ts, news._VERB_RE), titles)
+    assert single == batch, "batch and single extraction disagree"
+
+    print(f"\n  {n} headlines, {len(set(titles))} distinct")
+    print(f"  verb search — per-verb loop : {t_legacy:7.2f} µs/title")
+    print(f"  verb search — alternation   : {t_compiled:7.2f} µs/title  ({t_legacy / t_compiled:.1f}x)")
+    print(f"  full extract — single       : {t_single:7.2f} µs/title")
+    print(f"  full extract — batch        : {t_batch:7.2f} µs/title")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000, help="Synthetic headlines to time")
+    args = parser.parse_args()
+
+    print("Golden examples:")
+    failures = check_golden()
+    bench(args.n)
+    if failures:
+        sys.exit(f"\n{failures} golden example(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Latency benchmark for the voting webapp: realistic sessions against a fake Notion.
+
+Starts scripts/fake_notion.py (fixed latency, optional 429 injection) and the
+webapp as subprocesses, like scripts/load_test_webapp.py, then has --users
+concurrent team members each run --sessions sessions of:
+
+  open the dashboard (/, /api/projects) → open a memo or two
+  → vote on a few projects → (partners) assign one → my assigned list
+  → reload the list with If-None-Match
+
+Reports p50/p95/p99 per route, errors, and upstream Notion calls (counted
+after the webapp has shut down and flushed its votes) per request.
+
+--save writes the results as JSON; --compare prints the change against a
+saved run and exits 1 when a route's p95, or the upstream calls per request,
+grew by more than --tolerance.
+
+Run:
+  python3 scripts/bench_webapp.py
+  python3 scripts/bench_webapp.py --users 30 --latency-ms 300 --rate-limit 0.05
+  python3 scripts/bench_webapp.py --save bench/webapp-before.json
+  python3 scripts/bench_webapp.py --compare bench/webapp-before.json
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx
+from itsdangerous import URLSafeSerializer
+
+from config import ASSIGNEES, TEAM_MEMBERS
+from scripts.load_test_webapp import _SECRET, _env, _start
+from webapp.app import PARTNERS
+
+_MIN_DELTA_MS = 5.0  # p95 changes smaller than this are noise, whatever the ratio
+
+
+def _pct(times: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted times."""
+    return times[min(len(times) - 1, max(0, round(q / 100 * len(times)) - 1))]
+
+
+class _Recorder:
+    def __init__(self):
+        self.samples: list[tuple[str, float, int]] = []  # (route, seconds, status)
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kw):
+        t0 = time.perf_counter()
+        r, status = None, 0
+        for attempt in range(2):
+            try:
+                r = await client.request(method, url, **kw)
+                status = r.status_code
+                break
+            except httpx.TransportError:
+                # The server closes a keep-alive connection after a 500; like a
+                # browser, retry an idempotent request once on a fresh one
+                if method != "GET" or attempt:
+                    break
+            except httpx.HTTPError:
+                break
+        self.samples.append((label, time.perf_counter() - t0, status))
+        return r
+
+
+async def _session(c: httpx.AsyncClient, rec: _Recorder, name: str, args, rng: random.Random):
+    async def think():
+        if args.think_ms:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+
+    await rec.call(c, "GET /", "GET", "/")
+    r = await rec.call(c, "GET /api/projects", "GET", "/api/projects")
+    if r is None or r.status_code != 200:
+        return
+    projects = r.json()
+    etag = r.headers.get("etag")
+    if not projects:
+        return
+    await think()
+
+    for p in rng.sample(projects, min(args.memos, len(projects))):
+        await rec.call(c, "GET /api/projects/{id}", "GET", f"/api/projects/{p['notion_id']}")
+        await think()
+
+    for p in rng.sample(projects, min(args.votes, len(projects))):
+        await rec.call(c, "POST /api/vote", "POST", "/api/vote",
+                       json={"notion_id": p["notion_id"], "vote": rng.choice(("up", "down"))})
+        await think()
+
+    if name in PARTNERS:
+        p = rng.choice(projects)
+        await rec.call(c, "POST /api/assign", "POST", "/api/assign",
+                       json={"notion_id": p["notion_id"],
+                             "assignees": rng.sample(ASSIGNEES, rng.randint(1, len(ASSIGNEES)))})
+        await think()
+
+    await rec.call(c, "GET /api/assigned", "GET", "/api/assigned")
+    await think()
+    await rec.call(c, "GET /api/projects (If-None-Match)", "GET", "/api/projects",
+                   headers={"If-None-Match": etag} if etag else {})
+
+
+async def _user(base: str, name: str, rec: _Recorder, args, seed: int):
+    rng = random.Random(seed)
+    cookie = URLSafeSerializer(_SECRET, salt="voter-session").dumps(name)
+    async with httpx.AsyncClient(base_url=base, cookies={"voter_session": cookie}, timeout=60,
+                                 headers={"Accept-Encoding": "gzip, br"}) as c:
+        for _ in range(args.sessions):
+            await _session(c, rec, name, args, rng)
+
+
+async def _run(base: str, args) -> tuple[_Recorder, float]:
+    rec = _Recorder()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _user(base, TEAM_MEMBERS[i % len(TEAM_MEMBERS)], rec, args, args.seed + i)
+        for i in range(args.users)
+    ))
+    return rec, time.perf_counter() - t0
+
+
+def _summarise(rec: _Recorder, elapsed: float, upstream: dict, args) -> dict:
+    routes = {}
+    for label in dict.fromkeys(label for label, _, _ in rec.samples):
+        times = sorted(t * 1000 for lbl, t, _ in rec.samples if lbl == label)
+        errors = sum(1 for lbl, _, s in rec.samples if lbl == label and not 200 <= s < 400)
+        routes[label] = {"n": len(times), "errors": errors,
+                         **{f"p{q}": round(_pct(times, q), 1) for q in (50, 95, 99)},
+                         "max": round(times[-1], 1)}
+    calls = sum(upstream["calls"].values())
+    return {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                 capture_output=True, text=True).stdout.strip(),
+        "config": {k: getattr(args, k) for k in ("users", "sessions", "memos", "votes", "think_ms",
+                                                 "projects", "latency_ms", "rate_limit", "seed")},
+        "requests": len(rec.samples),
+        "errors": sum(r["errors"] for r in routes.values()),
+        "elapsed_s": round(elapsed, 2),
+        "req_per_s": round(len(rec.samples) / elapsed, 1),
+        "routes": routes,
+        "upstream": upstream,
+        "upstream_per_request": round(calls / max(len(rec.samples), 1), 3),
+    }
+
+
+def _report(result: dict):
+    cfg = result["config"]
+    print(f"\n{result['requests']} requests, {cfg['users']} users × {cfg['sessions']} session(s), "
+          f"fake Notion {cfg['latency_ms']:.0f} ms/call, {cfg['rate_limit']:.0%} rate-limited, "
+          f"{cfg['projects']} projects")
+    print(f"  {result['req_per_s']:8.1f} req/s over {result['elapsed_s']:.1f}s, {result['errors']} error(s)")
+    print(f"  {'route':34s} {'n':>5s} {'err':>4s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}  (ms)")
+    for label, r in result["routes"].items():
+        print(f"  {label:34s} {r['n']:5d} {r['errors']:4d} {r['p50']:8.1f} {r['p95']:8.1f} "
+              f"{r['p99']:8.1f} {r['max']:8.1f}")
+    calls = result["upstream"]["calls"]
+    limited = result["upstream"]["rate_limited"]
+    print(f"  upstream Notion calls: {sum(calls.values())} "
+          f"({', '.join(f'{k}={v}' for k, v in sorted(calls.items()))}), "
+          f"{result['upstream_per_request']:.2f} per request"
+          + (f"; {sum(limited.values())} answered 429" if limited else ""))
+
+
+def _compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the change against a saved run; True when something regressed beyond tolerance."""
+    print(f"\nvs. {baseline.get('commit') or '?'} ({baseline.get('run_at', '?')}):")
+    if baseline.get("config") != result["config"]:
+        print("  [warning] run configuration differs from the baseline")
+    regressed = False
+    for label, r in result["routes"].items():
+        old = baseline.get("routes", {}).get(label)
+        if not old:
+            print(f"  {label:34s} (new route)")
+            continue
+        delta = r["p95"] - old["p95"]
+        worse = delta > _MIN_DELTA_MS and r["p95"] > old["p95"] * (1 + tolerance)
+        regressed |= worse
+        print(f"  {label:34s} p50 {old['p50']:7.1f} → {r['p50']:7.1f}   p95 {old['p95']:7.1f} → {r['p95']:7.1f}"
+              f"   p99 {old['p99']:7.1f} → {r['p99']:7.1f}" + ("   REGRESSED" if worse else ""))
+    old_calls, calls = baseline.get("upstream_per_request", 0), result["upstream_per_request"]
+    worse = calls > old_calls * (1 + tolerance) and calls - old_calls > 0.01
+    regressed |= worse
+    print(f"  upstream calls/request {old_calls:.3f} → {calls:.3f}" + ("   REGRESSED" if worse else ""))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voting webapp latency benchmark (fake Notion)")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent team members")
+    parser.add_argument("--sessions", type=int, default=3, help="Sessions per user")
+    parser.add_argument("--memos", type=int, default=2, help="Memos opened per session")
+    parser.add_argument("--votes", type=int, default=3, help="Votes cast per session")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between steps")
+    parser.add_argument("--projects", type=int, default=200, help="Projects in the fake voting queue")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake Notion latency per call")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of Notion calls answered 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 / upstream growth (0.2 = 20%%)")
+    parser.add_argument("--notion-port", type=int, default=8900)
+    parser.add_argument("--app-port", type=int, default=8901)
+    args = parser.parse_args()
+
+    env = _env(args.notion_port)
+    notion = _start([sys.executable, "scripts/fake_notion.py", "--port", str(args.notion_port),
+                     "--projects", str(args.projects), "--latency-ms", str(args.latency_ms),
+                     "--rate-limit", str(args.rate_limit)],
+                    env, args.notion_port)
+    try:
+        webapp = _start([sys.executable, "-m", "uvicorn", "webapp.app:app", "--port", str(args.app_port),
+                         "--log-level", "warning"], env, args.app_port)
+        try:
+            rec, elapsed = asyncio.run(_run(f"http://127.0.0.1:{args.app_port}", args))
+        finally:
+            webapp.terminate()  # shutdown flushes pending votes, so they are counted below
+            webapp.wait()
+        upstream = httpx.get(f"http://127.0.0.1:{args.notion_port}/_stats").json()
+    finally:
+        notion.terminate()
+        notion.wait()
+
+    result = _summarise(rec, elapsed, upstream, args)
+    _report(result)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nSaved to {args.save}")
+    if args.compare and _compare(result, json.loads(args.compare.read_text()), args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
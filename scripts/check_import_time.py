@@ -0,0 +1,98 @@
+"""
+Import-time budget for the webapp's cold start (vercel.json routes every
+request to webapp/app.py, so each cold start imports it).
+
+Imports webapp.app in a fresh interpreter under `python -X importtime`
+(--runs times, best run kept) and splits the cost into the web framework
+(FastAPI / Starlette / pydantic, which any handler pays) and everything
+else — this repo's modules and what they pull in. Fails (exit 1) when that
+remainder exceeds --budget-ms, or when an upstream client that should load
+lazily (requests, httpx, itsdangerous, python-dotenv, …) is imported at
+module load.
+
+Run:
+  python3 scripts/check_import_time.py
+  python3 scripts/check_import_time.py --budget-ms 20 --runs 10
+"""
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+MODULE = "webapp.app"
+FRAMEWORK = {"fastapi", "starlette", "pydantic", "pydantic_core", "anyio", "typing_extensions", "annotated_types"}
+# Imported on first use, never at module load
+LAZY = {"requests", "urllib3", "httpx", "httpcore", "itsdangerous", "dotenv", "anthropic", "brotli"}
+
+
+def _import_tree(module: str) -> list[tuple[int, int, str]]:
+    """(depth, cumulative µs, name) for every import under `module`, in -X importtime order."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                       cwd=ROOT, env=env, capture_output=True, text=True)
+    if r.returncode != 0:
+        sys.exit(f"import {module} failed:\n{r.stderr[-2000:]}")
+
+    rows: list[tuple[int, int, str]] = []
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+
+    # Imports are printed children-first: the module's subtree is everything
+    # after the previous top-level line
+    end = max(i for i, (depth, _, name) in enumerate(rows) if depth == 0 and name == module)
+    start = max((i for i, (depth, _, _) in enumerate(rows[:end]) if depth == 0), default=-1)
+    return rows[start + 1:end + 1]
+
+
+def measure(module: str) -> dict:
+    tree = _import_tree(module)
+    total = tree[-1][1]
+    children = [(us, name) for depth, us, name in tree if depth == 1]
+    framework = sum(us for us, name in children if name.split(".")[0] in FRAMEWORK)
+    return {
+        "total_ms": total / 1000,
+        "framework_ms": framework / 1000,
+        "app_ms": (total - framework) / 1000,
+        "heaviest": sorted(((us / 1000, name) for us, name in children
+                            if name.split(".")[0] not in FRAMEWORK), reverse=True)[:8],
+        "lazy_imported": sorted({name for _, _, name in tree if name.split(".")[0] in LAZY}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import-time budget for the webapp")
+    parser.add_argument("--budget-ms", type=float, default=25.0,
+                        help="Allowed import time beyond the web framework")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters; the fastest run counts")
+    args = parser.parse_args()
+
+    runs = [measure(MODULE) for _ in range(args.runs)]
+    best = min(runs, key=lambda m: m["app_ms"])
+    print(f"import {MODULE}: {best['total_ms']:.1f} ms "
+          f"(framework {best['framework_ms']:.1f} ms, rest {best['app_ms']:.1f} ms; "
+          f"best of {args.runs})")
+    for ms, name in best["heaviest"]:
+        print(f"  {ms:7.1f} ms  {name}")
+
+    failed = False
+    if best["app_ms"] > args.budget_ms:
+        print(f"FAIL: {best['app_ms']:.1f} ms beyond the framework, budget {args.budget_ms:.0f} ms")
+        failed = True
+    lazy = [name for name in best["lazy_imported"] if "." not in name]
+    if lazy and not (lazy == ["dotenv"] and (ROOT / ".env").exists()):  # .env is read when present
+        print(f"FAIL: imported at module load, should be lazy: {', '.join(lazy)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"OK (budget {args.budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
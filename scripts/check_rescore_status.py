@@ -0,0 +1,75 @@
+"""
+Offline check that a thesis edit never re-scores a page that has moved on.
+
+Builds a score log for two pages scored against the same thesis section,
+edits that section, and runs the planner the way run_rescore.py does: one
+page is still Scored in Notion, the other has since been Deep_Dived. Only
+the Scored page may be re-scored (re-scoring writes Status = Scored, which
+would drop the Deep_Dived one off the voting queue), and it must be
+re-scored from its current page data, not the logged snapshot.
+
+No network, no model calls. Exits 1 on failure.
+
+Run:
+  python3 scripts/check_rescore_status.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.rescore import plan_rescore, refresh_plan
+from pipeline.thesis import parse_sections, section_hashes, thesis_hash
+
+THESIS = """\
+## 2. Active Theses
+
+### 2.4 RWA on-chain, but credit/yield > tokenized equities
+{body}
+"""
+
+
+def _entry(page_id: str, username: str, old_hashes: dict[str, str]) -> dict:
+    page = {"page_id": page_id, "username": username, "sectors": ["RWA"],
+            "description": "logged snapshot", "status": "Scored"}
+    return {
+        "page_id": page_id,
+        "thesis_hash": thesis_hash(old_hashes),
+        "section_hashes": old_hashes,
+        "page": page,
+        "result": {"primary_thesis_match": "2.4 RWA on-chain, but credit/yield > tokenized equities"},
+    }
+
+
+def main():
+    old = section_hashes(parse_sections(THESIS.format(body="Credit first.")))
+    sections = parse_sections(THESIS.format(body="Credit first; tokenized treasuries too."))
+    log = [_entry("scored-1", "still_scored", old), _entry("deep-1", "deep_dived", old)]
+
+    plan, unaffected, _, _ = plan_rescore(log, sections)
+    failures = []
+    if {item["page"]["page_id"] for item in plan} != {"scored-1", "deep-1"} or unaffected:
+        failures.append(f"planner should pick both pages, got {[i['page']['page_id'] for i in plan]}")
+
+    # Notion now: scored-1 is still Scored (with a newer description), deep-1 is Deep_Dived
+    scored_now = [{"page_id": "scored-1", "username": "still_scored", "sectors": ["RWA"],
+                   "description": "current page", "status": "Scored"}]
+    plan, moved_on = refresh_plan(plan, scored_now)
+
+    planned = {item["page"]["page_id"]: item["page"] for item in plan}
+    if "deep-1" in planned:
+        failures.append("Deep_Dived page would be re-scored (and reset to Scored)")
+    if [item["page"]["page_id"] for item in moved_on] != ["deep-1"]:
+        failures.append(f"Deep_Dived page should be reported as moved on, got {moved_on}")
+    if planned.get("scored-1", {}).get("description") != "current page":
+        failures.append("Scored page should be re-scored from its current Notion data")
+
+    for f in failures:
+        print(f"FAIL: {f}")
+    if failures:
+        sys.exit(1)
+    print("OK: Deep_Dived page left alone; Scored page re-scored from current data")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,12 @@
 Funding enrichment — DeFiLlama first, Surf fallback.
 
 For each project with Recommendation = watch or deep_dive:
-  1. Try to match by name against the full DeFiLlama raises dataset (one API call upfront)
-  2. If no match → call Surf API by Twitter handle
-  3. Write results back to Notion
+  1. Match the project / display name (fuzzy) and X handle (exact only) against
+     the local DeFiLlama snapshot
+     (shared/defillama.py + shared/name_index.py) — all projects, in memory
+  2. If no match at or above --min-score → call Surf API by Twitter handle
+     (bounded worker pool, backs off on 429)
+  3. Write results back to Notion (throttled concurrent writer)
 
 Notion fields updated: Raised, Last Round Date, Last Round Amount,
 Last Round Valuation, Investors, Checked Fundraising.
@@ -13,12 +16,14 @@ Run:
   python3 scripts/enrich_funding.py
   python3 scripts/enrich_funding.py --dry-run        # preview without writing
   python3 scripts/enrich_funding.py --handle @yield  # test a single account
+  python3 scripts/enrich_funding.py --min-score 0.95 # stricter fuzzy matching (default 0.9)
+  python3 scripts/enrich_funding.py --workers 8      # more concurrent Surf lookups (default 4)
 """
 
 import sys
 import argparse
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -27,16 +32,23 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 load_dotenv(override=True)
 
-from config import SURF_API_KEY, DEFILLAMA_API_KEY
+from config import SURF_API_KEY
+from shared.defillama import refresh_raises, latest_raise, snapshot_size, all_name_keys
+from shared.name_index import NameIndex
 from shared.notion import (
-    update_row, _DB_URL, _HEADERS, _parse_page,
+    send_with_retry, update_rows, _DB_URL, _HEADERS, _parse_page,
     PROP_CHECKED_ON_SURF, PROP_RAISED, PROP_LAST_ROUND_DATE,
     PROP_LAST_ROUND_AMOUNT, PROP_LAST_ROUND_VALUATION, PROP_INVESTORS,
 )
 
 SURF_URL    = "https://api.asksurf.ai/gateway/v1/project/detail"
 SURF_FIELDS = "funding"
-DEFILLAMA_RAISES_URL = f"https://pro-api.llama.fi/{DEFILLAMA_API_KEY}/api/raises"
+SURF_WORKERS = 4   # concurrent Surf lookups
+SURF_RETRIES = 5   # attempts per handle when Surf returns 429
+
+# Fuzzy DeFiLlama matches below this score fall through to the (paid) Surf call;
+# kept high because a match is written to Notion as the project's funding
+MATCH_THRESHOLD = 0.9
 
 
 # ── DeFiLlama ─────────────────────────────────────────────────────────────────
@@ -53,44 +65,20 @@ def _fmt_amount(amount, round_name: str) -> str:
         return f"${amount}M {round_name}".strip()
 
 
-def fetch_defillama_index() -> dict[str, dict]:
+def load_defillama() -> NameIndex:
     """
-    Fetch all raises from DeFiLlama Pro and return a dict keyed by
-    lowercase project name. When a project has multiple rounds, we keep
-    the most recent one and sum the amounts for total_raise.
+    Bring the local DeFiLlama snapshot up to date and build the fuzzy name
+    index over it. Matched names are then looked up with an indexed query.
     """
-    print("Fetching DeFiLlama raises...", end=" ", flush=True)
+    print("Refreshing DeFiLlama snapshot...", end=" ", flush=True)
     try:
-        r = requests.get(DEFILLAMA_RAISES_URL, timeout=30)
-        r.raise_for_status()
-        raises = r.json().get("raises", [])
+        added = refresh_raises()
     except Exception as e:
-        print(f"[error: {e}] — will use Surf only")
-        return {}
-
-    # Group rounds by project name, keep most recent as primary
-    index: dict[str, dict] = {}
-    totals: dict[str, float] = {}
-
-    for raise_ in raises:
-        name = (raise_.get("name") or "").strip()
-        if not name:
-            continue
-        key = name.lower()
-        amount = raise_.get("amount") or 0
-
-        totals[key] = totals.get(key, 0) + float(amount)
-
-        existing = index.get(key)
-        if existing is None or raise_["date"] > existing["date"]:
-            index[key] = raise_
-
-    # Attach total_raise to each entry
-    for key, raise_ in index.items():
-        raise_["_total_raise"] = totals[key]
-
-    print(f"{len(raises)} raises → {len(index)} unique projects")
-    return index
+        print(f"[error: {e}] — using existing snapshot")
+        added = []
+    rounds, projects = snapshot_size()
+    print(f"{rounds} raises → {projects} unique projects ({len(added)} new)")
+    return NameIndex(all_name_keys())
 
 
 def parse_defillama(raise_: dict) -> dict:
@@ -120,37 +108,44 @@ def parse_defillama(raise_: dict) -> dict:
     }
 
 
-def match_defillama(project: dict, index: dict[str, dict]) -> dict | None:
+def match_defillama(project: dict, index: NameIndex,
+                    min_score: float = MATCH_THRESHOLD) -> dict | None:
     """
-    Try to match a Notion project against the DeFiLlama index.
-    Attempts: exact name → display name without common suffixes.
-    Returns the parsed funding dict or None.
+    Match a Notion project against the DeFiLlama snapshot by its extracted
+    project name (Project_Name — for founder accounts the display name is a
+    person) and display name, fuzzily at min_score or above. The X handle
+    only counts as an exact match: handles are often abbreviations that sit
+    close to some other project's name. Returns the parsed funding dict
+    (with match_name / match_score set, rounds summed over every DeFiLlama
+    spelling of the matched name) or None.
     """
-    candidates = []
-    name = (project.get("name") or "").strip().lower()
-    if name:
-        candidates.append(name)
-        # strip common suffixes to widen the match
-        for suffix in (" protocol", " finance", " network", " labs", " dao", " fi"):
-            if name.endswith(suffix):
-                candidates.append(name[: -len(suffix)].strip())
-
-    for candidate in candidates:
-        if candidate in index:
-            return parse_defillama(index[candidate])
-    return None
+    queries = [project.get("project_name"), project.get("name")]
+    name, score = index.best([q for q in queries if q], min_score=min_score)
+    if score < 1.0 and project.get("username"):
+        exact = index.exact(project["username"])
+        if exact is not None:
+            name, score = exact, 1.0
+    if name is None:
+        return None
+    raise_ = latest_raise(*index.aliases(name))
+    if raise_ is None:
+        return None
+    parsed = parse_defillama(raise_)
+    parsed["match_name"] = raise_.get("name", name)
+    parsed["match_score"] = score
+    return parsed
 
 
 # ── Surf ──────────────────────────────────────────────────────────────────────
 
 def fetch_surf(handle: str) -> dict | None:
-    """Call Surf API. Returns raw funding dict or None if not found."""
-    r = requests.get(
+    """Call Surf API. Returns raw funding dict or None if not found. Backs off on 429."""
+    r = send_with_retry(lambda: requests.get(
         SURF_URL,
         headers={"Authorization": f"Bearer {SURF_API_KEY}"},
         params={"handle": handle.lstrip("@"), "fields": SURF_FIELDS},
         timeout=30,
-    )
+    ), attempts=SURF_RETRIES)
     if r.status_code == 404:
         return None
     r.raise_for_status()
@@ -195,7 +190,7 @@ def parse_surf(funding: dict) -> dict:
 
 # ── Notion write ──────────────────────────────────────────────────────────────
 
-def write_funding(notion_id: str, parsed: dict):
+def funding_fields(parsed: dict) -> dict:
     fields = {PROP_CHECKED_ON_SURF: True, PROP_RAISED: parsed["raised"]}
     if parsed["last_date"]:
         fields[PROP_LAST_ROUND_DATE] = parsed["last_date"]
@@ -205,7 +200,7 @@ def write_funding(notion_id: str, parsed: dict):
         fields[PROP_LAST_ROUND_VALUATION] = parsed["last_valuation"]
     if parsed["investors"]:
         fields[PROP_INVESTORS] = parsed["investors"]
-    update_row(notion_id, fields)
+    return fields
 
 
 # ── main ──────────────────────────────────────────────────────────────────────
@@ -214,12 +209,15 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--handle", default=None, help="Test a single account e.g. @yield_xyz")
+    parser.add_argument("--workers", type=int, default=SURF_WORKERS, help="Concurrent Surf lookups")
+    parser.add_argument("--min-score", type=float, default=MATCH_THRESHOLD,
+                        help="Minimum fuzzy DeFiLlama match score before falling back to Surf")
     args = parser.parse_args()
 
     print(f"\n=== Funding Enrichment — {datetime.now().strftime('%Y-%m-%d %H:%M')} ===\n")
 
-    # Load DeFiLlama data once upfront
-    defillama_index = fetch_defillama_index()
+    # Refresh the DeFiLlama snapshot and build the name index once upfront
+    name_index = load_defillama()
     print()
 
     # Query Notion
@@ -266,76 +264,75 @@ def main():
             cursor = data.get("next_cursor")
         print(f"Found {len(projects)} unchecked projects (watch + deep_dive)\n")
 
-    from_defillama = from_surf = not_found = failed = 0
+    # Each pending write is (notion_id, fields, handle, counter it lands in)
+    writes: list[tuple[str, dict, str, str]] = []
+    counts = {"defillama": 0, "surf": 0, "not_found": 0, "failed": 0}
 
+    # ── Stage 1: DeFiLlama matching, all in memory ────────────────────────────
+    surf_queue: list[dict] = []
     for p in projects:
-        handle    = p.get("username", "")
-        notion_id = p["notion_id"]
-
-        print(f"  @{handle:<25}", end=" ", flush=True)
-
-        # 1. Try DeFiLlama first
-        parsed = match_defillama(p, defillama_index)
+        handle = p.get("username", "")
+        parsed = match_defillama(p, name_index, args.min_score)
         if parsed:
+            match_note = "" if parsed["match_score"] == 1.0 else f"~{parsed['match_score']:.2f} {parsed['match_name']!r}  "
             print(
-                f"[defillama] raised=True  "
+                f"  @{handle:<25} [defillama] {match_note}raised=True  "
                 f"latest={parsed['last_amount'] or 'n/a'}  "
                 f"investors={parsed['investors'] or '—'}"
             )
-            if not args.dry_run:
-                try:
-                    write_funding(notion_id, parsed)
-                except Exception as e:
-                    print(f"\n  [notion error] @{handle}: {e}")
-                    failed += 1
-                    continue
-            from_defillama += 1
-            time.sleep(0.3)
-            continue
-
-        # 2. Fall back to Surf
-        if not handle:
-            print("[no handle — skipping Surf]")
-            not_found += 1
-            continue
-
-        try:
-            funding = fetch_surf(handle)
-        except Exception as e:
-            print(f"[surf error] {e}")
-            failed += 1
-            time.sleep(1)
-            continue
-
-        if funding is None:
-            print("[not found in DeFiLlama or Surf]")
-            if not args.dry_run:
-                update_row(notion_id, {PROP_CHECKED_ON_SURF: True})
-            not_found += 1
-            time.sleep(0.5)
-            continue
-
-        parsed = parse_surf(funding)
-        print(
-            f"[surf]      raised={parsed['raised']}  "
-            f"latest={parsed['last_amount'] or 'n/a'}"
-        )
-
-        if not args.dry_run:
+            writes.append((p["notion_id"], funding_fields(parsed), handle, "defillama"))
+        elif not handle:
+            print(f"  @{handle:<25} [no handle — skipping Surf]")
+            counts["not_found"] += 1
+        else:
+            surf_queue.append(p)
+
+    # ── Stage 2: Surf fallback, bounded worker pool ───────────────────────────
+    if surf_queue:
+        print(f"\n  {len(surf_queue)} project(s) not in DeFiLlama — querying Surf "
+              f"({args.workers} workers)...\n")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(fetch_surf, p["username"]): p for p in surf_queue}
+        for fut in as_completed(futures):
+            p = futures[fut]
+            handle = p["username"]
             try:
-                write_funding(notion_id, parsed)
+                funding = fut.result()
             except Exception as e:
-                print(f"\n  [notion error] @{handle}: {e}")
-                failed += 1
-                time.sleep(1)
+                print(f"  @{handle:<25} [surf error] {e}")
+                counts["failed"] += 1
                 continue
 
-        from_surf += 1
-        time.sleep(0.5)
+            if funding is None:
+                print(f"  @{handle:<25} [not found in DeFiLlama or Surf]")
+                writes.append((p["notion_id"], {PROP_CHECKED_ON_SURF: True}, handle, "not_found"))
+                continue
+
+            parsed = parse_surf(funding)
+            print(
+                f"  @{handle:<25} [surf]      raised={parsed['raised']}  "
+                f"latest={parsed['last_amount'] or 'n/a'}"
+            )
+            writes.append((p["notion_id"], funding_fields(parsed), handle, "surf"))
+
+    # ── Stage 3: Notion writes, throttled + concurrent ────────────────────────
+    if args.dry_run:
+        errors = [None] * len(writes)
+    else:
+        print(f"\n  Writing {len(writes)} update(s) to Notion...")
+        errors = update_rows([(notion_id, fields) for notion_id, fields, _, _ in writes])
+
+    for (_, _, handle, source), err in zip(writes, errors):
+        if err is not None:
+            print(f"  [notion error] @{handle}: {err}")
+            counts["failed"] += 1
+        else:
+            counts[source] += 1
 
     sep = "─" * 55
     print(f"\n{sep}")
-    print(f"  DeFiLlama: {from_defillama}  |  Surf: {from_surf}  |  Not found: {not_found}  |  Errors: {failed}")
+    print(f"  DeFiLlama: {counts['defillama']}  |  Surf: {counts['surf']}  |  "
+          f"Not found: {counts['not_found']}  |  Errors: {counts['failed']}")
     if args.dry_run:
         print("  [dry-run] No changes written to Notion.")
     print(sep)
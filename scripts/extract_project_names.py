@@ -1,18 +1,35 @@
 """
-Extract the real project/company name from each voting-queue memo using Claude.
+Extract the real project/company name from each voting-queue memo.
 
 For founder accounts the display name is the person's name, not the project.
-Claude reads the memo and returns the actual project name.
+The memo's title block (`## [Project](site) 🟢` + one-liner) names the
+actual project, so most names are read from it with no model call; only
+memos without a usable heading go to Claude.
 
-Results are cached to data/project_names.json and served by the webapp API.
+Incremental: each memo head that a name was taken from is hashed into
+state.db (project_name_log). A project is looked at again only when it has
+no name yet or its memo head changed, so a daily run on a day without new
+memos makes no model calls at all.
+
+Only the title block and the first _HEAD_CHARS of each memo are sent, and up
+to _PACK_SIZE projects share one request (a forced record_project_names tool
+call); anything the packed reply misses is asked for on its own.
+
+Names are written to the page's Project_Name property, next to the rest of
+the project data, so the webapp picks them up on its next cache refresh —
+no redeploy. Entries in the old webapp/project_names.json are imported
+without a call.
 
 Run:
   python3 scripts/extract_project_names.py
   python3 scripts/extract_project_names.py --dry-run   # print without saving
+  python3 scripts/extract_project_names.py --all       # ignore the memo hashes
 """
 
+import re
 import sys
 import json
+import hashlib
 import argparse
 from pathlib import Path
 
@@ -21,79 +38,211 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 load_dotenv(override=True)
 
-import anthropic
-from shared.notion import query_voting_projects
+from shared.notion import (
+    PROP_MEMO, PROP_NAME, PROP_PROJECT_NAME, PROP_USERNAME,
+    query_voting_projects, update_rows,
+)
+from state import get_project_name_log, init_project_name_log, record_project_names
 
-CACHE_PATH = Path(__file__).parent.parent / "webapp" / "project_names.json"
+# Pre-Notion name cache; read once to backfill Project_Name, no longer written
+LEGACY_PATH = Path(__file__).parent.parent / "webapp" / "project_names.json"
 MODEL = "claude-haiku-4-5-20251001"
 
-PROMPT = """\
-You are reading a deal-sourcing memo for a startup or crypto project.
+_HEAD_CHARS = 400   # memo text sent per project (title block + one-liner fit)
+_PACK_SIZE = 25     # projects per packed request
+_MAX_NAME_WORDS = 6
 
-Display name on the X (Twitter) account: {display_name}
+_PROPS = (PROP_NAME, PROP_USERNAME, PROP_MEMO, PROP_PROJECT_NAME)
 
-Memo (first 800 chars):
-{memo}
+# "## [Project](https://site) 🟢" or "## Project 🟡"
+_HEADING = re.compile(r"^#{1,3}\s+(?:\[([^\]]+)\]\([^)]*\)|(.+?))\s*[🟢🟡🔴]?\s*$")
 
-Extract the actual project or company name being built.
+PROMPT = """\
+You are reading the heads of deal-sourcing memos for startups and crypto projects.
+For each entry, extract the actual project or company name being built.
 - If the account IS the project (e.g. display name "BlockRunAI" = the project), return the display name as-is.
 - If the account belongs to a founder or team member, return the project/company name they are building.
-- Return ONLY the project name — no explanation, no punctuation, no extra words.
-"""
+- Return only the name — no explanation, no punctuation, no extra words.
 
+Call record_project_names once with one entry per id.
 
-def extract(client: anthropic.Anthropic, display_name: str, memo: str) -> str:
+{entries}
+"""
+
+_TOOL = {
+    "name": "record_project_names",
+    "description": "Record the extracted project name for each entry, keyed by the id given in the prompt.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "names": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "project_name": {"type": "string"},
+                    },
+                    "required": ["id", "project_name"],
+                },
+            },
+        },
+        "required": ["names"],
+    },
+}
+
+
+def memo_head(memo: str) -> str:
+    """The part of a memo a name is read from: leading text up to _HEAD_CHARS."""
+    return memo.strip()[:_HEAD_CHARS]
+
+
+def memo_hash(display_name: str, head: str) -> str:
+    return hashlib.blake2b(f"{display_name}\n{head}".encode(), digest_size=12).hexdigest()
+
+
+def title_name(head: str) -> str:
+    """Project name from the memo's `## [Name](site)` heading, or "" if it has none."""
+    for line in head.splitlines():
+        if not line.strip():
+            continue
+        m = _HEADING.match(line.strip())
+        if not m:
+            return ""
+        name = (m.group(1) or m.group(2) or "").strip().strip("*_`\"'")
+        if not name or len(name.split()) > _MAX_NAME_WORDS or name.lower() in ("overview", "summary"):
+            return ""
+        return name
+    return ""
+
+
+def _clean(name) -> str:
+    return str(name or "").strip().strip("\"'").strip()
+
+
+def extract_packed(client, items: list[dict]) -> dict[str, str]:
+    """{notion_id: name} for every item the packed reply named; items are {notion_id, display_name, head}."""
+    ids = {str(i): item["notion_id"] for i, item in enumerate(items)}
+    entries = "\n\n".join(
+        f"<entry id=\"{i}\">\nDisplay name on the X (Twitter) account: {item['display_name']}\n"
+        f"Memo head:\n{item['head']}\n</entry>"
+        for i, item in enumerate(items)
+    )
     msg = client.messages.create(
         model=MODEL,
-        max_tokens=30,
-        messages=[{
-            "role": "user",
-            "content": PROMPT.format(display_name=display_name, memo=memo[:800]),
-        }],
+        max_tokens=100 + 30 * len(items),
+        tools=[_TOOL],
+        tool_choice={"type": "tool", "name": _TOOL["name"]},
+        messages=[{"role": "user", "content": PROMPT.format(entries=entries)}],
     )
-    return msg.content[0].text.strip().strip("\"'")
+    block = next((b for b in msg.content if b.type == "tool_use"), None)
+    if block is None:
+        return {}
+
+    names: dict[str, str] = {}
+    for entry in block.input.get("names") or []:
+        if not isinstance(entry, dict):
+            continue
+        notion_id = ids.get(str(entry.get("id", "")).strip())
+        name = _clean(entry.get("project_name"))
+        if notion_id and name and notion_id not in names:
+            names[notion_id] = name
+    return names
+
+
+def extract_all(items: list[dict]) -> dict[str, str]:
+    """Names for items via packed requests, retrying what a pack missed one at a time."""
+    import anthropic
+    client = anthropic.Anthropic()
+    names: dict[str, str] = {}
+    calls = 0
+    for start in range(0, len(items), _PACK_SIZE):
+        pack = items[start:start + _PACK_SIZE]
+        try:
+            names.update(extract_packed(client, pack))
+        except anthropic.APIError as e:
+            print(f"  [packed request failed] {e}")
+        calls += 1
+        for item in pack:
+            if item["notion_id"] in names:
+                continue
+            try:
+                names.update(extract_packed(client, [item]))
+            except anthropic.APIError as e:
+                print(f"  [failed] {item['display_name']!r}: {e}")
+            calls += 1
+    print(f"  {calls} model request(s) for {len(items)} memo(s)")
+    return names
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--all", action="store_true", help="Re-derive every name, ignoring memo hashes")
     args = parser.parse_args()
 
-    client = anthropic.Anthropic()
-    projects = query_voting_projects()
-
-    # Load existing cache so we don't re-call for already-resolved entries
-    cache: dict[str, str] = {}
-    if CACHE_PATH.exists():
-        cache = json.loads(CACHE_PATH.read_text())
+    init_project_name_log()
+    log = {} if args.all else get_project_name_log()
+    projects = query_voting_projects(_PROPS)
+    legacy: dict[str, str] = json.loads(LEGACY_PATH.read_text()) if LEGACY_PATH.exists() else {}
 
-    updated = 0
-    skipped = 0
+    names: dict[str, str] = {}          # notion_id → name to store
+    hashes: dict[str, str] = {}         # notion_id → hash of the memo head it came from
+    adopted: list[tuple[str, str, str]] = []
+    to_model: list[dict] = []
+    unchanged = from_title = imported = 0
     for p in projects:
         if not p.get("memo"):
             continue
-
         notion_id = p["notion_id"]
         display_name = p["name"] or p["username"]
+        head = memo_head(p["memo"])
+        h = memo_hash(display_name, head)
+        current = p.get("project_name") or ""
 
-        if notion_id in cache and not args.dry_run:
-            print(f"@{p['username']:20s}  {display_name!r:35s}  →  {cache[notion_id]!r}  (cached)")
-            skipped += 1
+        if current and log.get(notion_id) == h:
+            unchanged += 1
+            continue
+        if current and notion_id not in log and not args.all:
+            # Named before the log existed (or by hand): trust it for this memo
+            adopted.append((notion_id, h, current))
+            unchanged += 1
             continue
 
-        project_name = extract(client, display_name, p["memo"])
-        print(f"@{p['username']:20s}  {display_name!r:35s}  →  {project_name!r}")
-
-        if project_name and project_name.lower() != display_name.lower():
-            cache[notion_id] = project_name
-            updated += 1
-
-    print(f"\n{updated} new entries extracted, {skipped} already cached.")
-
-    if not args.dry_run:
-        CACHE_PATH.parent.mkdir(exist_ok=True)
-        CACHE_PATH.write_text(json.dumps(cache, indent=2, ensure_ascii=False))
-        print(f"Saved to {CACHE_PATH}")
+        hashes[notion_id] = h
+        if not current and notion_id in legacy:
+            names[notion_id] = legacy[notion_id]
+            imported += 1
+        elif name := title_name(head):
+            names[notion_id] = name
+            from_title += 1
+        else:
+            to_model.append({"notion_id": notion_id, "display_name": display_name, "head": head})
+
+    print(f"{len(projects)} voting project(s): {unchanged} unchanged, {imported} from {LEGACY_PATH.name}, "
+          f"{from_title} from memo titles, {len(to_model)} to extract")
+    if to_model:
+        names.update(extract_all(to_model))
+
+    by_id = {p["notion_id"]: p for p in projects}
+    updates: list[tuple[str, dict]] = []
+    for notion_id, name in names.items():
+        p = by_id[notion_id]
+        if name != (p.get("project_name") or ""):
+            print(f"@{p['username']:20s}  {(p['name'] or p['username'])!r:35s}  →  {name!r}")
+            updates.append((notion_id, {PROP_PROJECT_NAME: name}))
+    print(f"\n{len(updates)} name(s) to write.")
+
+    if args.dry_run:
+        return
+
+    failed: set[str] = set()
+    if updates:
+        errors = update_rows(updates)
+        failed = {nid for (nid, _), err in zip(updates, errors) if err}
+        print(f"Wrote {len(updates) - len(failed)} to Notion ({PROP_PROJECT_NAME})"
+              + (f", {len(failed)} failed." if failed else "."))
+    record_project_names(adopted + [(nid, hashes[nid], name) for nid, name in names.items() if nid not in failed])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+"""
+Local fake of the Notion endpoints the voting webapp uses, for load tests.
+
+Serves the database schema, database query (with the and / select /
+checkbox / rich_text filters the webapp sends, filter_properties, sorts
+ignored, 100-row pages), page GET and page PATCH over a synthetic voting
+queue, each after a fixed latency. A --rate-limit fraction of calls is
+answered 429 with a Retry-After, like Notion's 3 req/s limit. GET /_stats
+returns upstream call counts ({"calls": {...}, "rate_limited": {...}}).
+
+Point the webapp at it with NOTION_API_URL=http://127.0.0.1:<port>.
+
+Run:
+  python3 scripts/fake_notion.py --port 8900 --projects 200 --latency-ms 300
+  python3 scripts/fake_notion.py --rate-limit 0.05 --retry-after 0.5
+"""
+import sys
+import random
+import asyncio
+import argparse
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, HTTPException, Request
+
+from config import ASSIGNEES
+from shared.notion import (
+    PROP_NAME, PROP_USERNAME, PROP_STATUS, PROP_RECOMMENDATION, PROP_SCORE,
+    PROP_ONE_LINER, PROP_MEMO, PROP_SECTOR, PROP_PROCESSED_AT, PROP_VOTE_UP,
+    PROP_VOTE_DOWN, PROP_VOTERS, PROP_VOTE_REVIEWED, PROP_ASSIGNED_TO, PROP_PROJECT_NAME,
+    _FIELD_TYPES, _serialise,
+)
+
+_MEMO = "## Overview\n" + "Synthetic deep-dive memo paragraph. " * 150
+
+
+def _readable(prop: dict) -> dict:
+    """A serialised (write-format) property as Notion returns it on read."""
+    for key in ("title", "rich_text"):
+        if key in prop:
+            return {key: [{"plain_text": c["text"]["content"]} for c in prop[key]]}
+    return prop
+
+
+def _page(i: int) -> dict:
+    fields = {
+        PROP_NAME:           f"Project {i}",
+        PROP_USERNAME:       f"project{i}",
+        PROP_STATUS:         "Deep_Dived",
+        PROP_RECOMMENDATION: "watch",
+        PROP_SCORE:          90 - i % 40,
+        PROP_ONE_LINER:      f"Project {i} builds onchain infrastructure.",
+        PROP_MEMO:           _MEMO,
+        PROP_SECTOR:         ["DeFi"],
+        PROP_PROCESSED_AT:   (date.today() - timedelta(days=i % 10)).isoformat(),
+        PROP_VOTE_UP:        0,
+        PROP_VOTE_DOWN:      0,
+        PROP_VOTERS:         "{}",
+        PROP_VOTE_REVIEWED:  False,
+        PROP_ASSIGNED_TO:    f'["{ASSIGNEES[i % len(ASSIGNEES)]}"]' if i % 3 == 0 else "[]",
+        PROP_PROJECT_NAME:   f"Protocol {i}" if i % 2 else "",
+    }
+    return {
+        "id": f"00000000-0000-4000-8000-{i:012d}",
+        "last_edited_time": _now(),
+        "properties": {name: _readable(_serialise(name, v)) for name, v in fields.items()},
+    }
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+# Property ids as Notion reports them in the database schema
+_IDS = {name: ("title" if ptype == "title" else f"p{i}") for i, (name, ptype) in enumerate(_FIELD_TYPES.items())}
+
+
+def _text(prop: dict) -> str:
+    return "".join(c.get("plain_text", "") for c in prop.get("rich_text", []) + prop.get("title", []))
+
+
+def _matches(page: dict, flt: dict | None) -> bool:
+    if not flt:
+        return True
+    if "and" in flt:
+        return all(_matches(page, f) for f in flt["and"])
+    if "or" in flt:
+        return any(_matches(page, f) for f in flt["or"])
+    prop = page["properties"].get(flt["property"], {})
+    if "select" in flt:
+        return (prop.get("select") or {}).get("name") == flt["select"].get("equals")
+    if "checkbox" in flt:
+        return bool(prop.get("checkbox")) == flt["checkbox"].get("equals")
+    if "rich_text" in flt:
+        return flt["rich_text"].get("contains", "") in _text(prop)
+    return True
+
+
+def build_app(n_projects: int = 200, latency_ms: float = 300.0,
+              rate_limit: float = 0.0, retry_after: float = 0.5) -> FastAPI:
+    app = FastAPI(title="Fake Notion")
+    pages = {p["id"]: p for p in (_page(i) for i in range(n_projects))}
+    stats: Counter = Counter()
+    throttled: Counter = Counter()
+
+    async def upstream(kind: str):
+        stats[kind] += 1
+        await asyncio.sleep(latency_ms / 1000)
+        if rate_limit and random.random() < rate_limit:
+            throttled[kind] += 1
+            raise HTTPException(status_code=429, detail="rate_limited",
+                                headers={"Retry-After": f"{retry_after:g}"})
+
+    @app.get("/databases/{database_id}")
+    async def schema(database_id: str):
+        await upstream("schema")
+        return {"properties": {name: {"id": pid, "type": _FIELD_TYPES[name]} for name, pid in _IDS.items()}}
+
+    @app.post("/databases/{database_id}/query")
+    async def query(database_id: str, request: Request):
+        body = await request.json()
+        await upstream("query")
+        rows = [p for p in pages.values() if _matches(p, body.get("filter"))]
+        start = int(body.get("start_cursor") or 0)
+        size = min(int(body.get("page_size", 100)), 100)
+        more = start + size < len(rows)
+        wanted = set(request.query_params.getlist("filter_properties"))
+        if wanted:
+            rows = [{**p, "properties": {n: v for n, v in p["properties"].items() if _IDS.get(n) in wanted}}
+                    for p in rows]
+        return {"results": rows[start:start + size], "has_more": more,
+                "next_cursor": str(start + size) if more else None}
+
+    @app.get("/pages/{page_id}")
+    async def get_page(page_id: str):
+        await upstream("get")
+        if page_id not in pages:
+            raise HTTPException(status_code=404)
+        return pages[page_id]
+
+    @app.patch("/pages/{page_id}")
+    async def patch_page(page_id: str, request: Request):
+        body = await request.json()
+        await upstream("patch")
+        if page_id not in pages:
+            raise HTTPException(status_code=404)
+        for name, prop in body.get("properties", {}).items():
+            if name in _FIELD_TYPES or name in pages[page_id]["properties"]:
+                pages[page_id]["properties"][name] = _readable(prop)
+        pages[page_id]["last_edited_time"] = _now()
+        return pages[page_id]
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {"calls": dict(stats), "rate_limited": dict(throttled)}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Notion API for webapp load tests")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--projects", type=int, default=200, help="Projects in the voting queue")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Delay added to every call")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of calls answered 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After (seconds) sent with a 429")
+    args = parser.parse_args()
+    app = build_app(args.projects, args.latency_ms, args.rate_limit, args.retry_after)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,32 +5,43 @@ Fetches crypto fundraising rounds from DeFiLlama Pro API (last N days),
 resolves X handles via DeFiLlama protocol pages + Sorsa search fallback,
 and pushes new entries to Notion with Status = "New" and funding data pre-filled.
 
+Raises are read from the local snapshot in state.db (shared/defillama.py),
+refreshed incrementally; rounds handled on a previous run are not re-processed.
+New raises are handled in bulk: one Notion name index for dedup, concurrent
+handle resolution, one info-batch call series for all profiles, then
+throttled concurrent page creation.
+
 Usage:
     python3 scripts/fetch_defillama_raises.py            # live run (last 30 days)
     python3 scripts/fetch_defillama_raises.py --dry-run  # skip Notion writes
     python3 scripts/fetch_defillama_raises.py --days 7   # last 7 days
-    python3 scripts/fetch_defillama_raises.py --sample   # print raw API output and exit
+    python3 scripts/fetch_defillama_raises.py --sample   # print raw raises from the snapshot and exit
 """
 import argparse
 import json
 import re
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
 import requests
 
 sys.path.insert(0, ".")
-from config import NOTION_TOKEN, NOTION_DATABASE_ID, EXA_API_KEY, DEFILLAMA_API_KEY
+from config import NOTION_TOKEN, NOTION_DATABASE_ID, EXA_API_KEY
 from api.sorsa import search_tweets, username_to_id, get_profiles_batch
+from shared.defillama import (
+    refresh_raises, pending_raises, raises_since, mark_processed, snapshot_size,
+)
+from shared.notion import query_all_names, send_with_retry, throttled_map
 from exa_py import Exa
+from shared.single_flight import CoalescedClient
 
-_exa: Exa | None = None
+_exa: CoalescedClient | None = None
 
-def _get_exa() -> Exa:
+def _get_exa() -> CoalescedClient:
     global _exa
     if _exa is None:
-        _exa = Exa(EXA_API_KEY)
+        _exa = CoalescedClient(Exa(EXA_API_KEY), "exa")
     return _exa
 
 # Matches twitter.com/handle or x.com/handle — same pattern as search_thematic.py
@@ -49,9 +60,9 @@ def _extract_handle(text: str) -> str | None:
             return h
     return None
 
-# ── Auth ──────────────────────────────────────────────────────────────────────
-RAISES_URL = f"https://pro-api.llama.fi/{DEFILLAMA_API_KEY}/api/raises"
+RESOLVE_WORKERS = 4  # concurrent handle / id lookups (Exa, DeFiLlama, Sorsa)
 
+# ── Auth ──────────────────────────────────────────────────────────────────────
 _NOTION_HEADERS = {
     "Authorization": f"Bearer {NOTION_TOKEN}",
     "Content-Type": "application/json",
@@ -142,12 +153,6 @@ def _format_amount(amount, round_name: str) -> str:
 
 # ── DeFiLlama ─────────────────────────────────────────────────────────────────
 
-def fetch_raises() -> list[dict]:
-    r = requests.get(RAISES_URL, timeout=30)
-    r.raise_for_status()
-    return r.json().get("raises", [])
-
-
 def get_protocol_twitter(defillama_id: str) -> str | None:
     if not defillama_id:
         return None
@@ -232,19 +237,12 @@ def _date(v):
 
 # ── Notion helpers ────────────────────────────────────────────────────────────
 
-def name_exists(name: str) -> bool:
-    payload = {
-        "filter": {"property": "Name", "title": {"equals": name}},
-        "page_size": 1,
-    }
-    r = requests.post(
-        f"https://api.notion.com/v1/databases/{NOTION_DATABASE_ID}/query",
-        headers=_NOTION_HEADERS,
-        json=payload,
-        timeout=30,
-    )
-    r.raise_for_status()
-    return len(r.json().get("results", [])) > 0
+def _safe_username_to_id(handle: str) -> str | None:
+    try:
+        return username_to_id(handle)
+    except Exception as e:
+        print(f"  [sorsa] @{handle}: {e}")
+        return None
 
 
 def push_to_notion(raise_: dict, handle: str | None, profile: dict | None) -> str:
@@ -285,7 +283,9 @@ def push_to_notion(raise_: dict, handle: str | None, profile: dict | None) -> st
         properties["Verified"] = _checkbox(profile.get("verified", False))
 
     payload = {"parent": {"database_id": NOTION_DATABASE_ID}, "properties": properties}
-    r = requests.post("https://api.notion.com/v1/pages", headers=_NOTION_HEADERS, json=payload, timeout=30)
+    r = send_with_retry(
+        lambda: requests.post("https://api.notion.com/v1/pages", headers=_NOTION_HEADERS, json=payload, timeout=30)
+    )
     if not r.ok:
         print(f"  [notion error] {r.status_code}: {r.text}")
     r.raise_for_status()
@@ -301,64 +301,102 @@ def main():
     parser.add_argument("--sample", action="store_true", help="Print raw API output and exit")
     args = parser.parse_args()
 
-    print("Fetching raises from DeFiLlama Pro API…")
-    all_raises = fetch_raises()
-    print(f"Total raises in dataset: {len(all_raises)}")
+    print("Refreshing local DeFiLlama snapshot…")
+    added = refresh_raises()
+    rounds, projects = snapshot_size()
+    print(f"Snapshot: {rounds} rounds / {projects} projects ({len(added)} new this refresh)")
 
-    cutoff = datetime.now(tz=timezone.utc) - timedelta(days=args.days)
-    recent = [
-        r for r in all_raises
-        if datetime.fromtimestamp(r["date"], tz=timezone.utc) >= cutoff
-    ]
-    print(f"Raises in last {args.days} days: {len(recent)}")
+    cutoff_ts = int((datetime.now(tz=timezone.utc) - timedelta(days=args.days)).timestamp())
 
     if args.sample:
+        recent = raises_since(cutoff_ts)
         print(f"\n--- Raw DeFiLlama output (first 3 raises) ---\n")
         print(json.dumps(recent[:3], indent=2))
         return
 
-    pushed, skipped, failed = 0, 0, 0
+    # Raises already pushed or skipped on a previous run are marked processed,
+    # so each day only handles rounds it has not seen before.
+    recent = pending_raises(cutoff_ts)
+    print(f"Unprocessed raises in last {args.days} days: {len(recent)}")
+    if not recent:
+        print("Nothing new.")
+        return
 
+    # ── 1. Dedup against one Notion name index ────────────────────────────────
+    existing = query_all_names()
+    new_raises = []
+    # Several rounds of one project → one page for the newest (recent is newest
+    # first); the older rounds are settled together with that page's push
+    superseded: dict[str, list[dict]] = {}
     for raise_ in recent:
-        name = raise_["name"]
-        date_str = datetime.fromtimestamp(raise_["date"], tz=timezone.utc).strftime("%Y-%m-%d")
-        amount_str = _format_amount(raise_.get("amount"), raise_.get("round", "?"))
-        print(f"\n→ {name}  |  {amount_str}  |  {date_str}")
-
-        if name_exists(name):
-            print(f"  skip — already in Notion")
-            skipped += 1
-            continue
-
-        handle = resolve_x_handle(name, raise_.get("defillamaId", ""))
-        print(f"  X: @{handle}" if handle else "  X: not found (DeFiLlama + Exa + Sorsa)")
+        key = raise_["name"].strip().lower()
+        if key in superseded:
+            superseded[key].append(raise_)
+        elif key in existing:
+            print(f"  skip — {raise_['name']} already in Notion")
+            if not args.dry_run:
+                mark_processed(raise_)
+        else:
+            superseded[key] = []
+            new_raises.append(raise_)
+    older = sum(len(v) for v in superseded.values())
+    skipped = len(recent) - len(new_raises) - older
+    print(f"{len(new_raises)} new raise(s)"
+          + (f" (+{older} older round(s) of the same projects)" if older else "")
+          + f", {skipped} already in Notion")
+
+    # ── 2. Resolve X handles (DeFiLlama → Exa → Sorsa), concurrently ──────────
+    with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+        handles = list(pool.map(
+            lambda r: resolve_x_handle(r["name"], r.get("defillamaId", "")), new_raises
+        ))
+
+    # ── 3. Handles → ids, then every profile in full 50-id info-batch calls ───
+    unique_handles = sorted({h.lower(): h for h in handles if h}.values(), key=str.lower)
+    with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+        ids = list(pool.map(_safe_username_to_id, unique_handles))
+    handle_to_id = {h.lower(): uid for h, uid in zip(unique_handles, ids) if uid}
+
+    profiles_by_id: dict[str, dict] = {}
+    if handle_to_id:
+        try:
+            profiles_by_id = {p["id"]: p for p in get_profiles_batch(list(handle_to_id.values()))}
+        except Exception as e:
+            print(f"  [sorsa] profiles: {e}")
 
-        profile = None
-        if handle:
-            try:
-                uid = username_to_id(handle)
-                profiles = get_profiles_batch([uid])
-                profile = profiles[0] if profiles else None
-            except Exception as e:
-                print(f"  [sorsa] {e}")
+    rows = []
+    for raise_, handle in zip(new_raises, handles):
+        uid = handle_to_id.get(handle.lower()) if handle else None
+        rows.append((raise_, handle, profiles_by_id.get(uid) if uid else None))
 
+    for raise_, handle, profile in rows:
+        date_str = datetime.fromtimestamp(raise_["date"], tz=timezone.utc).strftime("%Y-%m-%d")
+        amount_str = _format_amount(raise_.get("amount"), raise_.get("round", "?"))
+        found = f"@{handle}" if handle else "X not found (DeFiLlama + Exa + Sorsa)"
+        print(f"\n→ {raise_['name']}  |  {amount_str}  |  {date_str}  |  {found}")
         if args.dry_run:
             investors = ", ".join(
                 (raise_.get("leadInvestors") or []) + (raise_.get("otherInvestors") or [])
             )
             print(f"  [dry-run] sector={raise_.get('category')}  investors={investors or '—'}")
-            pushed += 1
-            continue
 
-        try:
-            page_id = push_to_notion(raise_, handle, profile)
-            print(f"  ✓ Notion page created → {page_id[:8]}…")
-            pushed += 1
-        except Exception as e:
-            print(f"  [error] {e}")
-            failed += 1
+    if args.dry_run:
+        print(f"\n--- Done: {len(rows)} pushed  {skipped} skipped  0 failed ---")
+        return
 
-        time.sleep(0.3)
+    # ── 4. Create pages concurrently (throttled to Notion's rate limit) ───────
+    results = throttled_map(lambda row: push_to_notion(*row), rows)
+
+    pushed, failed = 0, 0
+    for (raise_, _, _), result in zip(rows, results):
+        if isinstance(result, Exception):
+            print(f"  [error] {raise_['name']}: {result}")
+            failed += 1
+        else:
+            for round_ in [raise_, *superseded[raise_["name"].strip().lower()]]:
+                mark_processed(round_)
+            print(f"  ✓ {raise_['name']} → {result[:8]}…")
+            pushed += 1
 
     print(f"\n--- Done: {pushed} pushed  {skipped} skipped  {failed} failed ---")
 
@@ -0,0 +1,134 @@
+"""
+Load test for the voting webapp against a local fake Notion.
+
+Starts scripts/fake_notion.py and the webapp (uvicorn, one worker) as
+subprocesses with NOTION_API_URL pointing at the fake, then has --clients
+concurrent signed-in team members hammer the read routes, like the whole
+team refreshing during IC week. Reports throughput, latency, errors and
+how many upstream Notion calls the run cost.
+
+Run:
+  python3 scripts/load_test_webapp.py
+  python3 scripts/load_test_webapp.py --clients 100 --requests 2000 --latency-ms 500
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx
+from itsdangerous import URLSafeSerializer
+
+from config import TEAM_MEMBERS
+
+_SECRET = "load-test-secret"
+_ROUTES = ["/api/projects", "/api/assigned"]
+
+
+def _env(notion_port: int) -> dict:
+    """Environment for the webapp: fake Notion, throwaway state.db, known cookie secret."""
+    tmp = tempfile.mkdtemp(prefix="webapp-load-")
+    return {
+        **os.environ,
+        "NOTION_API_URL":     f"http://127.0.0.1:{notion_port}",
+        "NOTION_DATABASE_ID": "fake-db",
+        "NOTION_TOKEN":       "fake-token",
+        "SECRET_KEY":         _SECRET,
+        "STATE_DB_PATH":      os.path.join(tmp, "state.db"),
+    }
+
+
+def _start(cmd: list[str], env: dict, port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return proc
+        except httpx.TransportError:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{cmd[1:3]} exited with {proc.returncode}")
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{cmd[1:3]} did not start on port {port}")
+
+
+async def _client(base: str, name: str, n: int, latencies: list, errors: list):
+    cookie = URLSafeSerializer(_SECRET, salt="voter-session").dumps(name)
+    async with httpx.AsyncClient(base_url=base, cookies={"voter_session": cookie}, timeout=60) as c:
+        for _ in range(n):
+            route = random.choice(_ROUTES)
+            t0 = time.perf_counter()
+            try:
+                r = await c.get(route)
+                ok = r.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((route, time.perf_counter() - t0))
+            if not ok:
+                errors.append(route)
+
+
+async def _run(base: str, clients: int, requests: int):
+    latencies: list = []
+    errors: list = []
+    per_client = max(1, requests // clients)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(base, TEAM_MEMBERS[i % len(TEAM_MEMBERS)], per_client, latencies, errors)
+        for i in range(clients)
+    ))
+    return latencies, errors, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voting webapp load test (fake Notion)")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent team members")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests")
+    parser.add_argument("--projects", type=int, default=200, help="Projects in the fake voting queue")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake Notion latency per call")
+    parser.add_argument("--notion-port", type=int, default=8900)
+    parser.add_argument("--app-port", type=int, default=8901)
+    args = parser.parse_args()
+
+    env = _env(args.notion_port)
+    notion = _start([sys.executable, "scripts/fake_notion.py", "--port", str(args.notion_port),
+                     "--projects", str(args.projects), "--latency-ms", str(args.latency_ms)],
+                    env, args.notion_port)
+    try:
+        webapp = _start([sys.executable, "-m", "uvicorn", "webapp.app:app", "--port", str(args.app_port),
+                         "--log-level", "warning"], env, args.app_port)
+        try:
+            latencies, errors, elapsed = asyncio.run(
+                _run(f"http://127.0.0.1:{args.app_port}", args.clients, args.requests))
+            upstream = httpx.get(f"http://127.0.0.1:{args.notion_port}/_stats").json()["calls"]
+        finally:
+            webapp.terminate()
+            webapp.wait()
+    finally:
+        notion.terminate()
+        notion.wait()
+
+    print(f"\n{len(latencies)} requests, {args.clients} clients, "
+          f"fake Notion {args.latency_ms:.0f} ms/call, {args.projects} projects")
+    print(f"  {len(latencies) / elapsed:8.1f} req/s over {elapsed:.1f}s, {len(errors)} error(s)")
+    for route in _ROUTES:
+        times = sorted(t for r, t in latencies if r == route)
+        if times:
+            print(f"  {route:16s} n={len(times):5d}  mean {1000 * sum(times) / len(times):7.1f} ms"
+                  f"  max {1000 * times[-1]:7.1f} ms")
+    total = sum(upstream.values())
+    print(f"  upstream Notion calls: {total} ({', '.join(f'{k}={v}' for k, v in sorted(upstream.items()))}), "
+          f"{total / max(len(latencies), 1):.2f} per request")
+
+
+if __name__ == "__main__":
+    main()
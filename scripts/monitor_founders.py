@@ -38,6 +38,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 load_dotenv(override=True)
 
 from exa_py import Exa
+from shared.single_flight import CoalescedClient
 from config import EXA_API_KEY, DB_PATH
 from api.sorsa import username_to_id, get_profiles_batch, search_tweets
 
@@ -275,13 +276,13 @@ def run_bio_diff() -> list[dict]:
 
 # ── Option C: departure announcement search ───────────────────────────────────
 
-_exa: Exa | None = None
+_exa: CoalescedClient | None = None
 
 
-def _get_exa() -> Exa:
+def _get_exa() -> CoalescedClient:
     global _exa
     if _exa is None:
-        _exa = Exa(api_key=EXA_API_KEY)
+        _exa = CoalescedClient(Exa(api_key=EXA_API_KEY), "exa")
     return _exa
 
 
@@ -31,6 +31,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 load_dotenv(override=True)
 
 from exa_py import Exa
+from shared.single_flight import CoalescedClient
 from config import EXA_API_KEY
 from api.sorsa import username_to_id
 from pipeline.enrich import enrich_profiles, enrich_tweets
@@ -78,13 +79,13 @@ _HANDLE_RE = re.compile(
     re.IGNORECASE,
 )
 
-_exa: Exa | None = None
+_exa: CoalescedClient | None = None
 
 
-def _get_exa() -> Exa:
+def _get_exa() -> CoalescedClient:
     global _exa
     if _exa is None:
-        _exa = Exa(api_key=EXA_API_KEY)
+        _exa = CoalescedClient(Exa(api_key=EXA_API_KEY), "exa")
     return _exa
 
 
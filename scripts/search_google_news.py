@@ -33,11 +33,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 load_dotenv(override=True)
 
 from exa_py import Exa
+from shared.single_flight import CoalescedClient
 from config import EXA_API_KEY
 from api.sorsa import username_to_id, search_tweets
 from pipeline.enrich import enrich_profiles, enrich_tweets
 from pipeline.analyze import analyze_accounts
 from pipeline.notion_sync import sync_to_notion
+from shared import headlines
+from shared.headlines import compile_verb_re
 from state import init_db, get_known_ids
 
 # ── config ────────────────────────────────────────────────────────────────────
@@ -86,29 +89,7 @@ _ACTION_VERBS = (
     "nabs", "nabbed",
 )
 
-# Prefixes that precede a company name but are not part of it
-_NOISE_PREFIX_RE = re.compile(
-    r'^(?:new\s+|the\s+|exclusive[:\s]+|breaking[:\s]+|report[:\s]+|'
-    r'(?:blockchain|defi|crypto|web3|nft|fintech|onchain|web3\s+fintech)\s+startup\s+)',
-    re.IGNORECASE,
-)
-
-# Descriptor words that separate generic context from the actual project name.
-# When walking backward from the verb, hitting one of these marks where the name ends.
-# NOTE: "protocol" is intentionally excluded — it's often part of the project name (e.g. "XYZ Protocol").
-_DESCRIPTOR_WORDS = frozenset({
-    "startup", "firm", "company", "developer", "infrastructure",
-    "builder", "provider", "venture", "unit", "arm", "division",
-    "backed", "funded", "led", "exchange",
-})
-
-# Funding-round type suffixes to strip from the end of the prefix so they are
-# not mistaken for part of the company name ("Geordie AI Series A" → "Geordie AI").
-_ROUND_SUFFIX_RE = re.compile(
-    r'\s+(?:series\s+[a-e]|pre-?seed|seed|pre-series\s+a|bridge|angel)'
-    r'(?:\s+round|\s+funding)?\s*$',
-    re.IGNORECASE,
-)
+_VERB_RE = compile_verb_re(_ACTION_VERBS)
 
 _HANDLE_RE = re.compile(
     r'(?:twitter|x)\.com/'
@@ -118,13 +99,13 @@ _HANDLE_RE = re.compile(
     re.IGNORECASE,
 )
 
-_exa: Exa | None = None
+_exa: CoalescedClient | None = None
 
 
-def _get_exa() -> Exa:
+def _get_exa() -> CoalescedClient:
     global _exa
     if _exa is None:
-        _exa = Exa(api_key=EXA_API_KEY)
+        _exa = CoalescedClient(Exa(api_key=EXA_API_KEY), "exa")
     return _exa
 
 
@@ -142,51 +123,10 @@ def extract_company_name(title: str) -> str | None:
     "XYZ Protocol Raises $5M Seed Round"              → "XYZ Protocol"
     "Stablecoin Infrastructure Startup Checker Raises" → "Checker"
     "DeFi Startup ABC Secures Pre-Seed"                → "ABC"
-    "Frontera Labs Developer Raises $3M"               → "Frontera Labs"
+    "Frontera Labs Developer Raises $3M"               → None  (trailing descriptor ends the walk)
     "Kalshi valuation hits $22B as prediction market raises $1B" → None
     """
-    lower = title.lower()
-    verb_pos = len(title)
-
-    for verb in _ACTION_VERBS:
-        m = re.search(r'\b' + verb + r'\b', lower)
-        if m and m.start() < verb_pos:
-            verb_pos = m.start()
-
-    if verb_pos == len(title):
-        return None
-
-    prefix = title[:verb_pos]
-    # Strip auxiliary verbs that directly precede the action verb ("has raised", etc.)
-    prefix = re.sub(r'\s+(?:has|have|had|is|was|were|are)\s*$', '', prefix.strip(), flags=re.IGNORECASE)
-    prefix = _ROUND_SUFFIX_RE.sub("", prefix).strip()
-    prefix = _NOISE_PREFIX_RE.sub("", prefix).strip()
-
-    words = prefix.split()
-    if not words:
-        return None
-
-    # Walk backward collecting contiguous proper-noun tokens, capped at 3 words.
-    # Stop at: non-capitalised word, descriptor word, or punctuation-only token.
-    name_words: list[str] = []
-    for w in reversed(words):
-        clean = re.sub(r'[^A-Za-z0-9]', '', w)
-        if not clean:
-            break
-        if clean.lower() in _DESCRIPTOR_WORDS:
-            break
-        if clean[0].isupper() or re.match(r'^[A-Z0-9]+$', clean):
-            name_words.insert(0, w)
-            if len(name_words) >= 3:
-                break
-        else:
-            break
-
-    if not name_words:
-        return None  # no proper noun found — skip rather than guess
-
-    name = " ".join(name_words).strip().strip(",.")
-    return name if len(name) >= 2 else None
+    return headlines.extract_company_name(title, _VERB_RE)
 
 
 # ── RSS helpers ───────────────────────────────────────────────────────────────
@@ -236,17 +176,18 @@ def fetch_news(query: str, days_back: int = DAYS_BACK) -> list[dict]:
             except Exception:
                 pass
 
-        company = extract_company_name(title)
-
         items.append({
             "title":   title,
             "link":    link,
             "source":  source,
             "pub_dt":  pub_dt,
-            "company": company,
             "query":   query,
         })
 
+    companies = headlines.extract_company_names([it["title"] for it in items], _VERB_RE)
+    for item, company in zip(items, companies):
+        item["company"] = company
+
     return items
 
 
@@ -27,11 +27,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 load_dotenv(override=True)
 
 from exa_py import Exa
+from shared.single_flight import CoalescedClient
 from config import EXA_API_KEY
 from api.sorsa import username_to_id, search_tweets
 from pipeline.enrich import enrich_profiles, enrich_tweets
 from pipeline.analyze import analyze_accounts
 from pipeline.notion_sync import sync_to_notion
+from shared import headlines
+from shared.headlines import DESCRIPTOR_WORDS, compile_verb_re
 from state import init_db, get_known_ids
 
 # ── config ────────────────────────────────────────────────────────────────────
@@ -88,17 +91,7 @@ _NOISE_PREFIX_RE = re.compile(
     re.IGNORECASE,
 )
 
-_DESCRIPTOR_WORDS = frozenset({
-    "startup", "firm", "company", "developer", "infrastructure",
-    "builder", "provider", "venture", "unit", "arm", "division",
-    "backed", "funded", "led", "exchange",
-})
-
-_ROUND_SUFFIX_RE = re.compile(
-    r'\s+(?:series\s+[a-e]|pre-?seed|seed|pre-series\s+a|bridge|angel)'
-    r'(?:\s+round|\s+funding)?\s*$',
-    re.IGNORECASE,
-)
+_VERB_RE = compile_verb_re(_ACTION_VERBS)
 
 # "Name on LinkedIn: 'post text...'" → strip the preamble
 _LINKEDIN_POST_PREFIX_RE = re.compile(
@@ -133,47 +126,7 @@ _AT_COMPANY_RE = re.compile(r'\bat\s+([A-Z][a-zA-Z0-9]+(?:\s+[A-Z][a-zA-Z0-9]+)?
 
 def extract_company_name(title: str) -> str | None:
     """Extract project name from a headline or post title via action-verb splitting."""
-    lower = title.lower()
-    verb_pos = len(title)
-
-    for verb in _ACTION_VERBS:
-        m = re.search(r'\b' + verb + r'\b', lower)
-        if m and m.start() < verb_pos:
-            verb_pos = m.start()
-
-    if verb_pos == len(title):
-        return None
-
-    prefix = title[:verb_pos]
-    prefix = re.sub(r'\s+(?:has|have|had|is|was|were|are)\s*$', '', prefix.strip(), flags=re.IGNORECASE)
-    prefix = _ROUND_SUFFIX_RE.sub("", prefix).strip()
-    prefix = _NOISE_PREFIX_RE.sub("", prefix).strip()
-
-    words = prefix.split()
-    if not words:
-        return None
-
-    name_words: list[str] = []
-    for w in reversed(words):
-        clean = re.sub(r'[^A-Za-z0-9]', '', w)
-        if not clean:
-            break
-        if re.match(r'^\d', clean):  # number or money token ($5M, 30M, 100)
-            break
-        if clean.lower() in _DESCRIPTOR_WORDS:
-            break
-        if clean[0].isupper() or re.match(r'^[A-Z0-9]+$', clean):
-            name_words.insert(0, w)
-            if len(name_words) >= 3:
-                break
-        else:
-            break
-
-    if not name_words:
-        return None
-
-    name = " ".join(name_words).strip().strip(",.")
-    return name if len(name) >= 2 else None
+    return headlines.extract_company_name(title, _VERB_RE, _NOISE_PREFIX_RE, stop_at_numbers=True)
 
 
 def _slug_to_title(slug: str) -> str:
@@ -221,7 +174,7 @@ def extract_company_from_result(title: str, url: str) -> str | None:
     # "doing at Polsia is the boldest proof" — company after "at"
     for m in _AT_COMPANY_RE.finditer(title):
         name = m.group(1).strip()
-        if len(name) >= 2 and name.lower() not in _DESCRIPTOR_WORDS:
+        if len(name) >= 2 and name.lower() not in DESCRIPTOR_WORDS:
             return name
 
     # 4. Company page URL: linkedin.com/company/frontera-labs
@@ -243,13 +196,13 @@ def extract_company_from_result(title: str, url: str) -> str | None:
 
 # ── Exa fetch ─────────────────────────────────────────────────────────────────
 
-_exa: Exa | None = None
+_exa: CoalescedClient | None = None
 
 
-def _get_exa() -> Exa:
+def _get_exa() -> CoalescedClient:
     global _exa
     if _exa is None:
-        _exa = Exa(api_key=EXA_API_KEY)
+        _exa = CoalescedClient(Exa(api_key=EXA_API_KEY), "exa")
     return _exa
 
 
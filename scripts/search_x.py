@@ -14,11 +14,11 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import anthropic
 from config import SORSA_API_KEY, ANTHROPIC_API_KEY
 from state import init_db, get_known_ids, add_account
 from api.notion import create_page, username_exists
 from api.sorsa import get_profiles_batch, search_tweets
+from pipeline.analyze import _empty_analysis, analyze_account
 
 if not SORSA_API_KEY:
     sys.exit("Missing TweetScout_API_key in .env")
@@ -104,96 +104,24 @@ def parse_tweets(tweets: list[dict]) -> list[dict]:
     return results
 
 
-# ── Claude analysis (same prompt as main pipeline) ────────────────────────────
-_claude = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
-
-def analyze(tweet_text: str, bio: str) -> dict:
-    prompt = f"""Analyze this crypto/startup ecosystem account.
-
-Official bio: {bio}
-
-Tweets:
-{tweet_text}
-
-Return exactly this format:
-
-TYPE:
-[project or person]
-
-ONE-LINER:
-[one sharp sentence: what this is and why it matters, max 15 words]
-
-DESCRIPTION:
-[2-3 sentence summary of what this account focuses on — their role, key themes, perspective]
-
-SECTOR:
-[comma-separated list from: DeFi, L1, L2, AI, Gaming, NFT, Infrastructure, DAO, VC, Social, RWA, Other]
-
-TOKEN STATUS:
-[exactly one of: has token / TGE planned / no token / unknown]
-
-STAGE:
-[exactly one of: pre-seed / seed / growth / unknown]
-
-ENTITIES:
-- Entity name (type)
-
-Rules:
-- TYPE must be exactly "project" or "person"
-- SECTOR: pick only relevant ones from the list, max 3
-- Entity types: project, token, VC, person, protocol, exchange, other"""
-
-    resp = _claude.messages.create(
-        model="claude-haiku-4-5",
-        max_tokens=600,
-        system="You analyze crypto and startup Twitter accounts for a venture capital deal-sourcing tool.",
-        messages=[{"role": "user", "content": prompt}],
-    )
-
-    text = resp.content[0].text.strip()
-
-    def section(start, end=None):
-        if start not in text:
-            return ""
-        s = text.split(start)[1]
-        if end and end in s:
-            s = s.split(end)[0]
-        return s.strip()
-
-    type_raw = section("TYPE:", "ONE-LINER:").lower()
-    account_type = "project" if "project" in type_raw else "person" if "person" in type_raw else "unknown"
-
-    token_raw = section("TOKEN STATUS:", "STAGE:").lower()
-    if "has token" in token_raw:
-        token_status = "has token"
-    elif "tge planned" in token_raw:
-        token_status = "TGE planned"
-    elif "no token" in token_raw:
-        token_status = "no token"
-    else:
-        token_status = "unknown"
-
-    stage_raw = section("STAGE:", "ENTITIES:").lower()
-    stage = "pre-seed" if "pre-seed" in stage_raw else "seed" if "seed" in stage_raw else "growth" if "growth" in stage_raw else "unknown"
-
-    sector_raw = section("SECTOR:", "TOKEN STATUS:")
-    sectors = [s.strip() for s in sector_raw.split(",") if s.strip()]
-
-    entities = [
-        line.strip("- ").strip()
-        for line in section("ENTITIES:").splitlines()
-        if line.strip("- ").strip()
-    ]
+# ── Claude analysis (same structured tool call as main pipeline) ──────────────
 
+def analyze(tweet_text: str, bio: str, username: str = "") -> dict:
+    try:
+        result = analyze_account([tweet_text], bio)
+    except ValueError as e:
+        # Repair retries exhausted: fall back like analyze_accounts does; the
+        # account comes out as "unknown" and push_new_projects skips it
+        print(f"  [warn] analysis failed for @{username}, skipped: {e}")
+        result = _empty_analysis()
     return {
-        "type":         account_type,
-        "one_liner":    section("ONE-LINER:", "DESCRIPTION:"),
-        "description":  section("DESCRIPTION:", "SECTOR:"),
-        "sectors":      sectors,
-        "token_status": token_status,
-        "stage":        stage,
-        "entities":     entities,
+        "type":         result["account_type"],
+        "one_liner":    result["one_liner"],
+        "description":  result["description"],
+        "sectors":      result["sector"],
+        "token_status": result["token_status"],
+        "stage":        result["stage"],
+        "entities":     result["entities"],
     }
 
 
@@ -339,7 +267,7 @@ def main():
     print("Running Claude analysis...\n")
     analyzed: list[tuple[dict, dict]] = []
     for i, r in enumerate(all_results, 1):
-        analysis = analyze(r["tweet_text"], r["bio"])
+        analysis = analyze(r["tweet_text"], r["bio"], r["username"])
         print_result(r, analysis, i)
         analyzed.append((r, analysis))
 
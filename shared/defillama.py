@@ -0,0 +1,236 @@
+"""
+Local DeFiLlama raises snapshot, shared by fetch_defillama_raises and enrich_funding.
+
+The Pro API only serves the full raises dataset, so it is downloaded at most
+once per REFRESH_MAX_AGE_HOURS and merged into state.db by date: only rounds
+at or after the stored watermark (minus a short overlap for late additions)
+are merged: new rounds are inserted, and rounds DeFiLlama has corrected since
+(amount, round type, investors) are updated in place. Lookups by name or date then hit indexed SQLite queries
+instead of re-scanning the whole list.
+
+    refresh_raises()                   → raises newly added to the snapshot
+    pending_raises(since_ts)           → recent raises not yet handled by the daily sync
+    latest_raise("hyperliquid")        → most recent round + _total_raise, or None
+    latest_raise("x", "x labs")        → same, over every round of both names
+    all_name_keys()                    → every normalized name (for shared/name_index.py)
+"""
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from config import DB_PATH, DEFILLAMA_API_KEY
+
+RAISES_URL = f"https://pro-api.llama.fi/{DEFILLAMA_API_KEY}/api/raises"
+
+REFRESH_MAX_AGE_HOURS = 12
+# Re-merge this many days behind the newest stored round — DeFiLlama sometimes
+# adds a round a few days after its announcement date.
+REFRESH_OVERLAP_DAYS = 7
+
+
+def normalize_name(name: str) -> str:
+    return (name or "").strip().lower()
+
+
+# ── SQLite helpers ────────────────────────────────────────────────────────────
+
+def _conn() -> sqlite3.Connection:
+    return sqlite3.connect(DB_PATH)
+
+
+def init_raises_table():
+    with _conn() as con:
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS defillama_raises (
+                name         TEXT NOT NULL,
+                name_key     TEXT NOT NULL,
+                date         INTEGER NOT NULL,
+                round        TEXT NOT NULL DEFAULT '',
+                amount       REAL,
+                raw          TEXT NOT NULL,
+                processed_at TEXT,
+                PRIMARY KEY (name, date, round)
+            )
+        """)
+        con.execute("CREATE INDEX IF NOT EXISTS idx_defillama_raises_name ON defillama_raises (name_key, date)")
+        con.execute("CREATE INDEX IF NOT EXISTS idx_defillama_raises_date ON defillama_raises (date)")
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS defillama_sync (
+                id           INTEGER PRIMARY KEY CHECK (id = 1),
+                refreshed_at REAL NOT NULL
+            )
+        """)
+
+
+def _last_refresh(con: sqlite3.Connection) -> float | None:
+    row = con.execute("SELECT refreshed_at FROM defillama_sync WHERE id = 1").fetchone()
+    return row[0] if row else None
+
+
+def _watermark(con: sqlite3.Connection) -> int | None:
+    row = con.execute("SELECT MAX(date) FROM defillama_raises").fetchone()
+    return row[0] if row else None
+
+
+# ── refresh ───────────────────────────────────────────────────────────────────
+
+def fetch_raises() -> list[dict]:
+    """Download the full raises dataset from DeFiLlama Pro."""
+    r = requests.get(RAISES_URL, timeout=30)
+    r.raise_for_status()
+    return r.json().get("raises", [])
+
+
+def refresh_raises(force: bool = False) -> list[dict]:
+    """
+    Merge new rounds from DeFiLlama into the local snapshot.
+
+    Skips the download entirely when the snapshot is younger than
+    REFRESH_MAX_AGE_HOURS (unless force=True). Rounds in the overlap window
+    that changed upstream are updated. Returns the raises that were not in
+    the snapshot before this call (an amended round is not one of them).
+    """
+    init_raises_table()
+    with _conn() as con:
+        last = _last_refresh(con)
+        if not force and last and time.time() - last < REFRESH_MAX_AGE_HOURS * 3600:
+            return []
+        watermark = _watermark(con)
+
+    raises = fetch_raises()
+    floor = (watermark - REFRESH_OVERLAP_DAYS * 86400) if watermark else None
+
+    added: list[dict] = []
+    amended = 0
+    with _conn() as con:
+        # Rounds already stored inside the overlap window, to tell amendments from additions
+        stored = {
+            (name, date_ts, round_): (raw, processed_at)
+            for name, date_ts, round_, raw, processed_at in con.execute(
+                "SELECT name, date, round, raw, processed_at FROM defillama_raises WHERE date >= ?",
+                (floor if floor is not None else 0,),
+            )
+        }
+        seen: set[tuple] = set()
+        for raise_ in raises:
+            name = (raise_.get("name") or "").strip()
+            date_ts = raise_.get("date")
+            if not name or not date_ts:
+                continue
+            if floor is not None and date_ts < floor:
+                continue
+            key = (name, int(date_ts), raise_.get("round") or "")
+            raw = json.dumps(raise_, ensure_ascii=False)
+            seen.add(key)
+            con.execute(
+                "INSERT INTO defillama_raises (name, name_key, date, round, amount, raw) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (name, date, round) DO UPDATE SET "
+                "name_key = excluded.name_key, amount = excluded.amount, raw = excluded.raw",
+                (name, normalize_name(name), key[1], key[2],
+                 float(raise_["amount"]) if raise_.get("amount") is not None else None, raw),
+            )
+            if key not in stored:
+                added.append(raise_)
+            elif stored[key][0] != raw:
+                amended += 1
+
+        # A corrected round type arrives under a new (name, date, round) key: drop
+        # the old row and carry its processed_at over, so it is not announced twice
+        new_by_day: dict[tuple, list[tuple]] = {}
+        for k in seen - stored.keys():
+            new_by_day.setdefault(k[:2], []).append(k)
+        retyped: set[tuple] = set()
+        for old_key, (_, processed_at) in stored.items():
+            new_keys = new_by_day.get(old_key[:2])
+            if old_key in seen or not new_keys:
+                continue
+            con.execute("DELETE FROM defillama_raises WHERE name = ? AND date = ? AND round = ?", old_key)
+            if processed_at:
+                con.executemany(
+                    "UPDATE defillama_raises SET processed_at = ? WHERE name = ? AND date = ? AND round = ?",
+                    [(processed_at, *k) for k in new_keys],
+                )
+            retyped.update(new_keys)
+        added = [r for r in added
+                 if ((r.get("name") or "").strip(), int(r["date"]), r.get("round") or "") not in retyped]
+        amended += len(retyped)
+
+        con.execute(
+            "INSERT OR REPLACE INTO defillama_sync (id, refreshed_at) VALUES (1, ?)",
+            (time.time(),),
+        )
+    if amended:
+        print(f"  [defillama] {amended} stored round(s) amended upstream, updated")
+    return added
+
+
+# ── queries ───────────────────────────────────────────────────────────────────
+
+def raises_since(since_ts: int) -> list[dict]:
+    """All stored raises dated at or after since_ts, newest first."""
+    with _conn() as con:
+        rows = con.execute(
+            "SELECT raw FROM defillama_raises WHERE date >= ? ORDER BY date DESC", (since_ts,)
+        ).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def pending_raises(since_ts: int) -> list[dict]:
+    """Raises dated at or after since_ts that the daily Notion sync has not handled yet."""
+    with _conn() as con:
+        rows = con.execute(
+            "SELECT raw FROM defillama_raises WHERE date >= ? AND processed_at IS NULL "
+            "ORDER BY date DESC",
+            (since_ts,),
+        ).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def mark_processed(raise_: dict):
+    with _conn() as con:
+        con.execute(
+            "UPDATE defillama_raises SET processed_at = ? WHERE name = ? AND date = ? AND round = ?",
+            (datetime.now(timezone.utc).isoformat(), (raise_.get("name") or "").strip(),
+             int(raise_["date"]), raise_.get("round") or ""),
+        )
+
+
+def latest_raise(*name_keys: str) -> dict | None:
+    """
+    Most recent round across one or more normalized project names (spellings
+    of the same project, e.g. NameIndex.aliases), with _total_raise set to the
+    sum of all their rounds (in $M, same unit as DeFiLlama's amount).
+    """
+    if not name_keys:
+        return None
+    marks = ",".join("?" * len(name_keys))
+    with _conn() as con:
+        row = con.execute(
+            f"SELECT raw, (SELECT COALESCE(SUM(amount), 0) FROM defillama_raises WHERE name_key IN ({marks})) "
+            f"FROM defillama_raises WHERE name_key IN ({marks}) ORDER BY date DESC LIMIT 1",
+            (*name_keys, *name_keys),
+        ).fetchone()
+    if row is None:
+        return None
+    raise_ = json.loads(row[0])
+    raise_["_total_raise"] = row[1]
+    return raise_
+
+
+def all_name_keys() -> list[str]:
+    """Every distinct normalized project name in the snapshot."""
+    with _conn() as con:
+        rows = con.execute("SELECT DISTINCT name_key FROM defillama_raises").fetchall()
+    return [r[0] for r in rows]
+
+
+def snapshot_size() -> tuple[int, int]:
+    """(rounds, distinct projects) currently in the snapshot."""
+    with _conn() as con:
+        return con.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT name_key) FROM defillama_raises"
+        ).fetchone()
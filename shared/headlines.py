@@ -0,0 +1,118 @@
+"""
+Headline → company name extraction, shared by the news and LinkedIn sources.
+
+Each source keeps its own verb list and noise-prefix pattern; this module
+compiles the verbs into one alternation so the earliest action verb is found
+in a single regex pass instead of one search per verb.
+
+    _VERB_RE = compile_verb_re(_ACTION_VERBS)
+    extract_company_name("XYZ Protocol Raises $5M Seed Round", _VERB_RE)  → "XYZ Protocol"
+    extract_company_names(titles, _VERB_RE)                               → [name | None, ...]
+"""
+import re
+from typing import Iterable
+
+# Prefixes that precede a company name but are not part of it
+NOISE_PREFIX_RE = re.compile(
+    r'^(?:new\s+|the\s+|exclusive[:\s]+|breaking[:\s]+|report[:\s]+|'
+    r'(?:blockchain|defi|crypto|web3|nft|fintech|onchain|web3\s+fintech)\s+startup\s+)',
+    re.IGNORECASE,
+)
+
+# Descriptor words that separate generic context from the actual project name.
+# When walking backward from the verb, hitting one of these marks where the name ends.
+# NOTE: "protocol" is intentionally excluded — it's often part of the project name (e.g. "XYZ Protocol").
+DESCRIPTOR_WORDS = frozenset({
+    "startup", "firm", "company", "developer", "infrastructure",
+    "builder", "provider", "venture", "unit", "arm", "division",
+    "backed", "funded", "led", "exchange",
+})
+
+# Funding-round type suffixes to strip from the end of the prefix so they are
+# not mistaken for part of the company name ("Geordie AI Series A" → "Geordie AI").
+ROUND_SUFFIX_RE = re.compile(
+    r'\s+(?:series\s+[a-e]|pre-?seed|seed|pre-series\s+a|bridge|angel)'
+    r'(?:\s+round|\s+funding)?\s*$',
+    re.IGNORECASE,
+)
+
+# Auxiliary verbs that directly precede the action verb ("has raised", etc.)
+_AUX_SUFFIX_RE = re.compile(r'\s+(?:has|have|had|is|was|were|are)\s*$', re.IGNORECASE)
+_NON_ALNUM_RE  = re.compile(r'[^A-Za-z0-9]')
+_UPPER_NUM_RE  = re.compile(r'^[A-Z0-9]+$')
+
+
+def compile_verb_re(verbs: Iterable[str]) -> re.Pattern:
+    """
+    Compile action verbs into a single word-bounded alternation.
+
+    re.search returns the leftmost match, which is exactly the earliest verb
+    in the headline. Longer verbs go first so no verb shadows another that
+    shares its prefix.
+    """
+    alternation = "|".join(sorted({re.escape(v) for v in verbs}, key=len, reverse=True))
+    return re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+
+
+def extract_company_name(title: str, verb_re: re.Pattern,
+                         noise_re: re.Pattern = NOISE_PREFIX_RE,
+                         stop_at_numbers: bool = False) -> str | None:
+    """
+    Extract the likely project name from a headline.
+
+    Splits on the first action verb, then walks backward through the prefix
+    collecting capitalised words (max 3) — stopping at descriptor words,
+    lowercase words, punctuation-only tokens and, when stop_at_numbers is set,
+    number or money tokens ("$5M", "30M"). Returns None rather than guessing.
+    """
+    m = verb_re.search(title)
+    if m is None:
+        return None
+
+    prefix = _AUX_SUFFIX_RE.sub("", title[:m.start()].strip())
+    prefix = ROUND_SUFFIX_RE.sub("", prefix).strip()
+    prefix = noise_re.sub("", prefix).strip()
+
+    words = prefix.split()
+    if not words:
+        return None
+
+    name_words: list[str] = []
+    for w in reversed(words):
+        clean = _NON_ALNUM_RE.sub("", w)
+        if not clean:
+            break
+        if stop_at_numbers and clean[0].isdigit():
+            break
+        if clean.lower() in DESCRIPTOR_WORDS:
+            break
+        if clean[0].isupper() or _UPPER_NUM_RE.match(clean):
+            name_words.insert(0, w)
+            if len(name_words) >= 3:
+                break
+        else:
+            break
+
+    if not name_words:
+        return None
+
+    name = " ".join(name_words).strip().strip(",.")
+    return name if len(name) >= 2 else None
+
+
+def extract_company_names(titles: Iterable[str], verb_re: re.Pattern,
+                          noise_re: re.Pattern = NOISE_PREFIX_RE,
+                          stop_at_numbers: bool = False) -> list[str | None]:
+    """
+    Batch form of extract_company_name — one result per title, in order.
+
+    The same headline is syndicated across many queries and outlets, so each
+    distinct title is only parsed once.
+    """
+    seen: dict[str, str | None] = {}
+    out: list[str | None] = []
+    for title in titles:
+        if title not in seen:
+            seen[title] = extract_company_name(title, verb_re, noise_re, stop_at_numbers)
+        out.append(seen[title])
+    return out
@@ -3,6 +3,7 @@ import numpy as np
 from pathlib import Path
 from voyageai import Client
 from dotenv import load_dotenv
+from shared.single_flight import coalesce
 
 load_dotenv()
 INDEX_PATH = Path("data/ic_index.pkl")
@@ -19,9 +20,16 @@ def _ensure_loaded():
     m = np.array([r["embedding"] for r in _records])
     _matrix = m / np.linalg.norm(m, axis=1, keepdims=True)
 
+def _embed_query(query: str) -> list[float]:
+    # Identical concurrent queries share one Voyage call
+    return coalesce(
+        ("voyage", "voyage-4-lite", query),
+        lambda: _voyage.embed([query], model="voyage-4-lite", input_type="query").embeddings[0],
+    )
+
 def retrieve_ic_context(query: str, top_k: int = 4) -> list[dict]:
     _ensure_loaded()
-    q = np.array(_voyage.embed([query], model="voyage-4-lite", input_type="query").embeddings[0])
+    q = np.array(_embed_query(query))
     q = q / np.linalg.norm(q)
     sims = _matrix @ q
     top = np.argsort(-sims)[:top_k]
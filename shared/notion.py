@@ -5,12 +5,16 @@ All Notion property names live here as constants — change one line when you
 rename a column in the UI instead of hunting through every script.
 """
 import json
-import requests
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dotenv import load_dotenv
-from config import NOTION_TOKEN, NOTION_DATABASE_ID
+from config import NOTION_TOKEN, NOTION_DATABASE_ID, NOTION_API_URL
+from shared.retry_after import retry_after
 
-load_dotenv()
+# `requests` is imported inside the functions that call Notion: the webapp
+# imports this module for its constants and parsers (cold start) and talks to
+# Notion through shared/notion_async.py.
 
 # ── Property name constants ───────────────────────────────────────────────────
 # Identifiers
@@ -48,6 +52,8 @@ PROP_MEMO           = "Memo"
 PROP_PROCESSED_AT   = "Processed_At"
 PROP_FILTERED_REASON = "Filtered_Reason"
 PROP_LAST_TOUCHED   = "Notion_Last_Touched"
+PROP_THESIS_SIMILARITY = "Thesis_Similarity"   # pre-rank result for pages held back by top-K
+PROP_NEAREST_THESIS    = "Nearest_Thesis"
 
 # Funding data (populated during deep dive / Surf enrichment)
 PROP_CHECKED_ON_SURF       = "Checked Fundraising"
@@ -74,6 +80,7 @@ PROP_VOTE_DOWN      = "Vote_Down"
 PROP_VOTERS         = "Voters"
 PROP_VOTE_REVIEWED  = "Vote_Reviewed"
 PROP_ASSIGNED_TO    = "Assigned_To"
+PROP_PROJECT_NAME   = "Project_Name"   # extracted from the memo (scripts/extract_project_names.py)
 
 # ── Property type map (used by update_row) ────────────────────────────────────
 _FIELD_TYPES: dict[str, str] = {
@@ -87,12 +94,14 @@ _FIELD_TYPES: dict[str, str] = {
     PROP_SCORING_JSON:   "rich_text",
     PROP_MEMO:           "rich_text",
     PROP_FILTERED_REASON:"rich_text",
+    PROP_NEAREST_THESIS: "rich_text",
     PROP_IC_WHY:         "rich_text",
     PROP_ACCOUNT_ID:     "number",
     PROP_FOLLOWERS:      "number",
     PROP_FRIENDS:        "number",
     PROP_TWEETS_COUNT:   "number",
     PROP_SCORE:          "number",
+    PROP_THESIS_SIMILARITY: "number",
     PROP_WATCHER_COUNT:  "number",
     PROP_VERIFIED:       "checkbox",
     PROP_X_PROFILE:      "url",
@@ -115,6 +124,7 @@ _FIELD_TYPES: dict[str, str] = {
     PROP_VOTERS:                "rich_text",
     PROP_VOTE_REVIEWED:         "checkbox",
     PROP_ASSIGNED_TO:           "rich_text",
+    PROP_PROJECT_NAME:          "rich_text",
     PROP_CHECKED_ON_SURF:       "checkbox",
     PROP_RAISED:                "checkbox",
     PROP_LAST_ROUND_DATE:       "date",
@@ -128,8 +138,13 @@ _HEADERS = {
     "Content-Type": "application/json",
     "Notion-Version": "2022-06-28",
 }
-_DB_URL = f"https://api.notion.com/v1/databases/{NOTION_DATABASE_ID}/query"
-_PAGE_URL = "https://api.notion.com/v1/pages"
+_SCHEMA_URL = f"{NOTION_API_URL}/databases/{NOTION_DATABASE_ID}"
+_DB_URL = f"{_SCHEMA_URL}/query"
+_PAGE_URL = f"{NOTION_API_URL}/pages"
+
+# Notion allows an average of ~3 requests/second per integration
+_WRITE_RATE = 3.0
+_WRITE_WORKERS = 3
 
 
 # ── Property serialisers ──────────────────────────────────────────────────────
@@ -216,6 +231,7 @@ def _parse_page(page: dict) -> dict:
         assigned_to = []
     return {
         "notion_id":      page["id"],
+        "last_edited":    page.get("last_edited_time", ""),
         "account_id":     str(int(float(raw_id))) if raw_id else "",
         "name":           _read(props, PROP_NAME),
         "username":       _read(props, PROP_USERNAME),
@@ -248,6 +264,7 @@ def _parse_page(page: dict) -> dict:
         "vote_down":            _read(props, PROP_VOTE_DOWN) or 0,
         "voters":               voters,
         "assigned_to":          assigned_to,
+        "project_name":         _read(props, PROP_PROJECT_NAME),
     }
 
 
@@ -256,6 +273,7 @@ def _parse_page(page: dict) -> dict:
 def query_candidates(status: str = "Scored",
                      recommendation: str = "deep_dive") -> list[dict]:
     """Return all pages matching status + recommendation, sorted by Score desc."""
+    import requests
     payload = {
         "filter": {
             "and": [
@@ -280,9 +298,48 @@ def query_candidates(status: str = "Scored",
     return pages
 
 
-def query_voting_projects() -> list[dict]:
-    """Return all Scored watch/deep_dive projects for the voting webapp (one query)."""
-    payload = {
+# Properties the voting dashboard's project list shows (no memo / scoring JSON)
+VOTING_LIST_PROPS = (
+    PROP_NAME, PROP_USERNAME, PROP_X_PROFILE, PROP_SCORE, PROP_ONE_LINER, PROP_SECTOR,
+    PROP_STAGE_EARLY_GROWTH, PROP_LAST_ROUND_AMOUNT, PROP_LAST_ROUND_DATE, PROP_INVESTORS,
+    PROP_PROCESSED_AT, PROP_VOTE_UP, PROP_VOTE_DOWN, PROP_VOTERS, PROP_VOTE_REVIEWED,
+    PROP_ASSIGNED_TO, PROP_PROJECT_NAME,
+)
+
+_prop_ids: dict[str, str] | None = None
+
+
+def _store_property_ids(schema: dict) -> dict[str, str]:
+    global _prop_ids
+    _prop_ids = {name: prop["id"] for name, prop in schema.get("properties", {}).items()}
+    return _prop_ids
+
+
+def _property_params(properties: tuple | None, ids: dict[str, str]) -> dict:
+    """
+    filter_properties for a query, or {} (all properties) without a schema.
+    Properties the database does not have (yet) are skipped; they read as empty.
+    """
+    if not properties or not ids:
+        return {}
+    return {"filter_properties": [ids[p] for p in properties if p in ids]}
+
+
+def property_ids() -> dict[str, str]:
+    """{property name: property id} from the database schema, fetched once; {} if unavailable."""
+    import requests
+    if _prop_ids is None:
+        try:
+            r = requests.get(_SCHEMA_URL, headers=_HEADERS, timeout=30)
+            r.raise_for_status()
+            return _store_property_ids(r.json())
+        except requests.RequestException:
+            return {}
+    return _prop_ids
+
+
+def _voting_query() -> dict:
+    return {
         "filter": {
             "and": [
                 {"property": PROP_STATUS, "select": {"equals": "Deep_Dived"}},
@@ -292,12 +349,22 @@ def query_voting_projects() -> list[dict]:
         },
         "sorts": [{"property": PROP_SCORE, "direction": "descending"}],
     }
+
+
+def query_voting_projects(properties: tuple | None = None) -> list[dict]:
+    """
+    Return all Scored watch/deep_dive projects for the voting webapp (one query).
+    properties limits the page properties Notion returns (e.g. VOTING_LIST_PROPS).
+    """
+    import requests
+    payload = _voting_query()
+    params = _property_params(properties, property_ids() if properties else {})
     pages: list[dict] = []
     cursor = None
     while True:
         if cursor:
             payload["start_cursor"] = cursor
-        r = requests.post(_DB_URL, headers=_HEADERS, json=payload, timeout=30)
+        r = requests.post(_DB_URL, headers=_HEADERS, json=payload, params=params, timeout=30)
         r.raise_for_status()
         data = r.json()
         pages.extend(_parse_page(p) for p in data.get("results", []))
@@ -312,18 +379,22 @@ def flag_reviewed(notion_id: str):
     update_row(notion_id, {PROP_VOTE_REVIEWED: True})
 
 
-def sync_votes(notion_id: str, up: int, down: int, voters: dict):
-    """Write aggregate vote counts back to a Notion page."""
-    import json
-    update_row(notion_id, {
+def _vote_fields(up: int, down: int, voters: dict) -> dict:
+    return {
         PROP_VOTE_UP:   up,
         PROP_VOTE_DOWN: down,
         PROP_VOTERS:    json.dumps(voters, ensure_ascii=False),
-    })
+    }
+
+
+def sync_votes(notion_id: str, up: int, down: int, voters: dict):
+    """Write aggregate vote counts back to a Notion page."""
+    update_row(notion_id, _vote_fields(up, down, voters))
 
 
 def get_project(notion_id: str) -> dict:
     """Fetch a single project's full data by Notion page ID."""
+    import requests
     r = requests.get(f"{_PAGE_URL}/{notion_id}", headers=_HEADERS, timeout=30)
     r.raise_for_status()
     return _parse_page(r.json())
@@ -334,21 +405,27 @@ def sync_assigned_to(notion_id: str, assignees: list):
     update_row(notion_id, {PROP_ASSIGNED_TO: json.dumps(assignees, ensure_ascii=False)})
 
 
-def query_assigned_projects(voter_name: str) -> list[dict]:
-    """Return all projects assigned to voter_name."""
-    payload = {
+def _assigned_query(voter_name: str) -> dict:
+    return {
         "filter": {
             "property": PROP_ASSIGNED_TO,
             "rich_text": {"contains": voter_name},
         },
         "sorts": [{"property": PROP_PROCESSED_AT, "direction": "descending"}],
     }
+
+
+def query_assigned_projects(voter_name: str, properties: tuple | None = None) -> list[dict]:
+    """Return all projects assigned to voter_name (properties: as in query_voting_projects)."""
+    import requests
+    payload = _assigned_query(voter_name)
+    params = _property_params(properties, property_ids() if properties else {})
     pages: list[dict] = []
     cursor = None
     while True:
         if cursor:
             payload["start_cursor"] = cursor
-        r = requests.post(_DB_URL, headers=_HEADERS, json=payload, timeout=30)
+        r = requests.post(_DB_URL, headers=_HEADERS, json=payload, params=params, timeout=30)
         r.raise_for_status()
         data = r.json()
         pages.extend(_parse_page(p) for p in data.get("results", []))
@@ -358,6 +435,32 @@ def query_assigned_projects(voter_name: str) -> list[dict]:
     return pages
 
 
+_RETRIES = 4  # attempts per request while the API answers 429
+
+
+def send_with_retry(send, attempts: int = _RETRIES):
+    """
+    Call send() (one HTTP request, returning a requests/httpx response) until
+    it is not a 429, sleeping per Retry-After (seconds or an HTTP date; else
+    exponential back-off) in between. Returns the last response.
+    """
+    for attempt in range(attempts):
+        r = send()
+        if r.status_code != 429 or attempt == attempts - 1:
+            return r
+        time.sleep(retry_after(r.headers.get("Retry-After"), 2 ** attempt))
+
+
+async def send_with_retry_async(send, attempts: int = _RETRIES):
+    """send_with_retry for a coroutine function: awaits send() and the back-off."""
+    import asyncio
+    for attempt in range(attempts):
+        r = await send()
+        if r.status_code != 429 or attempt == attempts - 1:
+            return r
+        await asyncio.sleep(retry_after(r.headers.get("Retry-After"), 2 ** attempt))
+
+
 def update_row(notion_id: str, fields: dict):
     """
     Write arbitrary fields back to a Notion page.
@@ -370,13 +473,80 @@ def update_row(notion_id: str, fields: dict):
             PROP_LAST_TOUCHED:  "2026-05-08",
         })
     """
+    import requests
     properties = {name: _serialise(name, value) for name, value in fields.items()}
-    r = requests.patch(
+    r = send_with_retry(lambda: requests.patch(
         f"{_PAGE_URL}/{notion_id}",
         headers=_HEADERS,
         json={"properties": properties},
         timeout=30,
-    )
+    ))
     if not r.ok:
         print(f"  [notion error] {r.status_code}: {r.text}")
     r.raise_for_status()
+
+
+class _Throttle:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def throttled_map(fn, items: list, rate: float = _WRITE_RATE,
+                  workers: int = _WRITE_WORKERS) -> list:
+    """
+    Call fn(item) for every item on a small thread pool, starting at most
+    `rate` calls/second. Returns results in order; a call that raised
+    contributes its exception instead of a result.
+    """
+    throttle = _Throttle(rate)
+
+    def _call(item):
+        throttle.wait()
+        try:
+            return fn(item)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_call, items))
+
+
+def update_rows(updates: list[tuple[str, dict]], rate: float = _WRITE_RATE,
+                workers: int = _WRITE_WORKERS) -> list[Exception | None]:
+    """
+    Apply many update_row calls concurrently, throttled to `rate` requests/second.
+    Returns one entry per update, in order: None on success, the exception otherwise.
+    """
+    return throttled_map(lambda item: update_row(*item), updates, rate, workers)
+
+
+def query_all_names() -> set[str]:
+    """Lowercased title of every page in the database (title property only, paginated)."""
+    import requests
+    payload: dict = {"page_size": 100}
+    names: set[str] = set()
+    while True:
+        r = requests.post(_DB_URL, headers=_HEADERS, json=payload,
+                          params={"filter_properties": "title"}, timeout=30)
+        r.raise_for_status()
+        data = r.json()
+        for page in data.get("results", []):
+            name = _read(page.get("properties", {}), PROP_NAME)
+            if name:
+                names.add(name.strip().lower())
+        if not data.get("has_more"):
+            break
+        payload["start_cursor"] = data.get("next_cursor")
+    return names
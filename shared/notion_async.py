@@ -0,0 +1,124 @@
+"""
+Async variant of the shared/notion read/write API for the FastAPI webapp.
+
+One httpx.AsyncClient per event loop keeps a pool of open HTTP/1.1
+keep-alive connections to Notion, so a request handler awaits the round
+trip instead of opening a new TLS connection and holding a threadpool
+worker for it. Payloads, property (de)serialisation and page parsing are
+shared with shared/notion.py, and results have the same shape.
+
+    projects = await query_voting_projects()
+    await update_row(notion_id, {PROP_ASSIGNED_TO: "..."})
+    await aclose()  # on app shutdown
+
+httpx is imported with the first client, so importing this module (the
+webapp's cold start) costs nothing until Notion is actually called.
+"""
+import asyncio
+import json
+
+from shared import notion
+from shared.notion import (
+    PROP_ASSIGNED_TO, PROP_VOTE_REVIEWED,
+    _DB_URL, _HEADERS, _PAGE_URL, _SCHEMA_URL,
+    _assigned_query, _parse_page, _property_params, _serialise,
+    _store_property_ids, _vote_fields, _voting_query, send_with_retry_async,
+)
+
+_MAX_CONNECTIONS = 20
+_TIMEOUT = 30.0
+_CONNECT_TIMEOUT = 10.0
+
+_client = None  # httpx.AsyncClient
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_client():
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        import httpx
+        # A client is bound to the loop it was first used on (tests / scripts
+        # may run several loops in one process)
+        _client = httpx.AsyncClient(
+            headers=_HEADERS,
+            timeout=httpx.Timeout(_TIMEOUT, connect=_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=_MAX_CONNECTIONS,
+                                max_keepalive_connections=_MAX_CONNECTIONS),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def aclose():
+    """Close the pooled connections (call on app shutdown)."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = _client_loop = None
+
+
+async def property_ids() -> dict[str, str]:
+    """shared.notion.property_ids(), fetched without blocking; the result is shared."""
+    if notion._prop_ids is None:
+        import httpx
+        try:
+            r = await _get_client().get(_SCHEMA_URL)
+            r.raise_for_status()
+            return _store_property_ids(r.json())
+        except httpx.HTTPError:
+            return {}
+    return notion._prop_ids
+
+
+async def _query(payload: dict, properties: tuple | None = None) -> list[dict]:
+    params = _property_params(properties, await property_ids() if properties else {})
+    pages: list[dict] = []
+    while True:
+        r = await _get_client().post(_DB_URL, json=payload, params=params)
+        r.raise_for_status()
+        data = r.json()
+        pages.extend(_parse_page(p) for p in data.get("results", []))
+        if not data.get("has_more"):
+            break
+        payload["start_cursor"] = data.get("next_cursor")
+    return pages
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+async def query_voting_projects(properties: tuple | None = None) -> list[dict]:
+    return await _query(_voting_query(), properties)
+
+
+async def query_assigned_projects(voter_name: str, properties: tuple | None = None) -> list[dict]:
+    return await _query(_assigned_query(voter_name), properties)
+
+
+async def get_project(notion_id: str) -> dict:
+    r = await _get_client().get(f"{_PAGE_URL}/{notion_id}")
+    r.raise_for_status()
+    return _parse_page(r.json())
+
+
+async def update_row(notion_id: str, fields: dict):
+    """Async shared.notion.update_row: same fields, same 429 back-off."""
+    properties = {name: _serialise(name, value) for name, value in fields.items()}
+    r = await send_with_retry_async(
+        lambda: _get_client().patch(f"{_PAGE_URL}/{notion_id}", json={"properties": properties})
+    )
+    if r.is_error:
+        print(f"  [notion error] {r.status_code}: {r.text}")
+    r.raise_for_status()
+
+
+async def flag_reviewed(notion_id: str):
+    await update_row(notion_id, {PROP_VOTE_REVIEWED: True})
+
+
+async def sync_votes(notion_id: str, up: int, down: int, voters: dict):
+    await update_row(notion_id, _vote_fields(up, down, voters))
+
+
+async def sync_assigned_to(notion_id: str, assignees: list):
+    await update_row(notion_id, {PROP_ASSIGNED_TO: json.dumps(assignees, ensure_ascii=False)})
@@ -0,0 +1,30 @@
+"""
+Retry-After parsing for the 429 back-off (shared.notion.send_with_retry for
+Notion and Surf, the Anthropic limiter in pipeline/analyze.py).
+
+RFC 9110 allows either delay-seconds or an HTTP date:
+
+    Retry-After: 120
+    Retry-After: Wed, 21 Oct 2026 07:28:00 GMT
+
+    time.sleep(retry_after(r.headers.get("Retry-After"), 2 ** attempt))
+"""
+from datetime import datetime, timezone
+
+
+def retry_after(value: str | None, default: float) -> float:
+    """Seconds to wait per a Retry-After header value; `default` when missing or unparseable."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime  # only for the rare date form
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,75 @@
+"""
+Single-flight request coalescing for the shared API clients.
+
+When several threads ask for the same thing at once (same Sorsa path and
+params, same Exa query, same Voyage embedding) only the first one goes to
+the network; the others wait for it and receive the same result — or the
+same exception. Nothing is cached: once the call finishes the key is free
+again.
+
+Results are shared objects, so callers must not mutate them in place.
+
+    user = coalesce(("sorsa", "GET", path, params), _get_uncached, path, params)
+    exa  = CoalescedClient(Exa(api_key=EXA_API_KEY), "exa")
+"""
+import json
+import threading
+from concurrent.futures import Future
+
+
+def flight_key(*parts) -> str:
+    """Stable key for arbitrary JSON-ish call arguments (dict order ignored)."""
+    return json.dumps(parts, sort_keys=True, default=repr)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+
+    def do(self, key: str, fn, *args, **kwargs):
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+        if not leader:
+            return fut.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+_group = SingleFlight()
+
+
+def coalesce(key_parts: tuple, fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) unless an identical call (same key_parts) is already in flight."""
+    return _group.do(flight_key(*key_parts), fn, *args, **kwargs)
+
+
+class CoalescedClient:
+    """Wraps an SDK client so identical concurrent method calls share one request."""
+
+    def __init__(self, client, namespace: str):
+        self._client = client
+        self._namespace = namespace
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return coalesce((self._namespace, name, args, kwargs), attr, *args, **kwargs)
+
+        return call
@@ -0,0 +1,122 @@
+"""
+Local tweet store keyed by X user id, shared by everything that reads timelines.
+
+For each user it records the newest tweet id / timestamp seen and the
+profile's tweets_count at that time. A later request for the same user
+either serves the window straight from state.db (tweets_count unchanged) or
+fetches only tweets newer than the stored id and merges them in.
+
+    recent_tweets(uid, tweets_count=1234)   → newest 20 tweets, fetching only what's new
+    cached_tweets(uid)                      → whatever is stored, no network
+"""
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+from api.sorsa import get_user_tweets
+from config import DB_PATH
+
+WINDOW = 20
+# Tweets kept per user — enough for a re-fetch window and deep dives, bounded growth
+KEEP_PER_USER = 100
+
+
+# ── SQLite helpers ────────────────────────────────────────────────────────────
+
+def _conn() -> sqlite3.Connection:
+    return sqlite3.connect(DB_PATH)
+
+
+def init_tweets_table():
+    with _conn() as con:
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS user_tweets (
+                user_id    TEXT NOT NULL,
+                tweet_id   INTEGER NOT NULL,
+                created_at TEXT,
+                raw        TEXT NOT NULL,
+                PRIMARY KEY (user_id, tweet_id)
+            )
+        """)
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS tweet_sync (
+                user_id      TEXT PRIMARY KEY,
+                newest_id    INTEGER,
+                newest_at    TEXT,
+                tweets_count INTEGER,
+                fetched_at   TEXT NOT NULL
+            )
+        """)
+
+
+def _sync_state(con: sqlite3.Connection, user_id: str) -> tuple | None:
+    return con.execute(
+        "SELECT newest_id, tweets_count FROM tweet_sync WHERE user_id = ?", (user_id,)
+    ).fetchone()
+
+
+def _store(con: sqlite3.Connection, user_id: str, tweets: list[dict], replace: bool):
+    if replace:
+        con.execute("DELETE FROM user_tweets WHERE user_id = ?", (user_id,))
+    con.executemany(
+        "INSERT OR REPLACE INTO user_tweets (user_id, tweet_id, created_at, raw) VALUES (?, ?, ?, ?)",
+        [(user_id, int(t["id"]), t.get("created_at", ""), json.dumps(t, ensure_ascii=False))
+         for t in tweets],
+    )
+    con.execute(
+        "DELETE FROM user_tweets WHERE user_id = ? AND tweet_id NOT IN "
+        "(SELECT tweet_id FROM user_tweets WHERE user_id = ? ORDER BY tweet_id DESC LIMIT ?)",
+        (user_id, user_id, KEEP_PER_USER),
+    )
+
+
+def _record_sync(con: sqlite3.Connection, user_id: str, tweets_count: int | None):
+    newest = con.execute(
+        "SELECT tweet_id, created_at FROM user_tweets WHERE user_id = ? "
+        "ORDER BY tweet_id DESC LIMIT 1",
+        (user_id,),
+    ).fetchone()
+    con.execute(
+        "INSERT OR REPLACE INTO tweet_sync (user_id, newest_id, newest_at, tweets_count, fetched_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (user_id, newest[0] if newest else None, newest[1] if newest else None,
+         tweets_count, datetime.now(timezone.utc).isoformat()),
+    )
+
+
+# ── public API ────────────────────────────────────────────────────────────────
+
+def cached_tweets(user_id: str, limit: int = WINDOW) -> list[dict]:
+    """Stored tweets for user_id, newest first. No network."""
+    with _conn() as con:
+        rows = con.execute(
+            "SELECT raw FROM user_tweets WHERE user_id = ? ORDER BY tweet_id DESC LIMIT ?",
+            (user_id, limit),
+        ).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def recent_tweets(user_id: str, tweets_count: int | None = None,
+                  limit: int = WINDOW) -> tuple[list[dict], bool]:
+    """
+    Newest `limit` tweets for user_id, newest first, plus whether Sorsa was called.
+
+    tweets_count is the profile's current count (from info-batch); when it
+    matches the stored one the cache is served as-is. Otherwise only tweets
+    newer than the stored newest id are fetched. A fetch that fills `limit`
+    without reaching the stored id replaces the cache, so no gap is kept.
+    """
+    init_tweets_table()
+    with _conn() as con:
+        state = _sync_state(con, user_id)
+
+    if state and tweets_count is not None and state[1] == tweets_count:
+        return cached_tweets(user_id, limit), False
+
+    since_id = str(state[0]) if state and state[0] else None
+    fetched = get_user_tweets(user_id, max_tweets=limit, since_id=since_id)
+
+    with _conn() as con:
+        _store(con, user_id, fetched, replace=since_id is None or len(fetched) >= limit)
+        _record_sync(con, user_id, tweets_count)
+    return cached_tweets(user_id, limit), True
@@ -1,3 +1,4 @@
+import json
 import sqlite3
 from datetime import date, datetime
 from config import DB_PATH
@@ -36,13 +37,43 @@ def init_votes_table():
                 PRIMARY KEY (notion_id, voter_name)
             )
         """)
+        # Votes not yet written back to Notion (webapp write-behind)
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS vote_outbox (
+                notion_id TEXT NOT NULL,
+                voter_name TEXT NOT NULL,
+                vote TEXT NOT NULL,
+                voted_at TEXT NOT NULL,
+                PRIMARY KEY (notion_id, voter_name)
+            )
+        """)
 
 
 def upsert_vote(notion_id: str, voter_name: str, vote: str):
+    """Record a vote and queue it for the Notion write-back."""
+    row = (notion_id, voter_name, vote, datetime.utcnow().isoformat())
     with _conn() as con:
         con.execute(
-            "INSERT OR REPLACE INTO votes (notion_id, voter_name, vote, voted_at) VALUES (?, ?, ?, ?)",
-            (notion_id, voter_name, vote, datetime.utcnow().isoformat()),
+            "INSERT OR REPLACE INTO votes (notion_id, voter_name, vote, voted_at) VALUES (?, ?, ?, ?)", row,
+        )
+        con.execute(
+            "INSERT OR REPLACE INTO vote_outbox (notion_id, voter_name, vote, voted_at) VALUES (?, ?, ?, ?)", row,
+        )
+
+
+def get_pending_votes() -> list[dict]:
+    """Votes awaiting write-back: [{notion_id, voter_name, vote, voted_at}]."""
+    with _conn() as con:
+        rows = con.execute("SELECT notion_id, voter_name, vote, voted_at FROM vote_outbox").fetchall()
+    return [{"notion_id": r[0], "voter_name": r[1], "vote": r[2], "voted_at": r[3]} for r in rows]
+
+
+def clear_pending_votes(rows: list[dict]):
+    """Drop written-back votes, unless the voter has changed their vote since."""
+    with _conn() as con:
+        con.executemany(
+            "DELETE FROM vote_outbox WHERE notion_id = ? AND voter_name = ? AND voted_at = ?",
+            [(r["notion_id"], r["voter_name"], r["voted_at"]) for r in rows],
         )
 
 
@@ -65,6 +96,83 @@ def get_all_votes() -> dict:
     return result
 
 
+def init_score_log():
+    with _conn() as con:
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS score_log (
+                page_id        TEXT PRIMARY KEY,
+                scored_at      TEXT NOT NULL,
+                thesis_hash    TEXT NOT NULL,
+                section_hashes TEXT NOT NULL,
+                page           TEXT NOT NULL,
+                result         TEXT NOT NULL
+            )
+        """)
+
+
+def record_score(page: dict, result: dict, section_hashes: dict[str, str], thesis_hash: str):
+    """Remember what a page was scored against (and the page/result) for incremental re-scoring."""
+    with _conn() as con:
+        con.execute(
+            "INSERT OR REPLACE INTO score_log (page_id, scored_at, thesis_hash, section_hashes, page, result) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (page["page_id"], datetime.utcnow().isoformat(), thesis_hash,
+             json.dumps(section_hashes), json.dumps(page, ensure_ascii=False),
+             json.dumps(result, ensure_ascii=False)),
+        )
+
+
+def retag_scores(page_ids: list[str], section_hashes: dict[str, str], thesis_hash: str):
+    """Mark scores as still valid under a new thesis version (no changed section touches them)."""
+    with _conn() as con:
+        con.executemany(
+            "UPDATE score_log SET thesis_hash = ?, section_hashes = ? WHERE page_id = ?",
+            [(thesis_hash, json.dumps(section_hashes), pid) for pid in page_ids],
+        )
+
+
+def get_score_log() -> list[dict]:
+    """All recorded scores: [{page_id, scored_at, thesis_hash, section_hashes, page, result}]."""
+    with _conn() as con:
+        rows = con.execute(
+            "SELECT page_id, scored_at, thesis_hash, section_hashes, page, result FROM score_log"
+        ).fetchall()
+    return [
+        {"page_id": r[0], "scored_at": r[1], "thesis_hash": r[2],
+         "section_hashes": json.loads(r[3]), "page": json.loads(r[4]), "result": json.loads(r[5])}
+        for r in rows
+    ]
+
+
+def init_project_name_log():
+    with _conn() as con:
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS project_name_log (
+                notion_id    TEXT PRIMARY KEY,
+                memo_hash    TEXT NOT NULL,
+                project_name TEXT NOT NULL,
+                extracted_at TEXT NOT NULL
+            )
+        """)
+
+
+def get_project_name_log() -> dict[str, str]:
+    """{notion_id: memo_hash} of every memo a project name was taken from."""
+    with _conn() as con:
+        return dict(con.execute("SELECT notion_id, memo_hash FROM project_name_log").fetchall())
+
+
+def record_project_names(rows: list[tuple[str, str, str]]):
+    """Remember (notion_id, memo_hash, project_name) so unchanged memos are not sent again."""
+    now = datetime.utcnow().isoformat()
+    with _conn() as con:
+        con.executemany(
+            "INSERT OR REPLACE INTO project_name_log (notion_id, memo_hash, project_name, extracted_at) "
+            "VALUES (?, ?, ?, ?)",
+            [(nid, memo_hash, name, now) for nid, memo_hash, name in rows],
+        )
+
+
 def get_known_ids() -> set[str]:
     with _conn() as con:
         rows = con.execute("SELECT id FROM known_accounts").fetchall()
@@ -1,57 +1,63 @@
 import os
 import sys
-import json
-from datetime import datetime, timedelta
 from urllib.parse import urlencode
-from pathlib import Path
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import requests as http
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from itsdangerous import URLSafeSerializer, BadSignature
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from config import (
-    TEAM_MEMBERS, TEAM_EMAILS, ASSIGNEES,
+    TEAM_MEMBERS, TEAM_EMAILS, ASSIGNEES, SERVERLESS,
     SECRET_KEY, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, APP_URL,
 )
-from shared.notion import (
-    query_voting_projects,
-    get_project,
-    sync_votes,
-    flag_reviewed,
-    sync_assigned_to,
-    query_assigned_projects,
-)
+from shared import notion_async
+from shared.notion import VOTING_LIST_PROPS
+from webapp import events
+from webapp.http_cache import cached_bytes, cached_json, tagged_json
+from webapp.project_cache import ensure_loaded, get_detail, get_voting_projects, patch_project, version
+from webapp.vote_store import flush_votes, record_vote, start_flusher, vote_state
 
 PARTNERS = {"Jocy", "Momir"}
 
-_PROJECT_NAMES_PATH = Path(__file__).parent / "project_names.json"
-_PROJECT_NAMES: dict[str, str] = (
-    json.loads(_PROJECT_NAMES_PATH.read_text())
-    if _PROJECT_NAMES_PATH.exists() else {}
-)
-
 app = FastAPI(title="IOSG Deal Radar")
 app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")), name="static")
 
 _HTML_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "index.html")
-_REVIEW_DAYS = 14
+_html: tuple[float, bytes] | None = None  # (mtime, content)
 _COOKIE = "voter_session"
-_signer = URLSafeSerializer(SECRET_KEY, salt="voter-session")
+_signer = None
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await run_in_threadpool(flush_votes)
+    await notion_async.aclose()
 
 
 # ── Session helpers ────────────────────────────────────────────────────────
+# Upstream clients (itsdangerous, httpx) are imported on first use, not at
+# module load: on Vercel every cold start pays for the module's imports.
+
+def _get_signer():
+    global _signer
+    if _signer is None:
+        from itsdangerous import URLSafeSerializer
+        _signer = URLSafeSerializer(SECRET_KEY, salt="voter-session")
+    return _signer
+
 
 def _get_voter(request: Request) -> str | None:
+    from itsdangerous import BadSignature
+
     raw = request.cookies.get(_COOKIE)
     if not raw:
         return None
     try:
-        return _signer.loads(raw)
+        return _get_signer().loads(raw)
     except BadSignature:
         return None
 
@@ -59,7 +65,7 @@ def _get_voter(request: Request) -> str | None:
 def _set_voter_cookie(response: RedirectResponse, voter_name: str):
     response.set_cookie(
         _COOKIE,
-        _signer.dumps(voter_name),
+        _get_signer().dumps(voter_name),
         max_age=30 * 24 * 3600,
         httponly=True,
         samesite="lax",
@@ -84,11 +90,13 @@ def auth_login():
 
 @app.get("/auth/callback")
 def auth_callback(code: str = None, error: str = None):
+    import httpx
+
     if error or not code:
         return RedirectResponse("/?auth_error=cancelled")
 
     # Exchange code for access token
-    token_r = http.post(
+    token_r = httpx.post(
         "https://oauth2.googleapis.com/token",
         data={
             "code":          code,
@@ -99,17 +107,17 @@ def auth_callback(code: str = None, error: str = None):
         },
         timeout=15,
     )
-    if not token_r.ok:
+    if not token_r.is_success:
         return RedirectResponse("/?auth_error=token_exchange_failed")
     access_token = token_r.json().get("access_token")
 
     # Fetch email from Google
-    user_r = http.get(
+    user_r = httpx.get(
         "https://www.googleapis.com/oauth2/v2/userinfo",
         headers={"Authorization": f"Bearer {access_token}"},
         timeout=15,
     )
-    if not user_r.ok:
+    if not user_r.is_success:
         return RedirectResponse("/?auth_error=userinfo_failed")
     email = user_r.json().get("email", "").lower()
 
@@ -144,9 +152,14 @@ def dev_login(name: str, request: Request):
 # ── App routes ─────────────────────────────────────────────────────────────
 
 @app.get("/")
-def index():
-    with open(_HTML_PATH) as f:
-        return HTMLResponse(f.read())
+def index(request: Request):
+    # Held in memory; re-read only when the file changes on disk
+    global _html
+    mtime = os.stat(_HTML_PATH).st_mtime
+    if _html is None or _html[0] != mtime:
+        with open(_HTML_PATH, "rb") as f:
+            _html = (mtime, f.read())
+    return cached_bytes(request, "index", _html[1], "text/html; charset=utf-8")
 
 
 @app.get("/api/config")
@@ -159,23 +172,54 @@ def get_me(request: Request):
     return {"voter": _get_voter(request)}
 
 
+# What a dashboard card shows; memo and scoring JSON come from /api/projects/{id}.
+# project_name is the Project_Name property, filled by scripts/extract_project_names.py
+# and picked up on the next cache refresh.
+_LIST_FIELDS = (
+    "notion_id", "name", "project_name", "username", "x_profile", "score", "one_liner",
+    "sectors", "stage_early_growth", "last_round_amount", "last_round_date", "investors",
+    "vote_up", "vote_down", "voters", "vote_reviewed", "assigned_to",
+)
+
+
 def _enrich(projects: list[dict]) -> list[dict]:
-    for p in projects:
-        p["project_name"] = _PROJECT_NAMES.get(p["notion_id"])
-    return projects
+    """Card-sized list items."""
+    return [{k: p.get(k) for k in _LIST_FIELDS} for p in projects]
 
 
 @app.get("/api/projects")
-def get_projects(request: Request):
-    projects = query_voting_projects()
-    for p in projects:
-        if not p.get("vote_reviewed") and _should_auto_review(p):
-            p["vote_reviewed"] = True
-            try:
-                flag_reviewed(p["notion_id"])
-            except Exception:
-                pass
-    return _enrich(projects)
+async def get_projects(request: Request):
+    # Served from memory; refresh and auto-review flagging run in the background.
+    # The cache version is the ETag: an unchanged set answers 304 without a body.
+    await run_in_threadpool(start_flusher)  # reads the outbox (sqlite)
+    await ensure_loaded()
+    return cached_json(request, "projects", f"v{version()}", lambda: _enrich(get_voting_projects()))
+
+
+@app.get("/api/projects/{notion_id}")
+async def get_project_detail(notion_id: str, request: Request):
+    # Memo and scoring JSON, loaded on first open and cached until the page changes
+    import httpx
+
+    try:
+        detail = await get_detail(notion_id)
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=404 if e.response.status_code in (400, 404) else 502)
+    return cached_json(request, f"detail:{notion_id}", detail.get("last_edited") or "0", lambda: detail)
+
+
+@app.get("/api/events")
+async def get_events(request: Request):
+    # Live vote / assignment deltas; clients patch their state instead of re-polling /api/projects.
+    # Serverless instances are per-request and time-limited: 204 tells the EventSource not to
+    # reconnect, and the dashboard polls /api/projects by ETag instead.
+    if SERVERLESS:
+        return Response(status_code=204)
+    return StreamingResponse(
+        events.stream(request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 class VoteRequest(BaseModel):
@@ -184,27 +228,26 @@ class VoteRequest(BaseModel):
 
 
 @app.post("/api/vote")
-def submit_vote(req: VoteRequest, request: Request):
+async def submit_vote(req: VoteRequest, request: Request):
     voter_name = _get_voter(request)
     if not voter_name:
         raise HTTPException(status_code=401, detail="not authenticated")
     if req.vote not in ("up", "down"):
         raise HTTPException(status_code=400, detail="vote must be 'up' or 'down'")
 
-    project = get_project(req.notion_id)
-    voters = dict(project.get("voters") or {})
-    voters[voter_name] = req.vote
-
-    up   = sum(1 for v in voters.values() if v == "up")
-    down = sum(1 for v in voters.values() if v == "down")
-
-    sync_votes(req.notion_id, up, down, voters)
+    # Written to Notion before answering (VOTE_STORE=notion), or committed to the
+    # sqlite outbox and written behind. Blocking I/O either way: off the event loop.
+    import requests
 
-    reviewed = len(voters) >= len(TEAM_MEMBERS)
-    if reviewed and not project.get("vote_reviewed"):
-        flag_reviewed(req.notion_id)
-
-    return {"vote_up": up, "vote_down": down, "voters": voters, "reviewed": reviewed}
+    try:
+        state = await run_in_threadpool(record_vote, req.notion_id, voter_name, req.vote)
+    except requests.RequestException as e:
+        print(f"  [warn] vote by {voter_name} on {req.notion_id} not saved: {e}")
+        raise HTTPException(status_code=502, detail="vote not saved, please retry")
+    if state is None:
+        project = await notion_async.get_project(req.notion_id)
+        state = vote_state(req.notion_id, project.get("voters"))
+    return state
 
 
 class AssignRequest(BaseModel):
@@ -213,7 +256,7 @@ class AssignRequest(BaseModel):
 
 
 @app.post("/api/assign")
-def assign_project(req: AssignRequest, request: Request):
+async def assign_project(req: AssignRequest, request: Request):
     voter_name = _get_voter(request)
     if not voter_name:
         raise HTTPException(status_code=401, detail="not authenticated")
@@ -222,27 +265,15 @@ def assign_project(req: AssignRequest, request: Request):
     invalid = [a for a in req.assignees if a not in TEAM_MEMBERS]
     if invalid:
         raise HTTPException(status_code=400, detail=f"unknown members: {invalid}")
-    sync_assigned_to(req.notion_id, req.assignees)
+    await notion_async.sync_assigned_to(req.notion_id, req.assignees)
+    patch_project(req.notion_id, {"assigned_to": req.assignees})
     return {"assigned_to": req.assignees}
 
 
 @app.get("/api/assigned")
-def get_assigned(request: Request):
+async def get_assigned(request: Request):
     voter_name = _get_voter(request)
     if not voter_name:
         raise HTTPException(status_code=401, detail="not authenticated")
-    return _enrich(query_assigned_projects(voter_name))
-
-
-def _should_auto_review(project: dict) -> bool:
-    if len(project.get("voters", {})) >= len(TEAM_MEMBERS):
-        return True
-    processed_at = project.get("processed_at")
-    if processed_at:
-        try:
-            age = datetime.utcnow() - datetime.strptime(processed_at[:10], "%Y-%m-%d")
-            if age > timedelta(days=_REVIEW_DAYS):
-                return True
-        except ValueError:
-            pass
-    return False
+    projects = _enrich(await notion_async.query_assigned_projects(voter_name, VOTING_LIST_PROPS))
+    return tagged_json(request, projects, key=f"assigned:{voter_name}")
@@ -0,0 +1,113 @@
+"""
+In-process event channel behind the dashboard's server-sent events stream.
+
+project_cache publishes a "project" delta ({notion_id, changed fields})
+whenever a vote or assignment is applied, and a "refresh" event when a
+background refresh changed the voting set. Every open /api/events stream
+gets each event in order.
+
+Events are numbered per process. The last _BACKLOG are kept, so a
+reconnecting EventSource (Last-Event-ID) replays what it missed. If its id
+has fallen out of the backlog, or came from another process, it gets a
+"refresh" instead and refetches the list.
+
+publish() is safe from any thread (request handlers, the vote flusher,
+the cache refresh thread).
+
+Events only reach streams on the same process, so SSE needs one
+long-running host. With config.SERVERLESS the app does not serve the stream
+and the dashboard falls back to polling /api/projects by ETag. A stream
+ends after _MAX_STREAM so proxy / platform time limits never cut it
+mid-event; the EventSource reconnects with its Last-Event-ID.
+"""
+import json
+import asyncio
+import secrets
+import threading
+from collections import deque
+
+_BACKLOG = 500
+_HEARTBEAT = 15.0  # seconds between keep-alive comments
+_QUEUE_SIZE = 1000  # per-subscriber; a client this far behind is dropped
+_MAX_STREAM = 10 * 60.0  # seconds before a stream is closed for the client to reconnect
+
+_BOOT = secrets.token_hex(4)
+
+_lock = threading.Lock()
+_seq = 0
+_backlog: deque = deque(maxlen=_BACKLOG)  # (id, event, data)
+_subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+
+
+def _deliver(queue: asyncio.Queue, item: tuple):
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        # Too far behind: drop it; the client reconnects and resyncs
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+def publish(event: str, data: dict):
+    global _seq
+    with _lock:
+        _seq += 1
+        item = (_seq, event, data)
+        _backlog.append(item)
+        subscribers = list(_subscribers)
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(_deliver, queue, item)
+        except RuntimeError:  # loop closed
+            with _lock:
+                _subscribers.discard((loop, queue))
+
+
+def _format(item: tuple) -> str:
+    seq, event, data = item
+    return f"id: {_BOOT}-{seq}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _parse_id(event_id: str) -> int:
+    """Sequence number of an id this process issued, or -1."""
+    boot, _, seq = event_id.partition("-")
+    return int(seq) if boot == _BOOT and seq.isdigit() else -1
+
+
+async def stream(last_event_id: str | None):
+    """SSE body: missed events since last_event_id, then live ones, with heartbeats."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+    with _lock:
+        _subscribers.add((loop, queue))
+        backlog = list(_backlog)
+        seq = _seq
+
+    try:
+        yield "retry: 3000\n\n"
+        if last_event_id:
+            last = _parse_id(last_event_id)
+            if last < 0 or (last < seq and backlog[0][0] > last + 1):
+                yield _format((seq, "refresh", {}))  # gap: the client refetches the list
+            else:
+                for item in backlog:
+                    if item[0] > last:
+                        yield _format(item)
+
+        deadline = loop.time() + _MAX_STREAM
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=min(_HEARTBEAT, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:  # overflowed; the client reconnects and resyncs
+                return
+            yield _format(item)
+    finally:
+        with _lock:
+            _subscribers.discard((loop, queue))
@@ -0,0 +1,121 @@
+"""
+Conditional, compressed responses for the dashboard API.
+
+Every body is tagged with a strong ETag. A request whose If-None-Match
+already names it gets an empty 304. Otherwise the body is served
+brotli- or gzip-compressed, whichever the client accepts (brotli only when
+the optional `brotli` package is installed).
+
+Bodies are keyed by (key, tag): the JSON and each compressed encoding are
+built once per version of the data and reused by every client polling it,
+so a refresh that has nothing new costs neither serialisation nor bytes.
+
+    return cached_json(request, "projects", f"v{version()}", lambda: build_list())
+    return tagged_json(request, payload)            # tag = hash of the body
+    return cached_bytes(request, "index", html, "text/html; charset=utf-8")
+"""
+import gzip
+import json
+import hashlib
+import secrets
+import threading
+
+from fastapi import Request, Response
+
+_MIN_COMPRESS = 1024  # bytes; smaller bodies are sent as-is
+_MAX_ENTRIES = 64
+
+# Per-process prefix so a version number from another instance or an
+# earlier process never matches by accident
+_BOOT = secrets.token_hex(4)
+
+_lock = threading.Lock()
+_bodies: dict[str, tuple[str, dict[str, bytes]]] = {}  # key → (tag, {encoding: body})
+
+_brotli = None
+
+
+def _get_brotli():
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli  # optional: pip install brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli
+
+
+def _accepted(request: Request) -> list[str]:
+    """Encodings the client accepts (q > 0), in order of preference."""
+    offered = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            offered.add(name.lower())
+    return [e for e in ("br", "gzip") if e in offered]
+
+
+def _encode(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _get_brotli().compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    sent = request.headers.get("if-none-match", "")
+    return sent.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in sent.split(",")]
+
+
+def _respond(request: Request, key: str, tag: str, build, media_type: str) -> Response:
+    etag = f'"{_BOOT}-{tag}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    with _lock:
+        cached_tag, variants = _bodies.get(key, (None, {}))
+    if cached_tag != tag:
+        variants = {"identity": build()}
+    body = variants["identity"]
+
+    encoding = "identity"
+    if len(body) >= _MIN_COMPRESS:
+        for enc in _accepted(request):
+            if enc == "br" and not _get_brotli():
+                continue
+            if enc not in variants:
+                variants[enc] = _encode(body, enc)
+            encoding = enc
+            break
+
+    with _lock:
+        if len(_bodies) >= _MAX_ENTRIES and key not in _bodies:
+            _bodies.pop(next(iter(_bodies)))
+        _bodies[key] = (tag, variants)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(variants[encoding], media_type=media_type, headers=headers)
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+
+
+def cached_json(request: Request, key: str, tag: str, build) -> Response:
+    """JSON for shared data whose version is known up front; build() runs only on a miss."""
+    return _respond(request, key, tag, lambda: _dumps(build()), "application/json")
+
+
+def tagged_json(request: Request, payload, key: str | None = None) -> Response:
+    """JSON tagged by a hash of its own body (for data that has no version counter)."""
+    body = _dumps(payload)
+    tag = hashlib.blake2b(body, digest_size=12).hexdigest()
+    return _respond(request, key or f"body:{tag}", tag, lambda: body, "application/json")
+
+
+def cached_bytes(request: Request, key: str, body: bytes, media_type: str) -> Response:
+    """A static body (e.g. index.html), tagged by its content hash."""
+    tag = hashlib.blake2b(body, digest_size=12).hexdigest()
+    return _respond(request, key, tag, lambda: body, media_type)
@@ -0,0 +1,280 @@
+"""
+In-process read-through cache of the voting set for the webapp.
+
+get_voting_projects() answers from memory. Once the copy is older than the
+TTL it is still served, and a single background thread refreshes it from
+Notion (stale-while-revalidate). Only the first load, or a copy older than
+_MAX_STALE, blocks on Notion.
+
+Projects due for auto-review (every member voted, or older than
+_REVIEW_DAYS) are marked reviewed in the cache straight away and flagged in
+Notion from the background thread, never inside a request.
+
+With config.SERVERLESS (Vercel) an instance is frozen between requests, so
+a thread started there may never run: a copy older than the TTL is
+refreshed inside the request that finds it (concurrent requests share the
+load), and flagging is awaited with it.
+
+The set holds only the list properties (shared.notion.VOTING_LIST_PROPS);
+memos and scoring JSON are fetched per project on demand (get_detail) and
+kept until the project's last_edited_time moves.
+
+Async handlers use get_voting_projects_async(), which awaits a cold load
+through shared/notion_async instead of blocking the event loop.
+
+Writes made by the webapp are patched into the cache (patch_project,
+apply_votes), so a vote or assignment shows up on the next load without a
+refetch, and is published to /api/events (webapp/events) as a delta.
+version() changes whenever the cached set does (a refresh that
+returns different data, or a patch) and is what the API serves as its ETag.
+"""
+import json
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config import SERVERLESS, TEAM_MEMBERS, VOTING_CACHE_TTL_SECONDS
+from shared import notion_async
+from shared.notion import VOTING_LIST_PROPS, flag_reviewed, query_voting_projects
+from shared.single_flight import coalesce
+from webapp import events
+
+_REVIEW_DAYS = 14
+_MAX_STALE = 15 * 60  # seconds; older than this and a request waits for fresh data
+_DETAIL_TTL = 10 * 60  # seconds; details of projects outside the voting set
+
+_lock = threading.Lock()
+_projects: list[dict] | None = None
+_fetched_at = float("-inf")
+_refreshing = False
+_load_task: asyncio.Task | None = None
+_version = 0
+_digest = ""
+_details: dict[str, tuple[float, dict]] = {}  # notion_id → (fetched_at, full project)
+
+
+def should_auto_review(project: dict) -> bool:
+    if len(project.get("voters", {})) >= len(TEAM_MEMBERS):
+        return True
+    processed_at = project.get("processed_at")
+    if processed_at:
+        try:
+            age = datetime.utcnow() - datetime.strptime(processed_at[:10], "%Y-%m-%d")
+            if age > timedelta(days=_REVIEW_DAYS):
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+# ── refresh ───────────────────────────────────────────────────────────────────
+
+def _flag(notion_ids: list[str]):
+    for notion_id in notion_ids:
+        try:
+            flag_reviewed(notion_id)
+        except Exception as e:
+            print(f"  [warn] could not flag {notion_id} reviewed: {e}")
+
+
+def _publish(projects: list[dict]) -> list[str]:
+    """Make a fresh Notion result the cached set; returns ids newly due for review."""
+    global _projects, _fetched_at, _version, _digest
+    from webapp.vote_store import pending_votes  # (vote_store imports this module)
+
+    # Local votes not yet written back must not vanish from the dashboard
+    pending = pending_votes()
+    due = []
+    for p in projects:
+        if p["notion_id"] in pending:
+            p.update(vote_fields({**(p.get("voters") or {}), **pending[p["notion_id"]]}))
+        if not p.get("vote_reviewed") and should_auto_review(p):
+            p["vote_reviewed"] = True
+            due.append(p["notion_id"])
+    digest = hashlib.blake2b(json.dumps(projects, sort_keys=True, default=str).encode(),
+                             digest_size=16).hexdigest()
+    listed = {p["notion_id"] for p in projects}
+    with _lock:
+        changed = _projects is not None and digest != _digest
+        _projects, _fetched_at = projects, time.monotonic()
+        for notion_id, (at, _) in list(_details.items()):
+            if notion_id not in listed and _fetched_at - at > _DETAIL_TTL:
+                del _details[notion_id]
+        if digest != _digest:
+            _version, _digest = _version + 1, digest
+        version_now = _version
+    if changed:
+        events.publish("refresh", {"version": version_now})
+    return due
+
+
+def _load() -> list[str]:
+    return _publish(query_voting_projects(VOTING_LIST_PROPS))
+
+
+def _start_flagging(due: list[str]):
+    if due:
+        threading.Thread(target=_flag, args=(due,), name="flag-reviewed", daemon=True).start()
+
+
+def _load_now():
+    """Blocking load; concurrent callers share one Notion query."""
+    _start_flagging(_load())
+
+
+def _refresh_in_background():
+    global _refreshing
+    try:
+        _flag(_load())
+    except Exception as e:
+        print(f"  [warn] voting cache refresh failed: {e}")
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def _ensure():
+    """Load if cold (blocking), or start a background refresh if stale."""
+    global _refreshing
+    with _lock:
+        age = time.monotonic() - _fetched_at
+        cold = _projects is None or age > _MAX_STALE
+        start = not cold and not SERVERLESS and age > VOTING_CACHE_TTL_SECONDS and not _refreshing
+        if start:
+            _refreshing = True
+
+    if cold:
+        coalesce(("webapp", "voting_projects"), _load_now)
+    elif start:
+        threading.Thread(target=_refresh_in_background, name="voting-refresh", daemon=True).start()
+
+
+def get_voting_projects() -> list[dict]:
+    """The voting set, served from memory (shallow copies; safe to mutate)."""
+    _ensure()
+    with _lock:
+        return [dict(p) for p in _projects]
+
+
+def version() -> int:
+    """Changes whenever the cached voting set does. Read it before the data it tags."""
+    with _lock:
+        return _version
+
+
+def _is_cold() -> bool:
+    """True when a request must wait for Notion (serverless: as soon as the TTL has passed)."""
+    limit = VOTING_CACHE_TTL_SECONDS if SERVERLESS else _MAX_STALE
+    with _lock:
+        return _projects is None or time.monotonic() - _fetched_at > limit
+
+
+async def _flag_async(notion_ids: list[str]):
+    for notion_id, outcome in zip(notion_ids, await asyncio.gather(
+            *(notion_async.flag_reviewed(n) for n in notion_ids), return_exceptions=True)):
+        if isinstance(outcome, Exception):
+            print(f"  [warn] could not flag {notion_id} reviewed: {outcome}")
+
+
+async def _load_async():
+    due = _publish(await notion_async.query_voting_projects(VOTING_LIST_PROPS))
+    if SERVERLESS:
+        await _flag_async(due)
+    else:
+        _start_flagging(due)
+
+
+async def ensure_loaded():
+    """_ensure() for async handlers; concurrent cold requests share one load."""
+    global _load_task
+    if _is_cold():
+        if _load_task is None or _load_task.done():
+            _load_task = asyncio.ensure_future(_load_async())
+        try:
+            await asyncio.shield(_load_task)
+        except Exception as e:
+            with _lock:
+                usable = _projects is not None and time.monotonic() - _fetched_at <= _MAX_STALE
+            if not usable:
+                raise
+            print(f"  [warn] voting cache refresh failed, serving the cached copy: {e}")
+            return
+    _ensure()
+
+
+async def get_voting_projects_async() -> list[dict]:
+    await ensure_loaded()
+    return get_voting_projects()
+
+
+async def get_detail(notion_id: str) -> dict:
+    """
+    Full project (memo, scoring JSON, …), fetched once and reused while the
+    voting set shows the same last_edited_time (or for _DETAIL_TTL when the
+    project is not in the set).
+    """
+    with _lock:
+        listed = next((p for p in _projects or [] if p["notion_id"] == notion_id), None)
+        fetched_at, detail = _details.get(notion_id, (0.0, None))
+    if detail is not None:
+        if listed is not None and listed.get("last_edited") == detail.get("last_edited"):
+            return detail
+        if listed is None and time.monotonic() - fetched_at < _DETAIL_TTL:
+            return detail
+
+    detail = await notion_async.get_project(notion_id)
+    with _lock:
+        _details[notion_id] = (time.monotonic(), detail)
+    return detail
+
+
+def patch_project(notion_id: str, fields: dict):
+    """Apply a write the webapp just made to the cached copy of a project, and publish it."""
+    global _version, _digest
+    with _lock:
+        for p in _projects or []:
+            if p["notion_id"] == notion_id:
+                p.update(fields)
+                _version, _digest = _version + 1, ""
+                break
+    events.publish("project", {"notion_id": notion_id, **fields})
+
+
+def vote_fields(voters: dict[str, str]) -> dict:
+    """Aggregate fields for a {voter: "up"|"down"} map."""
+    return {
+        "voters":    voters,
+        "vote_up":   sum(1 for v in voters.values() if v == "up"),
+        "vote_down": sum(1 for v in voters.values() if v == "down"),
+    }
+
+
+def apply_votes(notion_id: str, votes: dict[str, str]) -> dict | None:
+    """
+    Merge {voter: vote} into the cached project under the cache lock, so
+    concurrent votes never drop each other. Returns the project's vote fields
+    plus "reviewed", or None when the project is not in the voting set.
+    """
+    global _version, _digest
+    with _lock:
+        for p in _projects or []:
+            if p["notion_id"] == notion_id:
+                p.update(vote_fields({**(p.get("voters") or {}), **votes}))
+                _version, _digest = _version + 1, ""
+                p["vote_reviewed"] = bool(p.get("vote_reviewed")) or len(p["voters"]) >= len(TEAM_MEMBERS)
+                delta = {"notion_id": notion_id, "vote_up": p["vote_up"], "vote_down": p["vote_down"],
+                         "voters": dict(p["voters"]), "vote_reviewed": p["vote_reviewed"]}
+                break
+        else:
+            return None
+    events.publish("project", delta)
+    return {**{k: delta[k] for k in ("vote_up", "vote_down", "voters")}, "reviewed": delta["vote_reviewed"]}
+
+
+def invalidate():
+    """Force the next get_voting_projects() to reload from Notion."""
+    global _fetched_at
+    with _lock:
+        _fetched_at = float("-inf")
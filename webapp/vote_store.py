@@ -0,0 +1,198 @@
+"""
+Vote writes to Notion: write-through by default, write-behind with a
+durable store.
+
+config.VOTE_STORE:
+  notion  (default) no local store. A vote is written to Notion (fresh GET,
+          merge, one PATCH) before it is acknowledged. The only safe mode on
+          serverless hosts (Vercel): the instance may be frozen or discarded
+          right after the response, so nothing can be left to send later.
+  sqlite  write-behind for a long-running host with a persistent disk. A
+          vote is committed to the votes / vote_outbox tables in state.db and
+          acknowledged at once; one flusher thread writes it back later.
+          Votes landing within _FLUSH_DELAY of each other are coalesced, so
+          each touched project gets one GET (to pick up votes written by
+          other instances) and one PATCH. Pending votes survive a restart.
+
+Each PATCH carries Vote_Up, Vote_Down, Voters and, once everyone has voted,
+Vote_Reviewed. set_store() swaps in another durable store (any object with
+record / pending / clear, see SqliteVoteStore).
+"""
+import json
+import threading
+import time
+
+from config import TEAM_MEMBERS, VOTE_STORE
+from shared.notion import (
+    PROP_VOTE_UP, PROP_VOTE_DOWN, PROP_VOTERS, PROP_VOTE_REVIEWED,
+    get_project, throttled_map, update_row,
+)
+from state import clear_pending_votes, get_pending_votes, init_votes_table, upsert_vote
+from webapp.project_cache import apply_votes, patch_project, vote_fields
+
+_FLUSH_DELAY = 2.0   # seconds a vote waits for others to share its PATCH
+_RETRY_DELAY = 30.0  # seconds before retrying failed write-backs
+
+
+# ── stores ────────────────────────────────────────────────────────────────────
+
+class SqliteVoteStore:
+    """state.db votes table; queued write-backs live in vote_outbox."""
+
+    def __init__(self):
+        init_votes_table()
+
+    def record(self, notion_id: str, voter_name: str, vote: str):
+        upsert_vote(notion_id, voter_name, vote)
+
+    def pending(self) -> list[dict]:
+        return get_pending_votes()
+
+    def clear(self, rows: list[dict]):
+        clear_pending_votes(rows)
+
+
+_STORES = {"sqlite": SqliteVoteStore}  # VOTE_STORE=notion has no store
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The write-behind store, or None in write-through mode (VOTE_STORE=notion)."""
+    global _store
+    with _store_lock:
+        if _store is None and VOTE_STORE in _STORES:
+            _store = _STORES[VOTE_STORE]()
+        return _store
+
+
+def set_store(store):
+    """Swap in another store (any object with record / pending / clear)."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def pending_votes() -> dict[str, dict[str, str]]:
+    """{notion_id: {voter: vote}} not yet written back to Notion."""
+    store = get_store()
+    result: dict[str, dict[str, str]] = {}
+    for r in store.pending() if store else []:
+        result.setdefault(r["notion_id"], {})[r["voter_name"]] = r["vote"]
+    return result
+
+
+# ── Notion writes ─────────────────────────────────────────────────────────────
+
+_wake = threading.Event()
+_flusher: threading.Thread | None = None
+_flusher_lock = threading.Lock()
+_project_locks: dict[str, threading.Lock] = {}  # write-through, per notion_id
+_project_locks_lock = threading.Lock()
+
+
+def _write_votes(notion_id: str, votes: dict[str, str]) -> dict[str, str]:
+    """Merge {voter: vote} into the page's current Voters and PATCH it. Returns the merged voters."""
+    project = get_project(notion_id)
+    voters = {**(project.get("voters") or {}), **votes}
+    fields = vote_fields(voters)
+    props = {
+        PROP_VOTE_UP:   fields["vote_up"],
+        PROP_VOTE_DOWN: fields["vote_down"],
+        PROP_VOTERS:    json.dumps(voters, ensure_ascii=False),
+    }
+    if len(voters) >= len(TEAM_MEMBERS) and not project.get("vote_reviewed"):
+        props[PROP_VOTE_REVIEWED] = True
+    update_row(notion_id, props)
+    return voters
+
+
+def _flush_project(item: tuple[str, list[dict]]):
+    notion_id, rows = item
+    voters = _write_votes(notion_id, {r["voter_name"]: r["vote"]
+                                      for r in sorted(rows, key=lambda r: r["voted_at"])})
+    get_store().clear(rows)
+    # Votes from other instances arrive with the GET; reconcile the cache,
+    # keeping any vote cast here since this flush started
+    patch_project(notion_id, vote_fields({**voters, **pending_votes().get(notion_id, {})}))
+
+
+def flush_votes() -> int:
+    """Write every pending vote back to Notion, one PATCH per project. Returns failures."""
+    store = get_store()
+    by_project: dict[str, list[dict]] = {}
+    for r in store.pending() if store else []:
+        by_project.setdefault(r["notion_id"], []).append(r)
+    if not by_project:
+        return 0
+    failed = 0
+    for (notion_id, _), outcome in zip(by_project.items(), throttled_map(_flush_project, list(by_project.items()))):
+        if isinstance(outcome, Exception):
+            failed += 1
+            print(f"  [warn] vote write-back for {notion_id} failed: {outcome}")
+    return failed
+
+
+def _flush_loop():
+    while True:
+        _wake.wait()
+        time.sleep(_FLUSH_DELAY)
+        _wake.clear()
+        try:
+            failed = flush_votes()
+        except Exception as e:
+            print(f"  [warn] vote flush failed: {e}")
+            failed = 1
+        if failed:
+            time.sleep(_RETRY_DELAY)
+            _wake.set()
+
+
+def start_flusher():
+    """Start the flusher thread once; picks up votes left pending by a previous process."""
+    global _flusher
+    if get_store() is None:
+        return
+    with _flusher_lock:
+        if _flusher is not None:
+            return
+        _flusher = threading.Thread(target=_flush_loop, name="vote-flusher", daemon=True)
+        _flusher.start()
+    if get_store().pending():
+        _wake.set()
+
+
+def vote_state(notion_id: str, notion_voters: dict) -> dict:
+    """Dashboard vote state for a project outside the cached set, from its Notion voters."""
+    voters = {**(notion_voters or {}), **pending_votes().get(notion_id, {})}
+    return {**vote_fields(voters), "reviewed": len(voters) >= len(TEAM_MEMBERS)}
+
+
+def _write_through(notion_id: str, voter_name: str, vote: str) -> dict:
+    # One write per project at a time in this process, so two votes on the
+    # same project cannot both read the old Voters and drop each other
+    with _project_locks_lock:
+        lock = _project_locks.setdefault(notion_id, threading.Lock())
+    with lock:
+        voters = _write_votes(notion_id, {voter_name: vote})
+    state = apply_votes(notion_id, voters)
+    return state or {**vote_fields(voters), "reviewed": len(voters) >= len(TEAM_MEMBERS)}
+
+
+def record_vote(notion_id: str, voter_name: str, vote: str) -> dict | None:
+    """
+    Record a vote: written to Notion before returning (VOTE_STORE=notion),
+    or committed to the store with its write-back queued. Returns the
+    project's vote_up / vote_down / voters / reviewed as the dashboard should
+    now show them, or None when a queued vote's project is not in the cached
+    voting set (e.g. already reviewed) — the caller then reads Notion and
+    uses vote_state(). Blocking; call from a worker thread.
+    """
+    store = get_store()
+    if store is None:
+        return _write_through(notion_id, voter_name, vote)
+    store.record(notion_id, voter_name, vote)
+    start_flusher()
+    _wake.set()
+    return apply_votes(notion_id, pending_votes().get(notion_id, {}))